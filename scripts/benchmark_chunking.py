@@ -0,0 +1,135 @@
+"""Compare chunk counts of the old splitters and the shared chunking engine.
+
+Runs over the JSON fixtures in src/research_events/merge_events and reports,
+per fixture, how many chunks each splitter produces and how many chunks end
+in the middle of an event (not on a line or sentence boundary).
+
+Usage (from the repository root):
+    python -m scripts.benchmark_chunking [--chunk-size 800] [--overlap-size 20] [--repeat 5]
+
+The tiktoken encoding is downloaded on first use. Pass ``--offline`` to
+count one token per word instead, with the stand-in encoding the tests use;
+chunk counts then differ from real runs but the splitters still compare.
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+
+from src.configuration import Configuration
+from src.url_crawler.chunking import TextChunker, TextSpan
+from src.url_crawler.tokenization import get_tokenizer, token_start_offsets
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "src", "research_events", "merge_events"
+)
+
+
+def fixture_text(data) -> str:
+    """Flatten a JSON fixture into the text the pipeline would chunk."""
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        if "name" in data and "description" in data:
+            # A structured event, rendered like the category bullets
+            return f"- {data['name']}: {data['description']}"
+        return "\n".join(fixture_text(value) for value in data.values())
+    if isinstance(data, list):
+        return "\n".join(fixture_text(item) for item in data)
+    return ""
+
+
+def char_slices(text: str, max_len: int = 2000) -> list[TextSpan]:
+    """Split like the old fixed-size splitter of chunk_graph and EventService."""
+    return [
+        TextSpan(text, i, min(i + max_len, len(text)))
+        for i in range(0, len(text), max_len)
+    ]
+
+
+def token_windows(
+    text: str, encoding, chunk_size: int = 1000, overlap_size: int = 20
+) -> list[TextSpan]:
+    """Split like the old fixed token windows of chunk_text_by_tokens."""
+    starts = token_start_offsets(encoding, text)
+    spans = []
+    for start in range(0, len(starts), chunk_size - overlap_size):
+        end = start + chunk_size
+        spans.append(
+            TextSpan(text, starts[start], starts[end] if end < len(starts) else len(text))
+        )
+        if end >= len(starts):
+            break
+    return spans
+
+
+def cut_events(spans: list[TextSpan]) -> int:
+    """Count chunks, except the last, that do not end on a line or sentence."""
+    cuts = 0
+    for span in spans[:-1]:
+        before = span.source[: span.end].rstrip(" \t")[-1:]
+        after = span.source[span.end :].lstrip(" \t")[:1]
+        if before not in ("\n", ".", "!", "?") and after != "\n":
+            cuts += 1
+    return cuts
+
+
+def main() -> None:
+    """Print a comparison table for every fixture."""
+    configurable = Configuration()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=configurable.default_chunk_size)
+    parser.add_argument(
+        "--overlap-size", type=int, default=configurable.default_overlap_size
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="count words instead of downloading the tiktoken encoding",
+    )
+    args = parser.parse_args()
+
+    if args.offline:
+        from src.test.conftest import WordEncoding
+
+        encoding = WordEncoding()
+    else:
+        encoding = get_tokenizer()
+    chunker = TextChunker(args.chunk_size, args.overlap_size)
+    splitters = {
+        "2000 chars": lambda text: char_slices(text),
+        "1000/20 tokens": lambda text: token_windows(text, encoding),
+        f"engine {args.chunk_size}/{args.overlap_size}": lambda text: chunker.split(
+            text, token_start_offsets(encoding, text)
+        ),
+    }
+
+    print(f"{'fixture':<24}{'chars':>8}  " + "".join(f"{name:>24}" for name in splitters))
+    totals = {name: [0, 0, 0.0] for name in splitters}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            text = fixture_text(json.load(f))
+        # Repeat the fixture to get page-sized inputs
+        text = "\n\n".join([text] * args.repeat)
+
+        row = f"{os.path.basename(path):<24}{len(text):>8}  "
+        for name, split in splitters.items():
+            start = time.perf_counter()
+            spans = split(text)
+            elapsed = time.perf_counter() - start
+            totals[name][0] += len(spans)
+            totals[name][1] += cut_events(spans)
+            totals[name][2] += elapsed
+            row += f"{f'{len(spans)} chunks, {cut_events(spans)} cut':>24}"
+        print(row)
+
+    print()
+    for name, (chunks, cuts, elapsed) in totals.items():
+        print(f"{name:<24}{chunks:>6} chunks {cuts:>6} cut events {elapsed * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
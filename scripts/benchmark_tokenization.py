@@ -0,0 +1,92 @@
+"""Measure tokenization throughput of the batched tokenization service.
+
+Tokenizes a batch of page-sized documents built from the JSON fixtures in
+src/research_events/merge_events, once per strategy, and reports tokens per
+second and tokens per second per core:
+
+- loop: one ``encode`` call per document on a single thread (the old path)
+- threads=N: tiktoken batch encoding on N threads
+- processes=N: the service's process pool with N workers
+
+Usage (from the repository root):
+    python -m scripts.benchmark_tokenization [--documents 64] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+
+from scripts.benchmark_chunking import FIXTURES_DIR, fixture_text
+from src.url_crawler.tokenization import TokenizationService, get_tokenizer
+
+
+def load_documents(count: int, doc_chars: int) -> list[str]:
+    """Build ``count`` documents of about ``doc_chars`` characters each."""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            corpus.append(fixture_text(json.load(f)))
+    text = "\n\n".join(corpus)
+    text = text * (doc_chars // len(text) + 1)
+    # Shift every document so they are not byte-identical
+    return [text[i * 97 : i * 97 + doc_chars] for i in range(count)]
+
+
+def report(name: str, tokens: int, seconds: float, cores: int) -> None:
+    """Print one result line."""
+    rate = tokens / seconds
+    print(
+        f"{name:<16}{seconds * 1000:>10.1f} ms{rate:>14,.0f} tok/s"
+        f"{rate / cores:>14,.0f} tok/s/core"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run every strategy over the same documents."""
+    documents = load_documents(args.documents, args.doc_chars)
+    encoding = get_tokenizer()
+    print(
+        f"{len(documents)} documents, {sum(map(len, documents)):,} chars, "
+        f"{os.cpu_count()} cores available\n"
+    )
+
+    start = time.perf_counter()
+    tokens = sum(len(encoding.encode(doc)) for doc in documents)
+    report("loop", tokens, time.perf_counter() - start, 1)
+
+    for threads in sorted({1, args.workers}):
+        service = TokenizationService(threads=threads)
+        start = time.perf_counter()
+        counts = await service.count_tokens(documents)
+        report(f"threads={threads}", sum(counts), time.perf_counter() - start, threads)
+
+    if not args.skip_processes:
+        service = TokenizationService(process_workers=args.workers)
+        # Start the workers and load the encoding before timing
+        await service.count_tokens(documents[: args.workers])
+        start = time.perf_counter()
+        counts = await service.count_tokens(documents)
+        report(
+            f"processes={args.workers}",
+            sum(counts),
+            time.perf_counter() - start,
+            args.workers,
+        )
+        service.shutdown()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=64)
+    parser.add_argument("--doc-chars", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 8))
+    parser.add_argument("--skip-processes", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
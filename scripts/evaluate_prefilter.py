@@ -0,0 +1,46 @@
+"""Evaluate chunk pre-filter thresholds against logged model labels.
+
+Collect a log by running research with ``chunk_prefilter_log_path`` set and
+``chunk_prefilter_enabled`` off, so every chunk gets a model label. The script
+then reports, for a grid of thresholds, how many model calls the pre-filter
+would save and how often it would disagree with the model.
+
+Usage (from the repository root):
+    python -m scripts.evaluate_prefilter prefilter_log.jsonl
+"""
+
+import argparse
+
+from src.research_events.chunk_prefilter import (
+    evaluate_prefilter,
+    load_prefilter_records,
+)
+
+REJECT_THRESHOLDS = [0.0, 0.05, 0.1, 0.15, 0.2]
+ACCEPT_THRESHOLDS = [0.6, 0.7, 0.8, 0.9, 1.0]
+
+
+def main() -> None:
+    """Parse arguments and print one line per threshold pair."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log_path")
+    args = parser.parse_args()
+
+    records = load_prefilter_records(args.log_path)
+    print(f"{sum(1 for r in records if r.label is not None)} labelled chunks\n")
+    print(
+        f"{'reject<':>8}{'accept>':>8}{'saved':>8}{'reject P':>10}"
+        f"{'accept P':>10}{'recall':>8}"
+    )
+    for reject_below in REJECT_THRESHOLDS:
+        for accept_above in ACCEPT_THRESHOLDS:
+            result = evaluate_prefilter(records, reject_below, accept_above)
+            print(
+                f"{reject_below:>8.2f}{accept_above:>8.2f}"
+                f"{result.llm_calls_saved:>8.1%}{result.reject_precision:>10.1%}"
+                f"{result.accept_precision:>10.1%}{result.relevant_recall:>8.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import os
 from typing import Any
 
 from langchain_core.runnables import RunnableConfig
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class Configuration(BaseModel):
@@ -47,10 +47,10 @@ class Configuration(BaseModel):
 
     # Hardcoded values from graph files
     default_chunk_size: int = Field(
-        default=800, description="Default chunk size for text processing"
+        default=800, description="Default chunk size in tokens for text processing"
     )
     default_overlap_size: int = Field(
-        default=20, description="Default overlap size between chunks"
+        default=20, description="Default overlap in tokens between chunks"
     )
     max_content_length: int = Field(
         default=100000, description="Maximum content length to process"
@@ -58,9 +58,205 @@ class Configuration(BaseModel):
     max_tool_iterations: int = Field(
         default=5, description="Maximum number of tool iterations"
     )
+    max_page_chunks: int = Field(
+        default=200,
+        description="Maximum number of chunks a page is split into before relevance ranking",
+    )
     max_chunks: int = Field(
         default=20,
-        description="Maximum number of chunks to process for biographical event detection",
+        description="Maximum number of chunks to process for biographical event detection, the highest scoring of the page",
+    )
+    chunk_ranking_query_weight: float = Field(
+        default=0.5,
+        description="Share of the research question match in chunk ranking, the rest is the pre-filter score",
+    )
+    max_extracted_chunks: int = Field(
+        default=8,
+        description="Maximum number of relevant chunks extracted per page, the highest scoring first (0 for no limit)",
+    )
+    extraction_min_score: float = Field(
+        default=0.0,
+        description="Pre-filter score a relevant chunk needs to be extracted",
+    )
+    chunk_classification_batch_size: int = Field(
+        default=8,
+        description="Chunks classified together in one chunk model call (1 for one call per chunk)",
+    )
+    chunk_prefilter_enabled: bool = Field(
+        default=True,
+        description="Decide obviously relevant or irrelevant chunks locally, without the chunk model",
+    )
+    chunk_prefilter_reject_below: float = Field(
+        default=0.05,
+        description="Pre-filter score under which a chunk is rejected without the chunk model",
+    )
+    chunk_prefilter_accept_above: float = Field(
+        default=0.8,
+        description="Pre-filter score over which a chunk is accepted without the chunk model",
+    )
+    chunk_prefilter_log_path: str = Field(
+        default="",
+        description="JSON lines file logging every chunk's pre-filter score and model label",
+    )
+    chunk_classification_concurrency: int = Field(
+        default=4,
+        description="Chunk classification calls run concurrently for one page",
+    )
+    extraction_concurrency: int = Field(
+        default=4,
+        description="Chunk extraction calls run concurrently for one page",
+    )
+    incremental_merge: bool = Field(
+        default=True,
+        description="Only send the merge model the existing events of the years new events fall in",
+    )
+    merge_window_years: int = Field(
+        default=1,
+        description="Years around each new event whose existing events are merged with it",
+    )
+    merge_group_max_tokens: int = Field(
+        default=2000,
+        description="Maximum tokens of events in one merge prompt, larger merges are split into groups merged concurrently (0 for no limit)",
+    )
+    merge_dedup_threshold: float = Field(
+        default=0.8,
+        description="Token-set similarity from which a new event duplicates a known event of the same year (1 for exact matches only)",
+    )
+    parallel_url_crawling: bool = Field(
+        default=True,
+        description="Crawl and extract all selected URLs in parallel and merge once at the end",
+    )
+
+    # Scraper backend
+    scraper_backend: str = Field(
+        default="firecrawl",
+        description="Backend used to scrape pages: firecrawl, http or file",
+    )
+    scraper_fixtures_dir: str = Field(
+        default="fixtures/pages",
+        description="Directory of <host>/<path>.md or .html pages for the file backend",
+    )
+
+    markdown_cleaning_rules: list[str] = Field(
+        default=[
+            "tables",
+            "nav_lists",
+            "images",
+            "links",
+            "footnotes",
+            "bare_urls",
+            "whitespace",
+        ],
+        description="Noise removed from scraped Markdown before chunking",
+    )
+
+    @field_validator("markdown_cleaning_rules", mode="before")
+    @classmethod
+    def split_rule_list(cls, value: Any) -> Any:
+        """Accept rules as a comma-separated string, e.g. from the environment."""
+        if isinstance(value, str):
+            return [rule.strip() for rule in value.split(",") if rule.strip()]
+        return value
+
+    dedup_paragraphs: bool = Field(
+        default=True,
+        description="Drop repeated and near-duplicate paragraphs before chunking",
+    )
+    dedup_max_distance: int = Field(
+        default=3,
+        description="Maximum SimHash bit distance for two paragraphs to count as duplicates",
+    )
+
+    # Token budget
+    run_token_budget: int = Field(
+        default=0,
+        description="Maximum tokens one research run may spend on LLM calls (0 for no limit)",
+    )
+    token_budget_low_ratio: float = Field(
+        default=0.2,
+        description="Share of the budget left at which stages switch to cheaper behaviour",
+    )
+
+    # Tokenization
+    tokenizer_threads: int = Field(
+        default=8, description="Threads tiktoken uses to encode a batch of documents"
+    )
+    tokenizer_process_workers: int = Field(
+        default=0,
+        description="Processes used to tokenize large batches (0 keeps everything in threads)",
+    )
+    tokenizer_process_threshold_chars: int = Field(
+        default=1_000_000,
+        description="Batch size in characters from which the process pool is used",
+    )
+
+    # Scrape cache
+    scrape_cache_enabled: bool = Field(
+        default=True, description="Cache scraped pages on disk between runs"
+    )
+    scrape_cache_dir: str = Field(
+        default=".cache/scrape", description="Directory for the scrape cache"
+    )
+    scrape_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 60 * 60,
+        description="Seconds before a cached page is scraped again",
+    )
+    scrape_cache_max_bytes: int = Field(
+        default=200 * 1024 * 1024,
+        description="Maximum compressed size of the scrape cache before LRU eviction",
+    )
+
+    # Chunk memo
+    chunk_memo_enabled: bool = Field(
+        default=True,
+        description="Reuse chunk classification and extraction results between runs",
+    )
+    chunk_memo_dir: str = Field(
+        default=".cache/chunk_memo", description="Directory for the chunk memo"
+    )
+    chunk_memo_max_bytes: int = Field(
+        default=50 * 1024 * 1024,
+        description="Maximum size of the chunk memo before LRU eviction",
+    )
+
+    # Crawler connection pool
+    crawler_max_connections: int = Field(
+        default=100, description="Maximum open connections for the crawler"
+    )
+    crawler_max_connections_per_host: int = Field(
+        default=10, description="Maximum open connections per host for the crawler"
+    )
+    crawler_dns_cache_ttl_seconds: int = Field(
+        default=300, description="Seconds to cache DNS lookups for the crawler"
+    )
+    crawler_keepalive_seconds: float = Field(
+        default=30.0, description="Seconds to keep idle crawler connections open"
+    )
+    crawler_timeout_seconds: float = Field(
+        default=30.0, description="Total timeout for a single scrape request"
+    )
+
+    # Crawler rate limiting and circuit breaker
+    crawler_requests_per_second: float = Field(
+        default=2.0, description="Maximum scrape requests per second to one host"
+    )
+    crawler_burst: int = Field(
+        default=5, description="Requests allowed to one host in a burst"
+    )
+    crawler_max_retries: int = Field(
+        default=3, description="Retries for scrapes that hit 429, 5xx or timeouts"
+    )
+    crawler_backoff_base_seconds: float = Field(
+        default=1.0, description="First backoff delay, doubled on each failure"
+    )
+    crawler_backoff_max_seconds: float = Field(
+        default=60.0, description="Longest backoff delay, also caps Retry-After"
+    )
+    crawler_circuit_failure_threshold: int = Field(
+        default=5, description="Consecutive failures before a host's circuit opens"
+    )
+    crawler_circuit_reset_seconds: float = Field(
+        default=60.0, description="Seconds an open circuit waits before a probe"
     )
 
     def get_llm_structured_model(self) -> str:
@@ -0,0 +1,46 @@
+"""Coalesces concurrent calls for the same key into one in-flight task."""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result.
+
+    The first caller for a key starts the call as a task; callers arriving while
+    it is still running await the same task instead of starting their own.
+    Cancelling one caller does not cancel the shared call for the others.
+    """
+
+    def __init__(self):
+        """Start with no calls in flight."""
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of ``fn()``, sharing it with concurrent callers of ``key``."""
+        # Tasks belong to one event loop, so never share them across loops
+        flight_key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(flight_key)
+
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[flight_key] = task
+
+            def _forget(done: asyncio.Task) -> None:
+                if self._calls.get(flight_key) is done:
+                    del self._calls[flight_key]
+
+            task.add_done_callback(_forget)
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Return how many calls are currently running."""
+        return len(self._calls)
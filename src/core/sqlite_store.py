@@ -0,0 +1,122 @@
+"""Size-bounded LRU table in a SQLite file, shared by the on-disk caches.
+
+Every row has a key, its size in bytes and the time it was last used, next
+to the columns a cache adds for its own data. Once the table grows past its
+byte budget the least recently used rows are deleted. Access goes through a
+lock, so a store can be used from worker threads via ``asyncio.to_thread``.
+"""
+
+import os
+import sqlite3
+import threading
+
+from pydantic import BaseModel
+
+
+class LRUStoreStats(BaseModel):
+    """Lookups served and entries evicted by a store."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were served from the store."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SqliteLRUStore:
+    """Persistent, size-bounded LRU store.
+
+    Subclasses set ``TABLE`` and ``COLUMNS``, the definitions of their extra
+    columns, and read and write rows through ``_conn`` while holding
+    ``_lock``.
+    """
+
+    TABLE = "entries"
+    COLUMNS = "value BLOB NOT NULL"
+
+    def __init__(self, path: str, max_bytes: int, stats: LRUStoreStats):
+        """Open (or create) the database at ``path``.
+
+        A ``max_bytes`` of 0 disables eviction.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                key TEXT PRIMARY KEY,
+                {self.COLUMNS},
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.TABLE}_last_access "
+            f"ON {self.TABLE} (last_access)"
+        )
+        self._conn.commit()
+
+    def _touch(self, key: str, now: float) -> None:
+        """Mark an entry as used at ``now``. Call with the lock held."""
+        self._conn.execute(
+            f"UPDATE {self.TABLE} SET last_access = ? WHERE key = ?", (now, key)
+        )
+
+    def _delete(self, key: str) -> None:
+        """Delete one entry. Call with the lock held."""
+        self._conn.execute(f"DELETE FROM {self.TABLE} WHERE key = ?", (key,))
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the store fits its budget.
+
+        Call with the lock held.
+        """
+        if not self.max_bytes:
+            return
+
+        (total,) = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            f"SELECT key, size FROM {self.TABLE} ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._delete(key)
+            total -= size
+            self.stats.evictions += 1
+
+    def total_bytes(self) -> int:
+        """Return the stored size of everything in the store."""
+        with self._lock:
+            (total,) = self._conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}"
+            ).fetchone()
+        return total
+
+    def clear(self) -> None:
+        """Remove every entry from the store."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.TABLE}")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
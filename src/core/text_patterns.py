@@ -0,0 +1,20 @@
+"""Regexes and stopwords shared by the local text heuristics.
+
+Page windowing, the chunk pre-filter and ranking, and the event store all
+look for the same dates and words, so they share one definition.
+"""
+
+import re
+
+YEAR_PATTERN = re.compile(r"\b(1[0-9]{3}|20[0-9]{2})s?\b")
+MONTH_PATTERN = re.compile(
+    r"\b(January|February|March|April|May|June|July|August|September|October|"
+    r"November|December)\b"
+)
+WORD_PATTERN = re.compile(r"[A-Za-zÀ-ÿ]+")
+
+STOPWORDS = {
+    "a", "about", "an", "and", "at", "by", "did", "during", "for", "from", "his",
+    "her", "how", "in", "into", "is", "life", "of", "on", "research", "the",
+    "their", "to", "was", "what", "when", "where", "which", "who", "with",
+}  # fmt: skip
@@ -0,0 +1,189 @@
+"""Run-wide token budget shared by every LLM call site of a research run.
+
+Call sites reserve the tokens of their prompt before invoking the model and
+record the model's output tokens afterwards. When the budget runs low the
+stages degrade instead of failing: the supervisor finishes early, fewer
+chunks are filtered and extracted, and the remaining calls use the cheaper
+chunk model.
+
+Every supervisor run starts a budget under a fresh id, keeps the id in its
+state and passes it to the sub-graphs it invokes through the config, so they
+all charge the same budget and concurrent runs never share one. Calls made
+outside a supervisor run, such as a sub-graph run on its own, get a budget
+of their own that is never stored, so nothing leaks or carries over to the
+next run.
+"""
+
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, Field
+from src.configuration import Configuration
+from src.url_crawler.tokenization import get_tokenization_service
+
+
+class TokenBudgetStats(BaseModel):
+    """Tokens spent and calls made, per stage."""
+
+    tokens: dict[str, int] = Field(default_factory=dict)
+    calls: dict[str, int] = Field(default_factory=dict)
+    denied: dict[str, int] = Field(default_factory=dict)
+    # Calls a stage avoided, e.g. extractions of chunks ranked out
+    saved: dict[str, int] = Field(default_factory=dict)
+
+
+class TokenBudget:
+    """Tracks the tokens a run has spent against its limit."""
+
+    def __init__(self, limit: int = 0, low_ratio: float = 0.2):
+        """Allow ``limit`` tokens per run, 0 meaning no limit.
+
+        The budget counts as low once less than ``low_ratio`` of it is left.
+        """
+        self.limit = limit
+        self.low_ratio = low_ratio
+        self.spent = 0
+        self.stats = TokenBudgetStats()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the run has a limit at all."""
+        return self.limit > 0
+
+    @property
+    def remaining(self) -> float:
+        """Tokens left, infinite when there is no limit."""
+        return self.limit - self.spent if self.enabled else float("inf")
+
+    @property
+    def is_low(self) -> bool:
+        """Whether stages should switch to their cheaper behaviour."""
+        return self.enabled and self.remaining < self.limit * self.low_ratio
+
+    @property
+    def is_exhausted(self) -> bool:
+        """Whether no more LLM calls should be made."""
+        return self.enabled and self.remaining <= 0
+
+    def charge(self, stage: str, tokens: int) -> None:
+        """Add ``tokens`` spent by ``stage``."""
+        self.spent += tokens
+        self.stats.tokens[stage] = self.stats.tokens.get(stage, 0) + tokens
+
+    async def reserve(
+        self, stage: str, *prompts: str, required: bool = False
+    ) -> bool:
+        """Charge the prompt tokens of a call, or return False if they don't fit.
+
+        A ``required`` call is charged even when it does not fit. Without a
+        limit prompts are not tokenized, only the call is counted.
+        """
+        if not self.enabled:
+            self.stats.calls[stage] = self.stats.calls.get(stage, 0) + 1
+            return True
+
+        tokens = sum(await get_tokenization_service().count_tokens(list(prompts)))
+        fits = tokens <= self.remaining
+        if not fits:
+            self.stats.denied[stage] = self.stats.denied.get(stage, 0) + 1
+            if not required:
+                return False
+
+        self.stats.calls[stage] = self.stats.calls.get(stage, 0) + 1
+        self.charge(stage, tokens)
+        return fits
+
+    def record_saved(self, stage: str, calls: int) -> None:
+        """Count ``calls`` that ``stage`` did not need to make."""
+        if calls:
+            self.stats.saved[stage] = self.stats.saved.get(stage, 0) + calls
+
+    def record_usage(self, stage: str, response: Any) -> None:
+        """Charge the output tokens reported by a model response, if any."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        output_tokens = usage.get("output_tokens", 0)
+        if output_tokens:
+            self.charge(stage, output_tokens)
+
+    def model_for(self, default_model: str, cheap_model: str) -> str:
+        """Return the model to use, the cheap one once the budget is low."""
+        return cheap_model if self.is_low else default_model
+
+    def summary(self) -> str:
+        """Describe what the run spent."""
+        limit = self.limit if self.enabled else "unlimited"
+        return (
+            f"Token budget: {self.spent}/{limit} tokens, "
+            f"per stage {self.stats.tokens}, calls {self.stats.calls}, "
+            f"denied {self.stats.denied}, saved {self.stats.saved}"
+        )
+
+
+# Budgets of the runs in progress, by budget id
+_budgets: dict[str, TokenBudget] = {}
+
+# Configurable key holding the id of the budget a call charges
+BUDGET_ID_KEY = "token_budget_id"
+
+
+def _run_key(config: RunnableConfig | None) -> str | None:
+    configurable = config.get("configurable", {}) if config else {}
+    budget_id = configurable.get(BUDGET_ID_KEY)
+    return str(budget_id) if budget_id else None
+
+
+def token_budget_config(
+    config: RunnableConfig | None, budget_id: str | None
+) -> RunnableConfig:
+    """Return ``config`` set up to charge the budget ``budget_id``."""
+    config = dict(config or {})
+    if budget_id:
+        config["configurable"] = {
+            **config.get("configurable", {}),
+            BUDGET_ID_KEY: budget_id,
+        }
+    return config
+
+
+def get_token_budget(config: RunnableConfig | None = None) -> TokenBudget:
+    """Return the budget of the run ``config`` belongs to, creating it on first use.
+
+    Without a budget id the budget only covers the caller's own calls.
+    """
+    key = _run_key(config)
+    if key in _budgets:
+        return _budgets[key]
+    configurable = Configuration.from_runnable_config(config)
+    budget = TokenBudget(
+        limit=configurable.run_token_budget,
+        low_ratio=configurable.token_budget_low_ratio,
+    )
+    if key is not None:
+        _budgets[key] = budget
+    return budget
+
+
+def start_token_budget(config: RunnableConfig | None = None) -> str:
+    """Start a fresh budget for a new run and return its id."""
+    budget_id = uuid.uuid4().hex
+    get_token_budget(token_budget_config(config, budget_id))
+    return budget_id
+
+
+def finish_token_budget(config: RunnableConfig | None = None) -> TokenBudget:
+    """Close the run's budget and return it."""
+    budget = get_token_budget(config)
+    _budgets.pop(_run_key(config), None)
+    return budget
+
+
+@contextmanager
+def finish_token_budget_on_error(config: RunnableConfig | None) -> Iterator[None]:
+    """Close the run's budget if the block raises, as the run will never finish it."""
+    try:
+        yield
+    except BaseException:
+        _budgets.pop(_run_key(config), None)
+        raise
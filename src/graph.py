@@ -9,6 +9,13 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.graph import START, StateGraph
 from langgraph.types import Command
 from src.configuration import Configuration
+from src.core.token_budget import (
+    finish_token_budget,
+    finish_token_budget_on_error,
+    get_token_budget,
+    start_token_budget,
+    token_budget_config,
+)
 from src.llm_service import (
     create_llm_structured_model,
     create_llm_with_tools,
@@ -18,9 +25,13 @@ from src.prompts import (
     lead_researcher_prompt,
     structure_events_prompt,
 )
+from src.research_events.merge_events.utils import (
+    ensure_event_store,
+    ensure_pydantic_model,
+)
 from src.research_events.research_events_graph import research_events_app
+from src.services.event_store import EventStore
 from src.state import (
-    CategoriesWithEvents,
     Chronology,
     FinishResearchTool,
     ResearchEventsTool,
@@ -43,42 +54,65 @@ MAX_TOOL_CALL_ITERATIONS = config.max_tool_iterations
 async def supervisor_node(
     state: SupervisorState,
     config: RunnableConfig,
-) -> Command[Literal["supervisor_tools"]]:
+) -> Command[Literal["supervisor_tools", "structure_events"]]:
     """The 'brain' of the agent. It decides the next action."""
-    tools = [
-        ResearchEventsTool,
-        FinishResearchTool,
-        think_tool,
-    ]
-
-    tools_model = create_llm_with_tools(tools=tools, config=config)
-    messages = state.get("conversation_history", "")
-    messages_summary = get_buffer_string_with_tools(messages)
-    last_message = ""
-    if len(messages_summary) > 0:
-        last_message = messages[-1]
-    system_message = SystemMessage(
-        content=lead_researcher_prompt.format(
-            person_to_research=state["person_to_research"],
-            events_summary=state.get("events_summary", "Everything is missing"),
-            last_message=last_message,
-            max_iterations=5,
+    budget_id = state.get("token_budget_id")
+    if state.get("iteration_count", 0) == 0 or not budget_id:
+        budget_id = start_token_budget(config)
+    config = token_budget_config(config, budget_id)
+
+    with finish_token_budget_on_error(config):
+        budget = get_token_budget(config)
+        if budget.is_low:
+            # Keep what is left of the budget for structuring the events
+            print(f"Token budget low ({budget.remaining} left), finishing research")
+            return Command(
+                goto="structure_events", update={"token_budget_id": budget_id}
+            )
+
+        tools = [
+            ResearchEventsTool,
+            FinishResearchTool,
+            think_tool,
+        ]
+
+        tools_model = create_llm_with_tools(tools=tools, config=config)
+        messages = state.get("conversation_history", "")
+        messages_summary = get_buffer_string_with_tools(messages)
+        last_message = ""
+        if len(messages_summary) > 0:
+            last_message = messages[-1]
+        system_message = SystemMessage(
+            content=lead_researcher_prompt.format(
+                person_to_research=state["person_to_research"],
+                events_summary=state.get("events_summary", "Everything is missing"),
+                last_message=last_message,
+                max_iterations=5,
+            )
         )
-    )
 
-    human_message = HumanMessage(content="Start the research process.")
-    prompt = [system_message, human_message]
+        human_message = HumanMessage(content="Start the research process.")
+        prompt = [system_message, human_message]
 
-    response = await tools_model.ainvoke(prompt)
+        if not await budget.reserve(
+            "supervisor", system_message.content, human_message.content
+        ):
+            return Command(
+                goto="structure_events", update={"token_budget_id": budget_id}
+            )
 
-    # The output is an AIMessage with tool_calls, which we add to the history
-    return Command(
-        goto="supervisor_tools",
-        update={
-            "conversation_history": [response],
-            "iteration_count": state.get("iteration_count", 0) + 1,
-        },
-    )
+        response = await tools_model.ainvoke(prompt)
+        budget.record_usage("supervisor", response)
+
+        # The output is an AIMessage with tool_calls, which we add to the history
+        return Command(
+            goto="supervisor_tools",
+            update={
+                "conversation_history": [response],
+                "iteration_count": state.get("iteration_count", 0) + 1,
+                "token_budget_id": budget_id,
+            },
+        )
 
 
 async def supervisor_tools_node(
@@ -86,81 +120,85 @@ async def supervisor_tools_node(
     config: RunnableConfig,
 ) -> Command[Literal["supervisor", "structure_events"]]:
     """The 'hands' of the agent. Executes tools and returns a Command for routing."""
-    existing_events = state.get(
-        "existing_events",
-        CategoriesWithEvents(early="", personal="", career="", legacy=""),
-    )
-    events_summary = state.get("events_summary", "")
-    used_domains = state.get("used_domains", [])
-    last_message = state["conversation_history"][-1]
-    iteration_count = state.get("iteration_count", 0)
-    exceeded_allowed_iterations = iteration_count >= MAX_TOOL_CALL_ITERATIONS
-
-    # If the LLM made no tool calls, we finish.
-    if not last_message.tool_calls or exceeded_allowed_iterations:
-        return Command(goto="structure_events")
-
-    # This is the core logic for executing tools and updating state.
-    all_tool_messages = []
-
-    for tool_call in last_message.tool_calls:
-        tool_name = tool_call["name"]
-        tool_args = tool_call["args"]
-
-        if tool_name == "FinishResearchTool":
+    config = token_budget_config(config, state.get("token_budget_id"))
+    with finish_token_budget_on_error(config):
+        # The markdown input is parsed once, the sub-graphs then keep the store
+        event_store = ensure_event_store(state)
+        events_summary = state.get("events_summary", "")
+        used_domains = state.get("used_domains", [])
+        last_message = state["conversation_history"][-1]
+        iteration_count = state.get("iteration_count", 0)
+        exceeded_allowed_iterations = iteration_count >= MAX_TOOL_CALL_ITERATIONS
+
+        # If the LLM made no tool calls, we finish.
+        if not last_message.tool_calls or exceeded_allowed_iterations:
             return Command(goto="structure_events")
 
-        elif tool_name == "think_tool":
-            # The 'think' tool is special: it just records a reflection.
-            # The reflection will be in the message history for the *next* supervisor turn.
-            response_content = tool_args["reflection"]
-            all_tool_messages.append(
-                ToolMessage(
-                    content=response_content,
-                    tool_call_id=tool_call["id"],
-                    name=tool_name,
+        # This is the core logic for executing tools and updating state.
+        all_tool_messages = []
+
+        for tool_call in last_message.tool_calls:
+            tool_name = tool_call["name"]
+            tool_args = tool_call["args"]
+
+            if tool_name == "FinishResearchTool":
+                return Command(goto="structure_events")
+
+            elif tool_name == "think_tool":
+                # The 'think' tool is special: it just records a reflection.
+                # The reflection will be in the message history for the *next* supervisor turn.
+                response_content = tool_args["reflection"]
+                all_tool_messages.append(
+                    ToolMessage(
+                        content=response_content,
+                        tool_call_id=tool_call["id"],
+                        name=tool_name,
+                    )
                 )
-            )
-
-        elif tool_name == "ResearchEventsTool":
-            research_question = tool_args["research_question"]
-            result = await research_events_app.ainvoke(
-                {
-                    "research_question": research_question,
-                    "existing_events": existing_events,
-                    "used_domains": used_domains,
-                }
-            )
-            existing_events = result["existing_events"]
-            used_domains = result["used_domains"]
 
-            summarizer_prompt = events_summarizer_prompt.format(
-                existing_events=existing_events
-            )
-            response = await create_llm_structured_model(config=config).ainvoke(
-                summarizer_prompt
-            )
+            elif tool_name == "ResearchEventsTool":
+                research_question = tool_args["research_question"]
+                # The crawler connection pool stays open across iterations and
+                # runs, and is closed when the process exits
+                result = await research_events_app.ainvoke(
+                    {
+                        "research_question": research_question,
+                        "event_store": event_store,
+                        "used_domains": used_domains,
+                    },
+                    config,
+                )
+                event_store = ensure_pydantic_model(result["event_store"], EventStore)
+                used_domains = result["used_domains"]
 
-            existing_events = existing_events
-            events_summary = response.content
-            all_tool_messages.append(
-                ToolMessage(
-                    content="Called ResearchEventsTool and returned multiple events",
-                    tool_call_id=tool_call["id"],
-                    name=tool_name,
+                summarizer_prompt = events_summarizer_prompt.format(
+                    existing_events=event_store.to_categories()
+                )
+                budget = get_token_budget(config)
+                # Without budget for a new summary the supervisor sees the old one
+                if await budget.reserve("supervisor", summarizer_prompt):
+                    summarizer = create_llm_structured_model(config=config)
+                    response = await summarizer.ainvoke(summarizer_prompt)
+                    budget.record_usage("supervisor", response)
+                    events_summary = response.content
+                all_tool_messages.append(
+                    ToolMessage(
+                        content="Called ResearchEventsTool and returned multiple events",
+                        tool_call_id=tool_call["id"],
+                        name=tool_name,
+                    )
                 )
-            )
 
-    # The Command helper tells the graph where to go next and what state to update.
-    return Command(
-        goto="supervisor",
-        update={
-            "existing_events": existing_events,
-            "conversation_history": all_tool_messages,
-            "used_domains": used_domains,
-            "events_summary": events_summary,
-        },
-    )
+        # The Command helper tells the graph where to go next and what state to update.
+        return Command(
+            goto="supervisor",
+            update={
+                "event_store": event_store,
+                "conversation_history": all_tool_messages,
+                "used_domains": used_domains,
+                "events_summary": events_summary,
+            },
+        )
 
 
 async def structure_events(
@@ -177,33 +215,54 @@ async def structure_events(
     """
     print("--- Step 2: Structuring Events into JSON ---")
 
+    # Research is over, close the budget
+    config = token_budget_config(config, state.get("token_budget_id"))
+    budget = finish_token_budget(config)
+
     # Get the cleaned events from the previous step
-    existing_events = state.get("existing_events", "")
+    event_store = ensure_event_store(state)
 
-    if not existing_events:
+    if not event_store:
         print("Warning: No cleaned events text found in state")
         return {"chronology": []}
 
-    structured_llm = create_llm_structured_model(config=config, class_name=Chronology)
+    configurable = Configuration.from_runnable_config(config)
+    structured_llm = create_llm_structured_model(
+        config=config,
+        class_name=Chronology,
+        model_name=budget.model_for(
+            configurable.get_llm_structured_model(), configurable.get_llm_chunk_model()
+        ),
+    )
 
     early_prompt = structure_events_prompt.format(
-        existing_events=existing_events["early"]
+        existing_events=event_store.render("early")
     )
     career_prompt = structure_events_prompt.format(
-        existing_events=existing_events["career"]
+        existing_events=event_store.render("career")
     )
     personal_prompt = structure_events_prompt.format(
-        existing_events=existing_events["personal"]
+        existing_events=event_store.render("personal")
     )
     legacy_prompt = structure_events_prompt.format(
-        existing_events=existing_events["legacy"]
+        existing_events=event_store.render("legacy")
     )
 
+    # The chronology is the output of the run, so it is charged even over budget
+    await budget.reserve(
+        "structure_events",
+        early_prompt,
+        career_prompt,
+        personal_prompt,
+        legacy_prompt,
+        required=True,
+    )
     early_response = await structured_llm.ainvoke(early_prompt)
     career_response = await structured_llm.ainvoke(career_prompt)
     personal_response = await structured_llm.ainvoke(personal_prompt)
     legacy_response = await structured_llm.ainvoke(legacy_prompt)
     # Invoke the second model to get the final structured output
+    print(budget.summary())
 
     all_events = (
         early_response.events
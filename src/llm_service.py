@@ -34,9 +34,12 @@ def _build_and_configure_model(
 
 # --- Public Function 1: For Models WITH Tools ---
 def create_llm_with_tools(
-    tools: List[Type[BaseTool]], config: RunnableConfig
+    tools: List[Type[BaseTool]], config: RunnableConfig, model_name: str | None = None
 ) -> Runnable:
-    """Creates a model configured specifically for tool-calling."""
+    """Creates a model configured specifically for tool-calling.
+
+    ``model_name`` overrides the configured model, e.g. to save tokens.
+    """
     configurable = Configuration.from_runnable_config(config)
 
     # Start the chain by binding the tools
@@ -45,7 +48,7 @@ def create_llm_with_tools(
     return _build_and_configure_model(
         config=config,
         model_chain=model_with_tools,
-        model_name=configurable.get_llm_with_tools_model(),
+        model_name=model_name or configurable.get_llm_with_tools_model(),
         max_tokens=configurable.tools_llm_max_tokens,
         max_retries=configurable.max_tools_output_retries,
     )
@@ -53,9 +56,14 @@ def create_llm_with_tools(
 
 # --- Public Function 2: For Models WITHOUT Tools ---
 def create_llm_structured_model(
-    config: RunnableConfig, class_name: Type[BaseModel] | None = None
+    config: RunnableConfig,
+    class_name: Type[BaseModel] | None = None,
+    model_name: str | None = None,
 ) -> Runnable:
-    """Creates a general-purpose chat model with no tools."""
+    """Creates a general-purpose chat model with no tools.
+
+    ``model_name`` overrides the configured model, e.g. to save tokens.
+    """
     configurable = Configuration.from_runnable_config(config)
 
     # The chain is just the base model itself
@@ -67,7 +75,7 @@ def create_llm_structured_model(
     return _build_and_configure_model(
         config=config,
         model_chain=base_model,
-        model_name=configurable.get_llm_structured_model(),
+        model_name=model_name or configurable.get_llm_structured_model(),
         max_tokens=configurable.structured_llm_max_tokens,
         max_retries=configurable.max_structured_output_retries,
     )
@@ -1,10 +1,21 @@
-from typing import Dict, List, TypedDict
+import asyncio
+from typing import Dict, List, Literal, TypedDict
 
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 from pydantic import BaseModel, Field
 from src.configuration import Configuration
+from src.core.token_budget import TokenBudget, get_token_budget
 from src.llm_service import create_llm_chunk_model
+from src.research_events.chunk_memo import ChunkMemo, get_chunk_memo, prompt_version
+from src.research_events.chunk_prefilter import (
+    PrefilterRecord,
+    log_prefilter_records,
+    prefilter_decision,
+    score_chunk,
+)
+from src.url_crawler.chunking import TextSpan, chunk_text_by_tokens
+from src.url_crawler.windowing import extract_keywords
 
 
 class BiographicEventCheck(BaseModel):
@@ -18,31 +29,50 @@ class ChunkResult(BaseModel):
     contains_biographic_event: bool = Field(
         description="Whether the text chunk contains biographical events"
     )
+    score: float | None = Field(
+        default=None, description="Local pre-filter score of the chunk"
+    )
+    decided_by: Literal["llm", "prefilter", "budget"] = Field(
+        default="llm",
+        description="Whether the model or the pre-filter decided, or the token "
+        "budget ran out before the chunk was classified",
+    )
+    start: int | None = Field(
+        default=None, description="Character offset of the chunk in its page"
+    )
+    end: int | None = Field(
+        default=None, description="Character offset where the chunk ends"
+    )
 
 
 class ChunkState(TypedDict):
     text: str
-    chunks: List[str]
+    # Used by the pre-filter to recognize mentions of the subject
+    research_question: str
+    # Spans into the page text, sliced only when a prompt is built
+    chunks: List[TextSpan | str]
     results: Dict[str, ChunkResult]
 
 
-def split_text(state: ChunkState) -> ChunkState:
-    """Split text into smaller chunks."""
-    text = state["text"]
-    chunk_size = 2000
-    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
-    return {"chunks": chunks}
+def route_chunk_input(state: ChunkState) -> Literal["split_text", "check_events"]:
+    """Skip splitting when the caller already provides chunks."""
+    if state.get("chunks") and not state.get("text"):
+        return "check_events"
+    return "split_text"
 
 
-def check_chunk_for_events(state: ChunkState, config) -> ChunkState:
-    """Check each chunk for biographical events using structured output."""
-    model = create_llm_chunk_model(config, BiographicEventCheck)
-    results = {}
+async def split_text(state: ChunkState, config) -> ChunkState:
+    """Split text into smaller chunks."""
+    configurable = Configuration.from_runnable_config(config)
+    spans = await chunk_text_by_tokens(
+        state["text"],
+        chunk_size=configurable.default_chunk_size,
+        overlap_size=configurable.default_overlap_size,
+    )
+    return {"chunks": spans}
 
-    for i, chunk in enumerate(state["chunks"]):
-        prompt = f"""
-        Analyze this text chunk and determine if it contains SPECIFIC biographical events.
-        
+
+CLASSIFICATION_CRITERIA = """
         ONLY mark as true if the chunk contains:
         - Birth/death dates or locations
         - Marriage ceremonies or relationships
@@ -60,13 +90,246 @@ def check_chunk_for_events(state: ChunkState, config) -> ChunkState:
         - General knowledge or context
         
         The event must be specific and concrete, not general background.
-        
+"""
+
+CHUNK_PROMPT = """
+        Analyze this text chunk and determine if it contains SPECIFIC biographical events.
+        {criteria}
         Text chunk: "{chunk}"
         """
 
-        result = model.invoke(prompt)
-        results[f"chunk_{i}"] = ChunkResult(
-            content=chunk, contains_biographic_event=result.contains_biographic_event
+BATCH_PROMPT = """
+        Analyze each of the {count} numbered text chunks below and determine, for
+        every chunk separately, if it contains SPECIFIC biographical events.
+        {criteria}
+        Return exactly one result per chunk, using the chunk's number as chunk_id.
+
+        {chunks}
+        """
+
+
+# Memoized classifications are only reused while the prompts stay the same
+CLASSIFICATION_VERSION = prompt_version(
+    CLASSIFICATION_CRITERIA, CHUNK_PROMPT, BATCH_PROMPT
+)
+
+
+class ChunkClassification(BaseModel):
+    """Whether one numbered chunk of a batch contains biographical events."""
+
+    chunk_id: int = Field(description="The number of the chunk")
+    contains_biographic_event: bool = Field(
+        description="Whether the text chunk contains biographical events"
+    )
+
+
+class BatchBiographicEventCheck(BaseModel):
+    """The classification of every chunk of a batch."""
+
+    results: List[ChunkClassification] = Field(
+        description="One classification for every chunk, in any order"
+    )
+
+
+def _chunk_prompt(chunk: TextSpan | str) -> str:
+    return CHUNK_PROMPT.format(criteria=CLASSIFICATION_CRITERIA, chunk=chunk)
+
+
+def _batch_prompt(chunks: List[TextSpan | str]) -> str:
+    numbered = "\n\n".join(
+        f'Chunk {i}: "{chunk}"' for i, chunk in enumerate(chunks, start=1)
+    )
+    return BATCH_PROMPT.format(
+        count=len(chunks), criteria=CLASSIFICATION_CRITERIA, chunks=numbered
+    )
+
+
+async def _classify_chunk(model, prompt: str, budget: TokenBudget) -> bool:
+    response = await model.ainvoke(prompt)
+    budget.record_usage("filter_chunks", response)
+    return response.contains_biographic_event
+
+
+async def _classify_batch(
+    model, prompt: str, count: int, budget: TokenBudget
+) -> List[bool] | None:
+    """Classify several chunks in one call, or return None if the answer is unusable."""
+    try:
+        response = await model.ainvoke(prompt)
+    except Exception as e:
+        print(f"Batch classification failed: {e!r}")
+        return None
+    budget.record_usage("filter_chunks", response)
+
+    answers = {
+        result.chunk_id: result.contains_biographic_event for result in response.results
+    }
+    if set(answers) != set(range(1, count + 1)):
+        print(
+            f"Batch classification returned chunks {sorted(answers)} "
+            f"for {count} chunks"
+        )
+        return None
+    return [answers[i] for i in range(1, count + 1)]
+
+
+async def check_chunk_for_events(state: ChunkState, config) -> ChunkState:
+    """Check each chunk for biographical events using structured output.
+
+    Chunks are classified ``chunk_classification_batch_size`` at a time in one
+    call, and up to ``chunk_classification_concurrency`` calls run at once. A
+    batch whose answer cannot be parsed is retried one chunk at a time. Chunks
+    the local pre-filter can decide on its own never reach the model, nor do
+    chunks whose classification is already in the chunk memo, and only the
+    calls actually sent are charged to the token budget. Once the budget
+    runs out the remaining chunks, the lowest ranked, are left unclassified.
+    """
+    configurable = Configuration.from_runnable_config(config)
+    batch_size = max(configurable.chunk_classification_batch_size, 1)
+    semaphore = asyncio.Semaphore(max(configurable.chunk_classification_concurrency, 1))
+    all_chunks = state["chunks"]
+
+    name_words, _ = extract_keywords(state.get("research_question", ""))
+    scores = [score_chunk(str(chunk), name_words).score for chunk in all_chunks]
+    decisions = [
+        prefilter_decision(
+            score,
+            configurable.chunk_prefilter_reject_below,
+            configurable.chunk_prefilter_accept_above,
+        )
+        if configurable.chunk_prefilter_enabled
+        else "llm"
+        for score in scores
+    ]
+    llm_indices = [i for i, decision in enumerate(decisions) if decision == "llm"]
+
+    labels: dict[int, bool] = {}
+    memo = get_chunk_memo(config)
+    memo_keys = {}
+    if memo is not None:
+        model_name = configurable.get_llm_chunk_model()
+        memo_keys = {
+            i: ChunkMemo.make_key(
+                "classification",
+                model_name,
+                CLASSIFICATION_VERSION,
+                str(all_chunks[i]),
+            )
+            for i in llm_indices
+        }
+        cached = await asyncio.to_thread(memo.get_many, memo_keys.values())
+        for i, key in memo_keys.items():
+            if key in cached:
+                labels[i] = BiographicEventCheck.model_validate_json(
+                    cached[key]
+                ).contains_biographic_event
+        if llm_indices:
+            print(
+                f"Chunk memo: {len(labels)}/{len(llm_indices)} classifications "
+                f"cached, hit rate {memo.stats.hit_rate:.0%}"
+            )
+
+    model_indices = [i for i in llm_indices if i not in labels]
+    budget = get_token_budget(config)
+
+    # Reserve in rank order before calling the model, so a budget running out
+    # skips the last batches and not whichever call happens to finish last
+    batches: list[tuple[List[int], str]] = []
+    for start in range(0, len(model_indices), batch_size):
+        batch = model_indices[start : start + batch_size]
+        chunks = [all_chunks[i] for i in batch]
+        prompt = _batch_prompt(chunks) if len(batch) > 1 else _chunk_prompt(chunks[0])
+        if not await budget.reserve("filter_chunks", prompt):
+            print(
+                f"Token budget exhausted, classifying {start} "
+                f"of {len(model_indices)} chunks"
+            )
+            break
+        batches.append((batch, prompt))
+
+    single_model = create_llm_chunk_model(config, BiographicEventCheck)
+    batch_model = (
+        create_llm_chunk_model(config, BatchBiographicEventCheck)
+        if any(len(batch) > 1 for batch, _ in batches)
+        else None
+    )
+
+    async def classify(batch: List[int], prompt: str) -> List[bool | None]:
+        async with semaphore:
+            if len(batch) == 1:
+                return [await _classify_chunk(single_model, prompt, budget)]
+            answers = await _classify_batch(batch_model, prompt, len(batch), budget)
+            if answers is not None:
+                return answers
+            # Retry one chunk at a time, each retry charged on its own
+            retries = {}
+            for i in batch:
+                retry = _chunk_prompt(all_chunks[i])
+                if await budget.reserve("filter_chunks", retry):
+                    retries[i] = retry
+            answers = await asyncio.gather(
+                *(_classify_chunk(single_model, p, budget) for p in retries.values())
+            )
+            retried = dict(zip(retries, answers))
+            return [retried.get(i) for i in batch]
+
+    batch_answers = await asyncio.gather(
+        *(classify(batch, prompt) for batch, prompt in batches)
+    )
+
+    classified = []
+    for (batch, _), answers in zip(batches, batch_answers):
+        for i, answer in zip(batch, answers):
+            if answer is not None:
+                labels[i] = answer
+                classified.append(i)
+    if memo is not None and classified:
+        await asyncio.to_thread(
+            memo.set_many,
+            {
+                memo_keys[i]: BiographicEventCheck(contains_biographic_event=labels[i])
+                for i in classified
+            },
+        )
+
+    results = {}
+    for i, (chunk, score, decision) in enumerate(zip(all_chunks, scores, decisions)):
+        span = chunk if isinstance(chunk, TextSpan) else None
+        if decision != "llm":
+            relevant, decided_by = decision == "accept", "prefilter"
+        elif i in labels:
+            relevant, decided_by = labels[i], "llm"
+        else:
+            relevant, decided_by = False, "budget"
+        result = ChunkResult(
+            content=str(chunk),
+            contains_biographic_event=relevant,
+            score=score,
+            decided_by=decided_by,
+            start=span.start if span else None,
+            end=span.end if span else None,
+        )
+        results[f"chunk_{i}"] = result
+
+    if len(llm_indices) < len(all_chunks):
+        print(
+            f"Pre-filter decided {len(all_chunks) - len(llm_indices)}"
+            f"/{len(all_chunks)} chunks without the chunk model"
+        )
+    if configurable.chunk_prefilter_log_path:
+        log_prefilter_records(
+            configurable.chunk_prefilter_log_path,
+            (
+                PrefilterRecord(
+                    score=score,
+                    decision=decision,
+                    label=labels.get(i),
+                    chunk_preview=str(chunk)[:200],
+                )
+                for i, (chunk, score, decision) in enumerate(
+                    zip(all_chunks, scores, decisions)
+                )
+            ),
         )
 
     return {"results": results}
@@ -79,7 +342,7 @@ def create_biographic_event_graph() -> CompiledStateGraph:
     graph.add_node("split_text", split_text)
     graph.add_node("check_events", check_chunk_for_events)
 
-    graph.add_edge(START, "split_text")
+    graph.add_conditional_edges(START, route_chunk_input)
     graph.add_edge("split_text", "check_events")
     graph.add_edge("check_events", END)
 
@@ -0,0 +1,121 @@
+"""Disk-backed memo of per-chunk LLM results.
+
+Classification and extraction results are stored as JSON in a small SQLite
+file, keyed by the SHA-256 of the kind of result, the model, the prompt
+version and the whitespace-normalized chunk text. Identical chunks from
+overlapping pages, repeated runs on the same figure or retries after a crash
+are then answered without calling the model again. Changing a prompt changes
+its version and so never serves stale results. The least recently used
+entries are evicted once the memo exceeds its size budget.
+"""
+
+import hashlib
+import os
+import time
+from typing import Iterable
+
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel
+from src.configuration import Configuration
+from src.core.sqlite_store import LRUStoreStats, SqliteLRUStore
+
+
+class ChunkMemoStats(LRUStoreStats):
+    """Counters describing how many model calls the memo has saved."""
+
+
+def prompt_version(*templates: str) -> str:
+    """Return a short version that changes whenever a prompt template does."""
+    digest = hashlib.sha256("\0".join(templates).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+class ChunkMemo(SqliteLRUStore):
+    """Persistent, size-bounded LRU memo of per-chunk model results."""
+
+    TABLE = "results"
+    COLUMNS = "value TEXT NOT NULL"
+
+    def __init__(self, path: str, max_bytes: int):
+        """Open (or create) the memo database at ``path``.
+
+        A ``max_bytes`` of 0 disables eviction.
+        """
+        super().__init__(path, max_bytes, ChunkMemoStats())
+
+    @staticmethod
+    def make_key(kind: str, model: str, version: str, chunk: str) -> str:
+        """Return the memo key of a chunk's result."""
+        normalized = " ".join(chunk.split())
+        key = "\0".join((kind, model, version, normalized))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        """Return the stored JSON of every key found, counting hits and misses."""
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        found: dict[str, str] = {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT value FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats.misses += 1
+                    continue
+                found[key] = row[0]
+                self.stats.hits += 1
+                self._touch(key, now)
+            self._conn.commit()
+        return found
+
+    def get(self, key: str) -> str | None:
+        """Return the stored JSON for ``key`` or None."""
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: dict[str, BaseModel]) -> None:
+        """Store results and evict old entries if over budget."""
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for key, result in items.items():
+            value = result.model_dump_json()
+            rows.append((key, value, len(value.encode("utf-8")), now))
+
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO results (key, value, size, last_access)
+                VALUES (?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def set(self, key: str, result: BaseModel) -> None:
+        """Store one result."""
+        self.set_many({key: result})
+
+
+# Memos by database path, created lazily
+_chunk_memos: dict[str, ChunkMemo] = {}
+
+
+def get_chunk_memo(config: RunnableConfig | None = None) -> ChunkMemo | None:
+    """Return the shared chunk memo, or None when memoization is disabled."""
+    configurable = Configuration.from_runnable_config(config)
+    if not configurable.chunk_memo_enabled:
+        return None
+
+    path = os.path.join(configurable.chunk_memo_dir, "chunks.sqlite3")
+    if path not in _chunk_memos:
+        _chunk_memos[path] = ChunkMemo(
+            path=path, max_bytes=configurable.chunk_memo_max_bytes
+        )
+    return _chunk_memos[path]
@@ -0,0 +1,198 @@
+"""Local pre-filter that decides obvious chunks without the chunk LLM.
+
+Each chunk gets a score in [0, 1] from cheap signals: years and dates,
+mentions of the subject (name and pronouns), life-event verbs, and sentences
+where a date and a life-event verb appear together. Reference lists are
+full of the same signals, so the score is scaled down by the share of lines
+shaped like citations. Chunks scoring below ``reject_below`` are dropped,
+chunks above ``accept_above`` are kept, and only the ambiguous middle is
+sent to the model.
+
+Decisions can be logged as JSON lines together with the model's label, so
+the thresholds can be evaluated offline with ``evaluate_prefilter``. Run
+with the pre-filter disabled and logging on to collect labels for every
+chunk.
+"""
+
+import json
+import os
+import re
+from typing import Iterable, List, Literal
+
+from pydantic import BaseModel
+from src.core.text_patterns import MONTH_PATTERN, WORD_PATTERN, YEAR_PATTERN
+
+PrefilterDecision = Literal["reject", "accept", "llm"]
+
+LIFE_EVENT_PATTERN = re.compile(
+    r"\b(born|died|death|married|marriage|divorced|wed|moved|relocated|emigrated|"
+    r"settled|graduated|enrolled|studied|attended|awarded|won|received|elected|"
+    r"appointed|hired|joined|founded|published|retired|arrested|imprisoned|"
+    r"buried|baptized|christened)\b",
+    re.IGNORECASE,
+)
+PRONOUN_PATTERN = re.compile(r"\b(he|she|his|her|him|hers)\b", re.IGNORECASE)
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]+")
+# Lines of a bibliography or of footnotes: "Miller, Henry (1934). Title.",
+# ISBNs, DOIs and the "Retrieved"/"Archived" notes of web references
+CITATION_PATTERN = re.compile(
+    r"^\W*[A-Z][\w'-]+,[^\n]*\(\d{4}[a-z]?\)\."
+    r"|\bISBN\b|\bdoi:|\bRetrieved\b|\bArchived\b"
+)
+
+# Contribution of each signal to the score, summing to 1
+EVENT_SENTENCE_WEIGHT = 0.5
+DATE_WEIGHT = 0.3
+EVENT_VERB_WEIGHT = 0.1
+SUBJECT_WEIGHT = 0.1
+# Counts from which a signal contributes its full weight
+EVENT_SENTENCES_FOR_FULL_SCORE = 2
+SIGNALS_FOR_FULL_SCORE = 3
+
+
+class ChunkScore(BaseModel):
+    """The signals found in a chunk and the score they add up to."""
+
+    score: float
+    dates: int
+    event_verbs: int
+    subject_mentions: int
+    event_sentences: int
+    citations: int = 0
+
+
+def score_chunk(chunk: str, name_words: set[str]) -> ChunkScore:
+    """Score how likely a chunk is to contain biographical events."""
+    dates = len(YEAR_PATTERN.findall(chunk)) + len(MONTH_PATTERN.findall(chunk))
+    event_verbs = len(LIFE_EVENT_PATTERN.findall(chunk))
+    subject_mentions = len(PRONOUN_PATTERN.findall(chunk)) + sum(
+        1 for word in WORD_PATTERN.findall(chunk) if word.lower() in name_words
+    )
+    event_sentences = sum(
+        1
+        for sentence in SENTENCE_PATTERN.findall(chunk)
+        if YEAR_PATTERN.search(sentence) and LIFE_EVENT_PATTERN.search(sentence)
+    )
+
+    lines = [line for line in chunk.splitlines() if line.strip()]
+    citations = sum(1 for line in lines if CITATION_PATTERN.search(line))
+
+    score = (
+        EVENT_SENTENCE_WEIGHT
+        * min(event_sentences / EVENT_SENTENCES_FOR_FULL_SCORE, 1.0)
+        + DATE_WEIGHT * min(dates / SIGNALS_FOR_FULL_SCORE, 1.0)
+        + EVENT_VERB_WEIGHT * min(event_verbs / SIGNALS_FOR_FULL_SCORE, 1.0)
+        + SUBJECT_WEIGHT * min(subject_mentions / SIGNALS_FOR_FULL_SCORE, 1.0)
+    )
+    if citations:
+        # Squared, so a chunk of references scores zero while prose with a
+        # footnote or two barely moves
+        score *= 1 - (citations / len(lines)) ** 2
+    return ChunkScore(
+        score=round(score, 4),
+        dates=dates,
+        event_verbs=event_verbs,
+        subject_mentions=subject_mentions,
+        event_sentences=event_sentences,
+        citations=citations,
+    )
+
+
+def rank_chunks(scores: List[float], limit: int = 0) -> List[int]:
+    """Return the indices of the ``limit`` highest scores, best first.
+
+    Ties keep page order, so earlier chunks win among equal scores. A
+    ``limit`` of 0 ranks all of them.
+    """
+    ranked = sorted(range(len(scores)), key=lambda i: -scores[i])
+    return ranked[:limit] if limit > 0 else ranked
+
+
+def prefilter_decision(
+    score: float, reject_below: float, accept_above: float
+) -> PrefilterDecision:
+    """Decide a chunk locally, or leave it to the model."""
+    if score < reject_below:
+        return "reject"
+    if score > accept_above:
+        return "accept"
+    return "llm"
+
+
+class PrefilterRecord(BaseModel):
+    """One logged chunk decision."""
+
+    score: float
+    decision: PrefilterDecision
+    # The chunk model's answer, None when the chunk was decided locally
+    label: bool | None = None
+    chunk_preview: str = ""
+
+
+def log_prefilter_records(path: str, records: Iterable[PrefilterRecord]) -> None:
+    """Append records to a JSON lines log."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(record.model_dump_json() + "\n")
+
+
+def load_prefilter_records(path: str) -> List[PrefilterRecord]:
+    """Read a JSON lines log written by ``log_prefilter_records``."""
+    with open(path, encoding="utf-8") as f:
+        return [PrefilterRecord(**json.loads(line)) for line in f if line.strip()]
+
+
+class PrefilterEvaluation(BaseModel):
+    """How thresholds would have performed on labelled chunks."""
+
+    labelled: int = 0
+    rejected: int = 0
+    accepted: int = 0
+    # Share of rejected chunks the model also found irrelevant
+    reject_precision: float = 1.0
+    # Share of accepted chunks the model also found relevant
+    accept_precision: float = 1.0
+    # Share of relevant chunks that were not rejected
+    relevant_recall: float = 1.0
+    # Share of model calls the pre-filter would have saved
+    llm_calls_saved: float = 0.0
+
+
+def evaluate_prefilter(
+    records: Iterable[PrefilterRecord], reject_below: float, accept_above: float
+) -> PrefilterEvaluation:
+    """Evaluate thresholds against the model labels of logged chunks."""
+    labelled = [record for record in records if record.label is not None]
+    if not labelled:
+        return PrefilterEvaluation()
+
+    decisions = [
+        (prefilter_decision(record.score, reject_below, accept_above), record.label)
+        for record in labelled
+    ]
+    rejected = [label for decision, label in decisions if decision == "reject"]
+    accepted = [label for decision, label in decisions if decision == "accept"]
+    relevant = [decision for decision, label in decisions if label]
+
+    return PrefilterEvaluation(
+        labelled=len(labelled),
+        rejected=len(rejected),
+        accepted=len(accepted),
+        reject_precision=(
+            sum(1 for label in rejected if not label) / len(rejected)
+            if rejected
+            else 1.0
+        ),
+        accept_precision=(
+            sum(1 for label in accepted if label) / len(accepted) if accepted else 1.0
+        ),
+        relevant_recall=(
+            sum(1 for decision in relevant if decision != "reject") / len(relevant)
+            if relevant
+            else 1.0
+        ),
+        llm_calls_saved=(len(rejected) + len(accepted)) / len(labelled),
+    )
@@ -0,0 +1,95 @@
+"""Local lexical ranking of a page's chunks against the research question.
+
+Chunks are scored with BM25 against the words of the research question,
+with the subject's name words weighted up, so a focused question ("later
+career in Paris") ranks the matching part of a long page first. The BM25
+score is normalized per page and blended with the pre-filter score, which
+still favours chunks dense in dated life events when the question says
+little. No model is called.
+"""
+
+import math
+from collections import Counter
+from typing import List
+
+from src.core.text_patterns import STOPWORDS, WORD_PATTERN
+from src.research_events.chunk_prefilter import score_chunk
+from src.url_crawler.windowing import extract_keywords
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Query weight of a name word relative to another keyword
+NAME_WEIGHT = 2.0
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of ``text`` without stopwords and very short words."""
+    return [
+        word
+        for word in (match.lower() for match in WORD_PATTERN.findall(text))
+        if len(word) >= 3 and word not in STOPWORDS
+    ]
+
+
+def bm25_scores(chunks: List[str], query: dict[str, float]) -> List[float]:
+    """Score every chunk against weighted query terms, with IDF over the page."""
+    documents = [Counter(tokenize(chunk)) for chunk in chunks]
+    if not documents or not query:
+        return [0.0] * len(chunks)
+
+    average_length = sum(sum(doc.values()) for doc in documents) / len(documents)
+    average_length = max(average_length, 1.0)
+    document_frequency = Counter(
+        term for doc in documents for term in query if term in doc
+    )
+    idf = {
+        term: math.log(
+            1 + (len(documents) - frequency + 0.5) / (frequency + 0.5)
+        )
+        for term, frequency in document_frequency.items()
+    }
+
+    scores = []
+    for doc in documents:
+        length_norm = BM25_K1 * (
+            1 - BM25_B + BM25_B * sum(doc.values()) / average_length
+        )
+        scores.append(
+            sum(
+                weight * idf[term] * doc[term] * (BM25_K1 + 1)
+                / (doc[term] + length_norm)
+                for term, weight in query.items()
+                if term in doc
+            )
+        )
+    return scores
+
+
+def question_query(research_question: str) -> dict[str, float]:
+    """Weighted query terms of the research question."""
+    name_words, keywords = extract_keywords(research_question)
+    query = {term: 1.0 for term in keywords}
+    query.update({term: NAME_WEIGHT for term in name_words})
+    return query
+
+
+def relevance_scores(
+    chunks: List[str], research_question: str, query_weight: float = 0.5
+) -> List[float]:
+    """Scores in [0, 1] blending the question match and the pre-filter score.
+
+    ``query_weight`` is the share of the BM25 match against the question, the
+    rest goes to the pre-filter score.
+    """
+    name_words, _ = extract_keywords(research_question)
+    prefilter = [score_chunk(chunk, name_words).score for chunk in chunks]
+    lexical = bm25_scores(chunks, question_query(research_question))
+    best = max(lexical, default=0.0)
+    if best <= 0:
+        # Nothing on the page matches the question, rank by events alone
+        return prefilter
+    return [
+        query_weight * match / best + (1 - query_weight) * score
+        for match, score in zip(lexical, prefilter)
+    ]
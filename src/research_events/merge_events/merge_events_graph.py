@@ -1,21 +1,43 @@
+import asyncio
+from contextlib import aclosing
 from typing import List, Literal, TypedDict
 
 from langchain_core.tools import tool
 from langgraph.graph import START, StateGraph
 from langgraph.graph.state import Command, RunnableConfig
-from langgraph.pregel.main import asyncio
 from pydantic import BaseModel, Field
 from src.configuration import Configuration
-from src.llm_service import create_llm_with_tools
-from src.research_events.chunk_graph import create_biographic_event_graph
+from src.core.token_budget import get_token_budget
+from src.llm_service import create_llm_structured_model, create_llm_with_tools
+from src.research_events.chunk_graph import graph as biographic_event_graph
+from src.research_events.chunk_memo import ChunkMemo, get_chunk_memo, prompt_version
+from src.research_events.chunk_prefilter import rank_chunks
+from src.research_events.chunk_ranking import relevance_scores
 from src.research_events.merge_events.prompts import (
     EXTRACT_AND_CATEGORIZE_PROMPT,
     MERGE_EVENTS_TEMPLATE,
 )
-from src.research_events.merge_events.utils import ensure_categories_with_events
+from src.research_events.merge_events.utils import (
+    ensure_categories_with_events,
+    ensure_event_store,
+    ensure_pydantic_model,
+)
 from src.services.event_service import EventService
+from src.services.event_store import (
+    EventRecord,
+    EventStore,
+    parse_bullets,
+    year_window,
+)
 from src.state import CategoriesWithEvents
-from src.url_crawler.utils import chunk_text_by_tokens
+from src.url_crawler.chunking import (
+    TextSpan,
+    chunk_segments_by_tokens,
+    chunk_text_by_tokens,
+)
+from src.url_crawler.resilience import ScrapeError
+from src.url_crawler.tokenization import get_tokenization_service
+from src.url_crawler.utils import stream_page_segments
 from src.utils import get_langfuse_handler
 
 
@@ -40,49 +62,121 @@ class IrrelevantChunk(BaseModel):
     """The chunk contains NO biographical events relevant to the research question."""
 
 
+# Memoized extractions are only reused while the prompt stays the same
+EXTRACTION_VERSION = prompt_version(EXTRACT_AND_CATEGORIZE_PROMPT)
+
+
 class InputMergeEventsState(TypedDict):
     """The complete state for the enhanced event merging sub-graph."""
 
     existing_events: CategoriesWithEvents
+    # The existing events as typed records. Callers that pass the store get
+    # only the store back, existing_events is neither read nor rendered
+    event_store: EventStore
     extracted_events: str
+    # Page the events come from, recorded as their source. Streamed into the
+    # chunker when its text is not passed in extracted_events
+    url: str
     research_question: str
+    # Stop after categorizing the extracted events, the caller merges them later
+    extract_only: bool
+    # Already categorized events, skips extraction and goes straight to the merge
+    extracted_events_categorized: CategoriesWithEvents
+    # The same events as typed records, when the caller has them
+    extracted_event_store: EventStore
 
 
 class MergeEventsState(InputMergeEventsState):
-    text_chunks: List[str]  # token-based chunks
+    text_chunks: List[TextSpan | str]  # token-based chunks of extracted_events
     categorized_chunks: List[CategoriesWithEvents]  # results per chunk
-    extracted_events_categorized: CategoriesWithEvents
 
 
 class OutputMergeEventsState(TypedDict):
     existing_events: CategoriesWithEvents  # includes the existing events + the events from the new events
+    event_store: EventStore  # the same, as typed records
+    extracted_event_store: EventStore
 
 
-async def split_events(
+def route_merge_input(
     state: MergeEventsState,
+) -> Literal["split_events", "combine_new_and_original_events"]:
+    """Skip extraction when the caller already provides categorized events."""
+    if (
+        (
+            state.get("extracted_events_categorized")
+            or state.get("extracted_event_store")
+        )
+        and not state.get("extracted_events", "").strip()
+        and not state.get("url")
+    ):
+        return "combine_new_and_original_events"
+    return "split_events"
+
+
+async def split_events(
+    state: MergeEventsState, config: RunnableConfig
 ) -> Command[Literal["filter_chunks", "__end__"]]:
-    """Use token-based chunking from URL crawler and filter for biographical events"""
+    """Use token-based chunking from URL crawler and filter for biographical events.
+
+    Given a ``url`` instead of the page text, the page is streamed into the
+    chunker paragraph by paragraph, and cleaning and tokenizing stop once
+    ``max_page_chunks`` chunks are full, so the page never enters the state.
+    """
     extracted_events = state.get("extracted_events", "")
+    url = state.get("url", "")
+
+    # Chunk the whole page so relevance ranking can pick chunks from anywhere
+    # in it, stopping only at max_page_chunks on pathologically long pages
+    configurable = Configuration.from_runnable_config(config)
+    if extracted_events.strip():
+        spans = await chunk_text_by_tokens(
+            extracted_events,
+            chunk_size=configurable.default_chunk_size,
+            overlap_size=configurable.default_overlap_size,
+        )
+        # Chunks stay spans into the page until a prompt is built from them
+        chunks = spans[: configurable.max_page_chunks]
+    elif url:
+        stream = chunk_segments_by_tokens(
+            stream_page_segments(url, config),
+            chunk_size=configurable.default_chunk_size,
+            overlap_size=configurable.default_overlap_size,
+            max_chunks=configurable.max_page_chunks,
+        )
+        try:
+            async with aclosing(stream):
+                chunks = [chunk async for chunk in stream]
+        except ScrapeError as e:
+            # One page failing does not fail the research, it just adds no events
+            print(f"Skipping {url}: {e.reason}")
+            chunks = []
+    else:
+        chunks = []
 
-    if not extracted_events.strip():
+    if not chunks:
         # No content to process
         return Command(
             goto="__end__",
             update={"text_chunks": [], "categorized_chunks": []},
         )
 
-    chunks = await chunk_text_by_tokens(extracted_events)
-
     return Command(
         goto="filter_chunks",
-        update={"text_chunks": chunks[0:20], "categorized_chunks": []},
+        update={"text_chunks": chunks, "categorized_chunks": []},
     )
 
 
 async def filter_chunks(
     state: MergeEventsState, config: RunnableConfig
 ) -> Command[Literal["extract_and_categorize_chunk", "__end__"]]:
-    """Filter chunks to only process those containing biographical events"""
+    """Filter chunks to only process those containing biographical events.
+
+    Chunks are ranked across the whole page by how well they match the
+    research question and by their pre-filter score, and only the
+    ``max_chunks`` best are classified. Of the chunks classified as relevant,
+    at most ``max_extracted_chunks`` scoring at least ``extraction_min_score``
+    go on to extraction, the best ranked first.
+    """
     chunks = state.get("text_chunks", [])
 
     if not chunks:
@@ -90,28 +184,46 @@ async def filter_chunks(
             goto="__end__",
         )
 
-    # Use chunk graph to filter for biographical events
-    chunk_graph = create_biographic_event_graph()
-
     configurable = Configuration.from_runnable_config(config)
-    if len(chunks) > configurable.max_chunks:
-        # To avoid recursion issues, set max chunks
-        chunks = chunks[: configurable.max_chunks]
-
-    # Process each chunk through the biographic event detection graph
-    relevant_chunks = []
-    for chunk in chunks:
-        chunk_result = await chunk_graph.ainvoke({"text": chunk}, config)
-
-        # Check if any chunk contains biographical events
-        has_events = any(
-            result.contains_biographic_event
-            for result in chunk_result["results"].values()
-        )
-        print(f"contains_biographic_event: {has_events}")
-
-        if has_events:
-            relevant_chunks.append(chunk)
+    budget = get_token_budget(config)
+    research_question = state.get("research_question", "")
+    max_chunks = configurable.max_chunks
+    if budget.is_low:
+        # Spend what is left on the highest scoring chunks only
+        max_chunks = max(max_chunks // 2, 1)
+    ranking = relevance_scores(
+        [str(chunk) for chunk in chunks],
+        research_question,
+        configurable.chunk_ranking_query_weight,
+    )
+    # Best ranked first, so a budget running out keeps the most relevant
+    candidates = rank_chunks(ranking, max_chunks)
+    chunks = [chunks[i] for i in candidates]
+
+    # Classify all chunks concurrently in one run of the biographic event graph,
+    # which charges the token budget for the model calls it actually makes
+    chunk_result = await biographic_event_graph.ainvoke(
+        {"chunks": chunks, "research_question": research_question},
+        config,
+    )
+    results = [chunk_result["results"][f"chunk_{i}"] for i in range(len(chunks))]
+    # Chunks stay in rank order, so extraction also handles the best first
+    relevant_chunks = [
+        chunk
+        for chunk, result in zip(chunks, results)
+        if result.contains_biographic_event
+        and (result.score or 0.0) >= configurable.extraction_min_score
+    ]
+    relevant_count = len(relevant_chunks)
+    if configurable.max_extracted_chunks > 0:
+        relevant_chunks = relevant_chunks[: configurable.max_extracted_chunks]
+    budget.record_saved(
+        "extract_and_categorize_chunk", len(chunks) - len(relevant_chunks)
+    )
+    print(
+        f"contains_biographic_event: {relevant_count}/{len(chunks)} chunks, "
+        f"extracting {len(relevant_chunks)}"
+    )
 
     if not relevant_chunks:
         # No relevant chunks found
@@ -119,35 +231,12 @@ async def filter_chunks(
 
     return Command(
         goto="extract_and_categorize_chunk",
-        update={"text_chunks": chunks, "categorized_chunks": []},
+        update={"text_chunks": relevant_chunks, "categorized_chunks": []},
     )
 
 
-async def extract_and_categorize_chunk(
-    state: MergeEventsState, config: RunnableConfig
-) -> Command[Literal["extract_and_categorize_chunk", "merge_categorizations"]]:
-    """Combined extraction and categorization"""
-    chunks = state.get("text_chunks", [])
-    categorized_chunks = state.get("categorized_chunks", [])
-
-    if len(categorized_chunks) >= len(chunks):
-        # all categorized_chunks done → move to merge
-        return Command(goto="merge_categorizations")
-
-    # take next chunk
-    chunk = chunks[len(categorized_chunks)]
-    research_question = state.get("research_question", "")
-
-    prompt = EXTRACT_AND_CATEGORIZE_PROMPT.format(
-        # research_question=research_question,
-        text_chunk=chunk
-    )
-
-    tools = [tool(RelevantEventsCategorized), tool(IrrelevantChunk)]
-    model = create_llm_with_tools(tools=tools, config=config)
-    response = await model.ainvoke(prompt)
-
-    # Parse response
+def parse_categorized_response(response) -> CategoriesWithEvents:
+    """Turn the extraction model's tool call into categorized events."""
     if (
         response.tool_calls
         and response.tool_calls[0]["name"] == "RelevantEventsCategorized"
@@ -158,100 +247,355 @@ async def extract_and_categorize_chunk(
             k: "\n".join(v) if isinstance(v, list) else v
             for k, v in categorized_data.items()
         }
-        categorized = CategoriesWithEvents(**categorized_data)
-    else:
-        categorized = CategoriesWithEvents(early="", personal="", career="", legacy="")
+        return CategoriesWithEvents(**categorized_data)
+    return CategoriesWithEvents(early="", personal="", career="", legacy="")
+
+
+async def extract_and_categorize_chunk(
+    state: MergeEventsState, config: RunnableConfig
+) -> Command[Literal["merge_categorizations"]]:
+    """Extract and categorize the events of all chunks.
+
+    Chunks are extracted concurrently, up to ``extraction_concurrency`` calls
+    at once, and the results keep the order of the chunks. Memoized chunks
+    skip the model, and once the budget runs out the remaining chunks, the
+    least relevant ones, are not extracted.
+    """
+    chunks = state.get("text_chunks", [])
+    if not chunks:
+        return Command(goto="merge_categorizations", update={"categorized_chunks": []})
+
+    budget = get_token_budget(config)
+    configurable = Configuration.from_runnable_config(config)
+    model_name = budget.model_for(
+        configurable.get_llm_with_tools_model(), configurable.get_llm_chunk_model()
+    )
+
+    categorized: list[CategoriesWithEvents | None] = [None] * len(chunks)
+    memo = get_chunk_memo(config)
+    memo_keys = [
+        ChunkMemo.make_key("extraction", model_name, EXTRACTION_VERSION, str(chunk))
+        for chunk in chunks
+    ]
+    if memo is not None:
+        cached = await asyncio.to_thread(memo.get_many, memo_keys)
+        for i, key in enumerate(memo_keys):
+            if key in cached:
+                categorized[i] = CategoriesWithEvents.model_validate_json(cached[key])
+        hits = sum(1 for result in categorized if result is not None)
+        budget.record_saved("extract_and_categorize_chunk", hits)
+        print(
+            f"Chunk memo: {hits}/{len(chunks)} extractions cached, "
+            f"hit rate {memo.stats.hit_rate:.0%}"
+        )
+
+    # Reserve in rank order before calling the model, so a budget running out
+    # drops the last chunks and not whichever call happens to finish last
+    prompts: dict[int, str] = {}
+    for i, chunk in enumerate(chunks):
+        if categorized[i] is not None:
+            continue
+        prompt = EXTRACT_AND_CATEGORIZE_PROMPT.format(text_chunk=chunk)
+        if not await budget.reserve("extract_and_categorize_chunk", prompt):
+            print(
+                f"Token budget exhausted, extracting {len(prompts)} more "
+                f"of {len(chunks)} chunks"
+            )
+            break
+        prompts[i] = prompt
+
+    if prompts:
+        tools = [tool(RelevantEventsCategorized), tool(IrrelevantChunk)]
+        model = create_llm_with_tools(tools=tools, config=config, model_name=model_name)
+        semaphore = asyncio.Semaphore(max(configurable.extraction_concurrency, 1))
+
+        async def extract(prompt: str) -> CategoriesWithEvents:
+            async with semaphore:
+                response = await model.ainvoke(prompt)
+            budget.record_usage("extract_and_categorize_chunk", response)
+            return parse_categorized_response(response)
+
+        extracted = await asyncio.gather(*(extract(p) for p in prompts.values()))
+        for i, result in zip(prompts, extracted):
+            categorized[i] = result
+        if memo is not None:
+            await asyncio.to_thread(
+                memo.set_many,
+                {memo_keys[i]: categorized[i] for i in prompts},
+            )
 
     return Command(
-        goto="extract_and_categorize_chunk",  # loop until all chunks processed
-        update={"categorized_chunks": categorized_chunks + [categorized]},
+        goto="merge_categorizations",
+        update={
+            "categorized_chunks": [
+                result for result in categorized if result is not None
+            ]
+        },
     )
 
 
 async def merge_categorizations(
     state: MergeEventsState,
-) -> Command[Literal["combine_new_and_original_events"]]:
-    """Merge all categorized chunks into a single CategoriesWithEvents"""
+) -> Command[Literal["combine_new_and_original_events", "__end__"]]:
+    """Merge all categorized chunks into one store, dropping repeated events."""
     results = state.get("categorized_chunks", [])
+    source = state.get("url") or None
 
-    merged = EventService.merge_categorized_events(results)
+    merged = EventService.merge_event_stores(
+        [EventStore.from_categories(result, source) for result in results]
+    )
 
     return Command(
-        goto="combine_new_and_original_events",
-        update={"extracted_events_categorized": merged},
+        goto="__end__"
+        if state.get("extract_only")
+        else "combine_new_and_original_events",
+        update={"extracted_event_store": merged},
     )
 
 
+def _nearest_that_fit(
+    record: EventRecord,
+    events: List[EventRecord],
+    room: int,
+    tokens: dict[int, int],
+) -> List[EventRecord]:
+    """Pick the events closest in years to ``record`` that fit in ``room`` tokens.
+
+    The chosen events keep their order in ``events``.
+    """
+
+    def distance(event: EventRecord) -> float:
+        if event.year is None or record.year is None:
+            return float("inf")
+        return abs(event.year - record.year)
+
+    chosen: set[int] = set()
+    size = 0
+    for event in sorted(events, key=distance):
+        if size + tokens[id(event)] <= room:
+            chosen.add(id(event))
+            size += tokens[id(event)]
+    return [event for event in events if id(event) in chosen]
+
+
+async def plan_merge_groups(
+    new_events: List[EventRecord],
+    existing_events: List[EventRecord],
+    margin: int | None,
+    max_tokens: int,
+) -> tuple[list[tuple[List[EventRecord], List[EventRecord]]], List[EventRecord]]:
+    """Split a category's merge into groups of bounded size.
+
+    New events are taken in chronological order, each bringing the existing
+    events within ``margin`` years of it that no earlier group took, or all
+    of them when ``margin`` is None. A group is closed once its prompt would
+    exceed ``max_tokens``, counting the merge template, so every merge
+    prompt stays bounded however many events a page adds. A new event whose
+    window alone holds too many existing events is merged with the nearest
+    of them that fit, and the others are left as they are, so the bound also
+    holds when the timeline is crowded around a single year. Every new event
+    is in exactly one group. Returns the groups, as (new events, existing
+    events), and the existing events no group needs.
+    """
+    window = year_window(new_events, margin) if margin is not None else None
+    candidates = [
+        old for old in existing_events if window is None or old.year in window
+    ]
+    records = new_events + candidates
+    # Events are counted as the bullets the prompt renders them as
+    texts = [f"- {record.name}" for record in records]
+    template = MERGE_EVENTS_TEMPLATE.format(original="No events", new="")
+    if max_tokens <= 0 or sum(map(len, texts)) + len(template) <= max_tokens:
+        # Tokens never outnumber characters, so everything fits in one group
+        overhead, counts = 0, [0] * len(texts)
+    else:
+        overhead, *counts = await get_tokenization_service().count_tokens(
+            [template, *texts]
+        )
+    tokens = {id(record): count for record, count in zip(records, counts)}
+    room = max_tokens - overhead
+
+    groups: list[tuple[List[EventRecord], List[EventRecord]]] = []
+    taken: set[int] = set()
+    new_group: List[EventRecord] = []
+    old_group: List[EventRecord] = []
+    size = 0
+    for record in new_events:
+        window = year_window([record], margin) if margin is not None else None
+        overlapping = [
+            old
+            for old in candidates
+            if (window is None or old.year in window) and id(old) not in taken
+        ]
+        added = tokens[id(record)] + sum(tokens[id(old)] for old in overlapping)
+        if max_tokens > 0 and added > room:
+            overlapping = _nearest_that_fit(
+                record, overlapping, room - tokens[id(record)], tokens
+            )
+            added = tokens[id(record)] + sum(tokens[id(old)] for old in overlapping)
+        if new_group and max_tokens > 0 and size + added > room:
+            groups.append((new_group, old_group))
+            new_group, old_group, size = [], [], 0
+        new_group.append(record)
+        old_group.extend(overlapping)
+        taken.update(id(old) for old in overlapping)
+        size += added
+    if new_group:
+        groups.append((new_group, old_group))
+
+    untouched = [old for old in existing_events if id(old) not in taken]
+    return groups, untouched
+
+
 async def combine_new_and_original_events(
     state: MergeEventsState, config: RunnableConfig
 ) -> Command:
-    """Merge original and new events for each category using an LLM."""
+    """Merge original and new events for each category using an LLM.
+
+    New events that duplicate a known event of the same year, exactly or
+    with a token-set similarity of at least ``merge_dedup_threshold``, are
+    dropped locally first. Categories with no new events left keep their
+    existing events without a model call.
+
+    With ``incremental_merge`` the model only sees the new events and the
+    existing events within ``merge_window_years`` of them, and the rest of
+    the category is spliced back in locally, so the prompt does not grow
+    with the timeline. Without it the model sees the whole category. In both
+    modes merges larger than ``merge_group_max_tokens`` are split into
+    chronological groups, and all groups of all categories are merged
+    concurrently.
+
+    Events are read from and written to the typed stores; bullet text is
+    only rendered for the prompts, and for callers that passed markdown
+    ``existing_events`` instead of an ``event_store``.
+    """
     print("Combining new and original events...")
 
-    existing_events_raw = state.get(
-        "existing_events",
-        CategoriesWithEvents(early="", personal="", career="", legacy=""),
-    )
-    new_events_raw = state.get(
-        "extracted_events_categorized",
-        CategoriesWithEvents(early="", personal="", career="", legacy=""),
-    )
-
     # Convert to proper Pydantic models if they're dicts
-    existing_events = ensure_categories_with_events(existing_events_raw)
-    new_events = ensure_categories_with_events(new_events_raw)
+    existing_events = ensure_categories_with_events(
+        state.get("existing_events", CategoriesWithEvents())
+    )
+    existing_store = ensure_event_store(state)
+    render_existing_events = not state.get("event_store")
+    if state.get("extracted_event_store"):
+        new_store = ensure_pydantic_model(state["extracted_event_store"], EventStore)
+    else:
+        new_store = EventStore.from_categories(
+            ensure_categories_with_events(
+                state.get("extracted_events_categorized", CategoriesWithEvents())
+            )
+        )
 
-    if not new_events or not any(
-        getattr(new_events, cat, "").strip()
-        for cat in CategoriesWithEvents.model_fields.keys()
-    ):
+    if not new_store:
         print("No new events found. Keeping existing events.")
-        return Command(goto="__end__", update={"existing_events": existing_events})
+        update = {"event_store": existing_store}
+        if render_existing_events:
+            update["existing_events"] = existing_events
+        return Command(goto="__end__", update=update)
 
-    merge_tasks = []
+    budget = get_token_budget(config)
+    configurable = Configuration.from_runnable_config(config)
+
+    # Known events, growing with the new ones so repeats among them drop too
+    known = EventStore(records=existing_store.records)
+    # Per category, the events left alone and the groups to merge
+    untouched_events: dict[str, List[EventRecord]] = {}
+    merge_groups: list[tuple[str, List[EventRecord], List[EventRecord]]] = []
+    duplicates = 0
     categories = CategoriesWithEvents.model_fields.keys()
 
     for category in categories:
-        # Now you can safely use getattr since they're guaranteed to be Pydantic models
-        existing_text = getattr(existing_events, category, "").strip()
-        new_text = getattr(new_events, category, "").strip()
-
-        if not (existing_text or new_text):
-            continue  # nothing to merge in this category
+        novel = EventStore()
+        for record in new_store.in_category(category):
+            if known.find_duplicate(record, configurable.merge_dedup_threshold):
+                duplicates += 1
+                continue
+            known.add(record)
+            novel.add(record)
+        if not novel:
+            if new_store.in_category(category):
+                budget.record_saved("combine_new_and_original_events", 1)
+            continue  # nothing new in this category
+
+        groups, untouched = await plan_merge_groups(
+            novel.in_category(category),
+            existing_store.in_category(category),
+            configurable.merge_window_years if configurable.incremental_merge else None,
+            configurable.merge_group_max_tokens,
+        )
+        untouched_events[category] = untouched
+        merge_groups.extend((category, new, old) for new, old in groups)
 
-        existing_display = existing_text if existing_text else "No events"
-        new_display = new_text if new_text else "No events"
+    print(f"Dropped {duplicates} duplicate events before merging")
 
+    merge_tasks = []
+    merged_groups: dict[str, list[List[EventRecord]]] = {}
+    for category, new, old in merge_groups:
         prompt = MERGE_EVENTS_TEMPLATE.format(
-            original=existing_display, new=new_display
+            original=EventStore(records=old).render(category) or "No events",
+            new=EventStore(records=new).render(category),
         )
+        if not await budget.reserve("combine_new_and_original_events", prompt):
+            # Out of budget: keep the new events unmerged rather than lose them
+            merged_groups.setdefault(category, []).append(old + new)
+            continue
+        merge_tasks.append((category, prompt, EventStore(records=old + new)))
 
+    if merge_tasks:
         # Use regular structured model for merging (not tools model)
-        from src.llm_service import create_llm_structured_model
-
-        merge_tasks.append(
-            (category, create_llm_structured_model(config=config).ainvoke(prompt))
+        model = create_llm_structured_model(
+            config=config,
+            model_name=budget.model_for(
+                configurable.get_llm_structured_model(),
+                configurable.get_llm_chunk_model(),
+            ),
         )
-
-    final_merged_dict = {}
-    if merge_tasks:
-        categories, tasks = zip(*merge_tasks)
-        responses = await asyncio.gather(*tasks)
-        final_merged_dict = {
-            cat: resp.content for cat, resp in zip(categories, responses)
-        }
-
-    # Ensure all categories are included
-    for category in CategoriesWithEvents.model_fields.keys():
-        if category not in final_merged_dict:
-            final_merged_dict[category] = getattr(existing_events, category, "")
-
-    final_merged_output = CategoriesWithEvents(**final_merged_dict)
-    return Command(goto="__end__", update={"existing_events": final_merged_output})
+        task_categories, prompts, inputs = zip(*merge_tasks)
+        # All groups of all categories are merged concurrently
+        responses = await asyncio.gather(*(model.ainvoke(p) for p in prompts))
+        for category, group_inputs, response in zip(task_categories, inputs, responses):
+            budget.record_usage("combine_new_and_original_events", response)
+            records = []
+            for text in parse_bullets(response.content):
+                record = EventRecord.from_text(text, category)
+                # The merged wording keeps the source of the event it came from
+                original = group_inputs.find_duplicate(record)
+                if original is not None:
+                    record.source = original.source
+                records.append(record)
+            merged_groups.setdefault(category, []).append(records)
+        if len(merge_tasks) > len(set(task_categories)):
+            print(f"Merged {len(merge_tasks)} token-bounded groups concurrently")
+
+    # Splice the merged groups back between the events they left alone
+    merged_store = EventStore()
+    for category in categories:
+        if category not in merged_groups:
+            merged_store.extend(existing_store.in_category(category))
+            continue
+        merged_store.extend(untouched_events[category])
+        for records in merged_groups[category]:
+            merged_store.extend(records)
+
+    update = {"event_store": merged_store}
+    if render_existing_events:
+        # Categories without a merge keep their text as it was
+        update["existing_events"] = CategoriesWithEvents(
+            **{
+                category: merged_store.render(category)
+                if category in merged_groups
+                else getattr(existing_events, category, "")
+                for category in categories
+            }
+        )
+    return Command(goto="__end__", update=update)
 
 
 merge_events_graph_builder = StateGraph(
-    MergeEventsState, input_schema=InputMergeEventsState, config_schema=Configuration
+    MergeEventsState,
+    input_schema=InputMergeEventsState,
+    output_schema=OutputMergeEventsState,
+    config_schema=Configuration,
 )
 
 merge_events_graph_builder.add_node("split_events", split_events)
@@ -264,12 +608,9 @@ merge_events_graph_builder.add_node(
     "combine_new_and_original_events", combine_new_and_original_events
 )
 
-merge_events_graph_builder.add_edge(START, "split_events")
+merge_events_graph_builder.add_conditional_edges(START, route_merge_input)
 
 
 merge_events_app = merge_events_graph_builder.compile().with_config(
-    {
-        "callbacks": [get_langfuse_handler()],
-        "recursionLimit": 200,
-    },
+    {"callbacks": [get_langfuse_handler()]}
 )
@@ -1,6 +1,7 @@
 from typing import Type, TypeVar, Union
 
 from pydantic import BaseModel
+from src.services.event_store import EventStore
 from src.state import CategoriesWithEvents
 
 T = TypeVar("T", bound=BaseModel)
@@ -43,3 +44,17 @@ def ensure_categories_with_events(
 ) -> "CategoriesWithEvents":
     """Specifically converts data to CategoriesWithEvents model."""
     return ensure_pydantic_model(data, CategoriesWithEvents)
+
+
+def ensure_event_store(state: dict) -> EventStore:
+    """Return the state's event store, parsing existing_events when it has none.
+
+    Graphs keep the store once they have it, so the bullets are parsed once.
+    """
+    if state.get("event_store"):
+        return ensure_pydantic_model(state["event_store"], EventStore)
+    return EventStore.from_categories(
+        ensure_categories_with_events(
+            state.get("existing_events", CategoriesWithEvents())
+        )
+    )
@@ -1,13 +1,20 @@
-from typing import Literal, TypedDict
+import operator
+from typing import Annotated, Literal, TypedDict
 
 from langchain_tavily import TavilySearch
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import RunnableConfig
-from langgraph.types import Command
+from langgraph.types import Command, Send
 from pydantic import BaseModel, Field
 from src.configuration import Configuration
 from src.llm_service import create_llm_structured_model
 from src.research_events.merge_events.merge_events_graph import merge_events_app
+from src.research_events.merge_events.utils import (
+    ensure_event_store,
+    ensure_pydantic_model,
+)
+from src.services.event_service import EventService
+from src.services.event_store import EventStore
 from src.services.url_service import URLService
 from src.state import CategoriesWithEvents
 from src.url_crawler.url_krawler_graph import url_crawler_app
@@ -17,17 +24,37 @@ from src.utils import get_langfuse_handler
 class InputResearchEventsState(TypedDict):
     research_question: str
     existing_events: CategoriesWithEvents
+    # The existing events as typed records. Callers that pass the store get
+    # only the store back, existing_events is neither read nor rendered
+    event_store: EventStore
     used_domains: list[str]
 
 
+class UrlResult(TypedDict):
+    """The events extracted from one crawled URL."""
+
+    url: str
+    extracted_event_store: EventStore
+
+
 class ResearchEventsState(InputResearchEventsState):
     urls: list[str]
     # Add this temporary field
     extracted_events: str
+    # Results of the parallel crawls, collected before the single final merge
+    url_results: Annotated[list[UrlResult], operator.add]
+
+
+class CrawlUrlTaskState(TypedDict):
+    """The input of one parallel crawl and extraction branch."""
+
+    url: str
+    research_question: str
 
 
 class OutputResearchEventsState(TypedDict):
     existing_events: CategoriesWithEvents
+    event_store: EventStore
     used_domains: list[str]
 
 
@@ -113,10 +140,14 @@ def updateUrlList(
 
 def should_process_url_router(
     state: ResearchEventsState,
-) -> Command[Literal["crawl_url", "__end__"]]:
+    config: RunnableConfig,
+) -> Command[Literal["crawl_url", "crawl_and_extract_url", "__end__"]]:
     urls = state.get("urls", [])
     used_domains = state.get("used_domains", [])
 
+    if urls and Configuration.from_runnable_config(config).parallel_url_crawling:
+        return fan_out_urls(state)
+
     if urls and len(urls) > 0:
         domain = URLService.extract_domain(urls[0])
         if domain in used_domains:
@@ -137,6 +168,125 @@ def should_process_url_router(
         )
 
 
+def fan_out_urls(
+    state: ResearchEventsState,
+) -> Command[Literal["crawl_and_extract_url", "__end__"]]:
+    """Send every unused URL to its own crawl and extraction branch."""
+    research_question = state.get("research_question", "")
+    used_domains = state.get("used_domains", [])
+
+    if not research_question:
+        raise ValueError("research_question is required for url crawling")
+
+    # One URL per domain, skipping the domains that were already researched
+    urls_to_process = []
+    seen_domains = set(used_domains)
+    for url in state.get("urls", []):
+        domain = URLService.extract_domain(url)
+        if domain not in seen_domains:
+            seen_domains.add(domain)
+            urls_to_process.append(url)
+
+    if not urls_to_process:
+        print("No new URLs remaining. Routing to __end__.")
+        return Command(goto=END, update={"urls": []})
+
+    print(f"Crawling {len(urls_to_process)} URLs in parallel.")
+    return Command(
+        goto=[
+            Send(
+                "crawl_and_extract_url",
+                {"url": url, "research_question": research_question},
+            )
+            for url in urls_to_process
+        ],
+        update={"urls": urls_to_process},
+    )
+
+
+async def crawl_and_extract_url(state: CrawlUrlTaskState) -> dict:
+    """Crawls one URL and categorizes its events without merging them yet.
+
+    The page is streamed straight into the merge sub-graph's chunker, so its
+    text is never copied into graph state.
+    """
+    url = state["url"]
+    research_question = state["research_question"]
+
+    extract_result = await merge_events_app.ainvoke(
+        {
+            "event_store": EventStore(),
+            "url": url,
+            "research_question": research_question,
+            "extract_only": True,
+        }
+    )
+
+    return {
+        "url_results": [
+            {
+                "url": url,
+                "extracted_event_store": extract_result.get(
+                    "extracted_event_store", EventStore()
+                ),
+            }
+        ]
+    }
+
+
+def events_update(state: ResearchEventsState, event_store: EventStore) -> dict:
+    """Return the update for merged events, rendered only for markdown callers."""
+    update = {"event_store": event_store}
+    if "existing_events" in state:
+        update["existing_events"] = event_store.to_categories()
+    return update
+
+
+async def merge_url_results(
+    state: ResearchEventsState,
+) -> Command[Literal["__end__"]]:
+    """Merge the events of all crawled URLs into the existing events at once."""
+    research_question = state.get("research_question", "")
+    urls = state.get("urls", [])
+    used_domains = state.get("used_domains", [])
+
+    # Branches finish in any order, keep the order chosen by url_finder
+    url_results = sorted(
+        state.get("url_results", []),
+        key=lambda r: urls.index(r["url"]) if r["url"] in urls else len(urls),
+    )
+    new_events = EventService.merge_event_stores(
+        [
+            ensure_pydantic_model(r["extracted_event_store"], EventStore)
+            for r in url_results
+            if r.get("extracted_event_store")
+        ]
+    )
+
+    result = await merge_events_app.ainvoke(
+        {
+            "event_store": ensure_event_store(state),
+            "extracted_event_store": new_events,
+            "research_question": research_question,
+        }
+    )
+
+    updated_used_domains = used_domains.copy()
+    for url in urls:
+        domain = URLService.extract_domain(url)
+        if domain not in updated_used_domains:
+            updated_used_domains.append(domain)
+
+    return Command(
+        goto=END,
+        update={
+            **events_update(state, result["event_store"]),
+            "urls": [],
+            "used_domains": updated_used_domains,
+        },
+    )
+
+
 async def crawl_url(
     state: ResearchEventsState,
 ) -> Command[Literal["merge_events_and_update"]]:
@@ -164,18 +314,21 @@ async def merge_events_and_update(
     state: ResearchEventsState,
 ) -> Command[Literal["should_process_url_router"]]:
     """Merges new events, removes the processed URL, and loops back to the router."""
-    existing_events = state.get("existing_events", CategoriesWithEvents())
     extracted_events = state.get("extracted_events", "")
     research_question = state.get("research_question", "")
-
-    # Invoke the merge subgraph
-    result = await merge_events_app.ainvoke(
-        {
-            "existing_events": existing_events,
-            "extracted_events": extracted_events,
-            "research_question": research_question,
-        }
-    )
+    event_store = ensure_event_store(state)
+
+    # Invoke the merge subgraph, unless the page had no content
+    if extracted_events.strip():
+        result = await merge_events_app.ainvoke(
+            {
+                "event_store": event_store,
+                "extracted_events": extracted_events,
+                "url": state["urls"][0],
+                "research_question": research_question,
+            }
+        )
+        event_store = result["event_store"]
 
     remaining_urls, used_domains = updateUrlList(state)
 
@@ -183,7 +336,7 @@ async def merge_events_and_update(
     return Command(
         goto="should_process_url_router",
         update={
-            "existing_events": result["existing_events"],
+            **events_update(state, event_store),
             "urls": remaining_urls,
             "used_domains": used_domains,
             # "extracted_events": "",  # Clear the temporary state
@@ -203,9 +356,13 @@ research_events_builder.add_node("url_finder", url_finder)
 research_events_builder.add_node("should_process_url_router", should_process_url_router)
 research_events_builder.add_node("crawl_url", crawl_url)
 research_events_builder.add_node("merge_events_and_update", merge_events_and_update)
+research_events_builder.add_node("crawl_and_extract_url", crawl_and_extract_url)
+research_events_builder.add_node("merge_url_results", merge_url_results)
 
 # Set the entry point
 research_events_builder.add_edge(START, "url_finder")
+# Fan-in: runs once after every parallel crawl_and_extract_url branch is done
+research_events_builder.add_edge("crawl_and_extract_url", "merge_url_results")
 
 
 research_events_app = research_events_builder.compile().with_config(
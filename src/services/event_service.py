@@ -1,30 +1,20 @@
 from typing import List
+from src.services.event_store import EventStore
 from src.state import CategoriesWithEvents
 
 
 class EventService:
     @staticmethod
-    def split_events_into_chunks(extracted_events: str, max_len: int = 2000) -> List[str]:
-        """Split events text into chunks of specified length."""
-        return [
-            extracted_events[i : i + max_len]
-            for i in range(0, len(extracted_events), max_len)
-        ]
-    
+    def merge_event_stores(stores: List[EventStore]) -> EventStore:
+        """Merge several event stores into one, dropping repeated events."""
+        merged = EventStore()
+        for store in stores:
+            merged.merge(store)
+        return merged
+
     @staticmethod
     def merge_categorized_events(categorized_results: List[CategoriesWithEvents]) -> CategoriesWithEvents:
         """Merge multiple categorized event results into one."""
-        merged = CategoriesWithEvents(
-            early="[]",
-            personal="[]", 
-            career="[]",
-            legacy="[]",
-        )
-        
-        for result in categorized_results:
-            merged.early += result.early
-            merged.personal += result.personal
-            merged.career += result.career
-            merged.legacy += result.legacy
-            
-        return merged
\ No newline at end of file
+        return EventService.merge_event_stores(
+            [EventStore.from_categories(result) for result in categorized_results]
+        ).to_categories()
@@ -0,0 +1,238 @@
+"""Typed store of biographical events, indexed by year and name.
+
+The LLM stages exchange events as ``CategoriesWithEvents``, one markdown
+bullet list per category. Internally events are kept as ``EventRecord``s,
+parsed once from the bullets, so merging, deduplication and membership
+checks are local and deterministic. The store is what graph state keeps;
+bullet text is only rendered again when a prompt or a caller needs it.
+"""
+
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+from pydantic import BaseModel, Field, PrivateAttr
+from src.core.text_patterns import MONTH_PATTERN, STOPWORDS, YEAR_PATTERN
+
+if TYPE_CHECKING:
+    from src.state import CategoriesWithEvents
+
+# The fields of CategoriesWithEvents, whose state imports this module
+CATEGORIES = ("early", "personal", "career", "legacy")
+MONTHS = (
+    "january february march april may june july august september october "
+    "november december"
+).split()
+
+# Bullet markers, and the "[]" older merges seeded categories with
+BULLET_PATTERN = re.compile(r"^(?:\s|\[\]|[-*•]|\d+[.)](?=\s))+")
+LOCATION_PATTERN = re.compile(
+    r"\b(?:in|at|to|from|near)\s+((?:[A-Z][\w'-]+)(?:,?\s+[A-Z][\w'-]+)*)"
+)
+NAME_KEY_PATTERN = re.compile(r"[^\w\s]")
+
+# Tokens a new event needs before containment counts as a match
+MIN_TOKENS_FOR_OVERLAP = 3
+
+# Category, year and normalized name of an event
+EventKey = Tuple[str, int | None, str]
+
+
+def year_window(
+    records: Iterable["EventRecord"], margin: int
+) -> set[int | None]:
+    """Years within ``margin`` of any record's year, None for undated records."""
+    years: set[int | None] = set()
+    for record in records:
+        if record.year is None:
+            years.add(None)
+        else:
+            years.update(range(record.year - margin, record.year + margin + 1))
+    return years
+
+
+def parse_bullets(text: str) -> List[str]:
+    """Split a markdown bullet list into the text of its events."""
+    events = []
+    for line in (text or "").splitlines():
+        line = BULLET_PATTERN.sub("", line).strip()
+        if line:
+            events.append(line)
+    return events
+
+
+def event_name_key(text: str) -> str:
+    """Normalize event text for exact duplicate detection."""
+    return " ".join(NAME_KEY_PATTERN.sub(" ", text.casefold()).split())
+
+
+def event_tokens(text: str) -> frozenset[str]:
+    """Return the distinct content words and numbers of an event's text."""
+    return frozenset(
+        token for token in event_name_key(text).split() if token not in STOPWORDS
+    )
+
+
+def token_set_similarity(new: frozenset[str], known: frozenset[str]) -> float:
+    """How much of a new event's token set a known event covers, in [0, 1].
+
+    Short bullets are often a subset of a longer telling of the same event
+    ("Born in Ulm, 1879"), so once the new set has a few tokens the share of
+    it found in the known event is measured. A short known event does not
+    cover a longer new one, which may add details worth keeping. Smaller
+    sets use Jaccard similarity, where a single shared word is not enough.
+    """
+    if not new or not known:
+        return 0.0
+    shared = len(new & known)
+    if len(new) >= MIN_TOKENS_FOR_OVERLAP:
+        return shared / len(new)
+    return shared / len(new | known)
+
+
+class EventRecord(BaseModel):
+    """One biographical event."""
+
+    name: str = Field(description="The event as written in its bullet")
+    category: str
+    year: int | None = None
+    # Sortable date, "1930" or "1930-05" when the month is known
+    date_key: str = ""
+    location: str | None = None
+    # URL of the page the event was extracted from
+    source: str | None = None
+
+    @classmethod
+    def from_text(
+        cls, text: str, category: str, source: str | None = None
+    ) -> "EventRecord":
+        """Parse the year, month and location out of an event's text."""
+        year_match = YEAR_PATTERN.search(text)
+        year = int(year_match.group(1)) if year_match else None
+        date_key = ""
+        if year is not None:
+            date_key = f"{year:04d}"
+            month_match = MONTH_PATTERN.search(text)
+            if month_match:
+                month = MONTHS.index(month_match.group(1).lower()) + 1
+                date_key += f"-{month:02d}"
+
+        location = None
+        for match in LOCATION_PATTERN.finditer(text):
+            candidate = match.group(1)
+            if not MONTH_PATTERN.fullmatch(candidate.split()[0]):
+                location = candidate
+                break
+
+        return cls(
+            name=text,
+            category=category,
+            year=year,
+            date_key=date_key,
+            location=location,
+            source=source,
+        )
+
+    @property
+    def key(self) -> EventKey:
+        """The index key: category, year and normalized name."""
+        return self.category, self.year, event_name_key(self.name)
+
+
+class EventStore(BaseModel):
+    """Events of one person, indexed by category, year and name key."""
+
+    records: List[EventRecord] = Field(default_factory=list)
+    # Position of every record by its key, and the positions of every year
+    _index: Dict[EventKey, int] = PrivateAttr(default_factory=dict)
+    _by_year: Dict[int | None, List[int]] = PrivateAttr(default_factory=dict)
+    _tokens: List[frozenset[str]] = PrivateAttr(default_factory=list)
+
+    def model_post_init(self, __context) -> None:
+        """Index records passed to the constructor, dropping duplicates."""
+        records, self.records = self.records, []
+        self.extend(records)
+
+    def __len__(self) -> int:
+        """Return the number of stored events."""
+        return len(self.records)
+
+    def __contains__(self, record: EventRecord) -> bool:
+        """Return whether an event with the same key is stored."""
+        return record.key in self._index
+
+    def add(self, record: EventRecord) -> bool:
+        """Add a record, returning False if the same event is already stored."""
+        if record.key in self._index:
+            return False
+        self._index[record.key] = len(self.records)
+        self._by_year.setdefault(record.year, []).append(len(self.records))
+        self._tokens.append(event_tokens(record.name))
+        self.records.append(record)
+        return True
+
+    def find_duplicate(
+        self, record: EventRecord, threshold: float = 1.0
+    ) -> EventRecord | None:
+        """Return a stored event that is the same as ``record``, if any.
+
+        Besides exact matches, events of the same year in any category that
+        contain at least ``threshold`` of ``record``'s tokens count as the same.
+        """
+        if record.key in self._index:
+            return self.records[self._index[record.key]]
+        tokens = event_tokens(record.name)
+        for i in self._by_year.get(record.year, []):
+            if token_set_similarity(tokens, self._tokens[i]) >= threshold:
+                return self.records[i]
+        return None
+
+    def extend(self, records: Iterable[EventRecord]) -> int:
+        """Add several records, returning how many were new."""
+        return sum(1 for record in records if self.add(record))
+
+    def merge(self, other: "EventStore") -> int:
+        """Add the events of ``other`` not already stored, returning how many."""
+        return self.extend(other.records)
+
+    def in_year(self, year: int | None) -> List[EventRecord]:
+        """Events of one year, None for undated events."""
+        return [self.records[i] for i in self._by_year.get(year, [])]
+
+    def in_category(self, category: str) -> List[EventRecord]:
+        """Events of one category, in chronological order.
+
+        Undated events keep their place after the event they followed.
+        """
+        last_key = ""
+        keyed = []
+        for record in self.records:
+            if record.category != category:
+                continue
+            last_key = record.date_key or last_key
+            keyed.append((last_key, len(keyed), record))
+        return [record for _, _, record in sorted(keyed, key=lambda k: k[:2])]
+
+    def render(self, category: str) -> str:
+        """Render one category as a markdown bullet list."""
+        return "\n".join(f"- {record.name}" for record in self.in_category(category))
+
+    def to_categories(self) -> "CategoriesWithEvents":
+        """Render every category, the format the LLM stages exchange."""
+        from src.state import CategoriesWithEvents
+
+        return CategoriesWithEvents(
+            **{category: self.render(category) for category in CATEGORIES}
+        )
+
+    @classmethod
+    def from_categories(
+        cls, categories: "CategoriesWithEvents", source: str | None = None
+    ) -> "EventStore":
+        """Parse every category's bullets into records."""
+        store = cls()
+        for category in CATEGORIES:
+            store.extend(
+                EventRecord.from_text(text, category, source)
+                for text in parse_bullets(getattr(categories, category, ""))
+            )
+        return store
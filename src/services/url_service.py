@@ -1,5 +1,8 @@
-from urllib.parse import urlparse
 from typing import List
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Query parameters that only track the visitor and never change the page content
+TRACKING_QUERY_PREFIXES = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
 
 
 class URLService:
@@ -7,7 +10,36 @@ class URLService:
     def extract_domain(url: str) -> str:
         """Extract domain from URL."""
         return urlparse(url).netloc
-    
+
+    @staticmethod
+    def canonicalize_url(url: str) -> str:
+        """Normalize a URL so that equivalent addresses map to the same key.
+
+        Lowercases scheme and host, drops default ports, fragments, tracking
+        parameters and trailing slashes, and sorts the remaining query string.
+        """
+        parsed = urlparse(url.strip())
+        scheme = (parsed.scheme or "https").lower()
+        host = (parsed.hostname or "").lower()
+        port = parsed.port
+        if port and not (
+            (scheme == "http" and port == 80) or (scheme == "https" and port == 443)
+        ):
+            host = f"{host}:{port}"
+
+        path = parsed.path or "/"
+        if len(path) > 1:
+            path = path.rstrip("/")
+
+        query = urlencode(
+            sorted(
+                (k, v)
+                for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                if not k.lower().startswith(TRACKING_QUERY_PREFIXES)
+            )
+        )
+        return urlunparse((scheme, host, path, "", query, ""))
+
     @staticmethod
     def update_url_list(urls: List[str], used_domains: List[str]) -> tuple[List[str], List[str]]:
         """Remove first URL from list and track its domain."""
@@ -25,4 +57,4 @@ class URLService:
         # Remove first URL
         remaining_urls = urls[1:]
         
-        return remaining_urls, updated_used_domains
\ No newline at end of file
+        return remaining_urls, updated_used_domains
@@ -7,6 +7,7 @@ from typing import Annotated, List, TypedDict
 
 from langchain_core.messages import MessageLikeRepresentation
 from pydantic import BaseModel, Field
+from src.services.event_store import EventStore
 
 ################################################################################
 # Section 1: Core Data Models
@@ -137,3 +138,7 @@ class SupervisorState(SupervisorStateInput):
     conversation_history: Annotated[list[MessageLikeRepresentation], override_reducer]
     iteration_count: int = 0
     structured_events: list[ChronologyEvent] | None
+    # The researched events as typed records, rendered only for prompts
+    event_store: EventStore
+    # Id of the run's token budget, passed on to the sub-graphs
+    token_budget_id: str
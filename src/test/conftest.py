@@ -0,0 +1,53 @@
+"""Shared fixtures for the test suite."""
+
+import re
+from unittest.mock import patch
+
+import pytest
+
+
+class WordEncoding:
+    """Offline stand-in for a tiktoken encoding: one token per word."""
+
+    def __init__(self):
+        """Start with an empty vocabulary."""
+        self.vocab: list[str] = []
+        self.ids: dict[str, int] = {}
+
+    def encode(self, text: str) -> list[int]:
+        """Split text into whitespace-prefixed words and map them to ids."""
+        tokens = []
+        for word in re.findall(r"\s*\S+|\s+", text):
+            if word not in self.ids:
+                self.ids[word] = len(self.vocab)
+                self.vocab.append(word)
+            tokens.append(self.ids[word])
+        return tokens
+
+    encode_ordinary = encode
+
+    def encode_ordinary_batch(self, texts: list[str], **kwargs) -> list[list[int]]:
+        """Encode several texts at once."""
+        return [self.encode(text) for text in texts]
+
+    def decode_tokens_bytes(self, tokens: list[int]) -> list[bytes]:
+        """Return the UTF-8 bytes of each token."""
+        return [self.vocab[token].encode("utf-8") for token in tokens]
+
+    def decode(self, tokens: list[int]) -> str:
+        """Join the words back together."""
+        return "".join(self.vocab[token] for token in tokens)
+
+
+@pytest.fixture
+def word_tokenizer():
+    """Replace the tiktoken encoding so chunking tests run without downloads."""
+    encoding = WordEncoding()
+    with patch("src.url_crawler.tokenization.get_tokenizer", return_value=encoding):
+        yield encoding
+
+
+@pytest.fixture(autouse=True)
+def isolated_chunk_memo(tmp_path, monkeypatch):
+    """Give every test its own empty chunk memo instead of the shared one."""
+    monkeypatch.setenv("CHUNK_MEMO_DIR", str(tmp_path / "chunk_memo"))
@@ -0,0 +1,291 @@
+"""Tests for the biographic event chunk graph."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from src.core.token_budget import (
+    finish_token_budget,
+    get_token_budget,
+    start_token_budget,
+    token_budget_config,
+)
+from src.research_events.chunk_graph import (
+    BatchBiographicEventCheck,
+    BiographicEventCheck,
+    ChunkClassification,
+    ChunkResult,
+    _batch_prompt,
+    check_chunk_for_events,
+)
+from src.research_events.merge_events.merge_events_graph import (
+    filter_chunks,
+    split_events,
+)
+from src.url_crawler.chunking import TextSpan
+
+CHUNKS = [f"Miller moved to Paris in {1930 + i}." for i in range(20)]
+
+
+def make_models(batch_answer, delay: float = 0.0):
+    """Return a chunk model factory and the log of the schemas it was called with."""
+    calls = []
+
+    def create_model(config, class_name):
+        model = MagicMock()
+
+        async def ainvoke(prompt):
+            calls.append(class_name)
+            await asyncio.sleep(delay)
+            if class_name is BatchBiographicEventCheck:
+                return batch_answer(prompt)
+            return BiographicEventCheck(contains_biographic_event=True)
+
+        model.ainvoke.side_effect = ainvoke
+        return model
+
+    return create_model, calls
+
+
+def alternating_answer(prompt):
+    """Answer every chunk of a batch, marking the even-numbered ones relevant."""
+    count = prompt.count("Chunk ")
+    return BatchBiographicEventCheck(
+        results=[
+            ChunkClassification(chunk_id=i, contains_biographic_event=i % 2 == 0)
+            for i in range(1, count + 1)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_classified_in_batches():
+    """Twenty chunks with a batch size of 8 take three calls."""
+    create_model, calls = make_models(alternating_answer)
+    with patch("src.research_events.chunk_graph.create_llm_chunk_model", create_model):
+        result = await check_chunk_for_events(
+            {"chunks": CHUNKS},
+            {"configurable": {"chunk_classification_batch_size": 8}},
+        )
+
+    assert calls == [BatchBiographicEventCheck] * 3
+    assert len(result["results"]) == 20
+    assert result["results"]["chunk_0"].contains_biographic_event is False
+    assert result["results"]["chunk_1"].contains_biographic_event is True
+    assert result["results"]["chunk_19"].content == CHUNKS[19]
+
+
+@pytest.mark.asyncio
+async def test_only_batches_sent_are_charged(word_tokenizer):
+    """The budget pays for the batches the model sees, not every candidate."""
+    first_batch = _batch_prompt(CHUNKS[:8])
+    config = {
+        "configurable": {
+            "run_token_budget": len(word_tokenizer.encode(first_batch)) + 10,
+            "chunk_classification_batch_size": 8,
+        }
+    }
+    config = token_budget_config(config, start_token_budget(config))
+    budget = get_token_budget(config)
+
+    create_model, calls = make_models(alternating_answer)
+    with patch("src.research_events.chunk_graph.create_llm_chunk_model", create_model):
+        result = await check_chunk_for_events({"chunks": CHUNKS}, config)
+    finish_token_budget(config)
+
+    assert calls == [BatchBiographicEventCheck]
+    assert budget.stats.calls == {"filter_chunks": 1}
+    assert budget.spent == len(word_tokenizer.encode(first_batch))
+    assert result["results"]["chunk_1"].decided_by == "llm"
+    assert result["results"]["chunk_8"].decided_by == "budget"
+    assert not result["results"]["chunk_8"].contains_biographic_event
+
+
+@pytest.mark.asyncio
+async def test_unparseable_batch_falls_back_to_single_chunks():
+    """A batch answer missing chunks is retried one chunk at a time."""
+
+    def batch_answer(prompt):
+        return BatchBiographicEventCheck(
+            results=[ChunkClassification(chunk_id=1, contains_biographic_event=False)]
+        )
+
+    create_model, calls = make_models(batch_answer)
+    with patch("src.research_events.chunk_graph.create_llm_chunk_model", create_model):
+        result = await check_chunk_for_events(
+            {"chunks": CHUNKS[:4]},
+            {"configurable": {"chunk_classification_batch_size": 4}},
+        )
+
+    assert calls == [BatchBiographicEventCheck] + [BiographicEventCheck] * 4
+    assert all(r.contains_biographic_event for r in result["results"].values())
+
+
+@pytest.mark.asyncio
+async def test_batches_are_classified_concurrently_up_to_the_limit():
+    """Latency is that of the slowest wave of calls, not the sum of all calls."""
+    create_model, _ = make_models(alternating_answer, delay=0.1)
+    with patch("src.research_events.chunk_graph.create_llm_chunk_model", create_model):
+        start = time.perf_counter()
+        await check_chunk_for_events(
+            {"chunks": CHUNKS},
+            {
+                "configurable": {
+                    "chunk_classification_batch_size": 5,
+                    "chunk_classification_concurrency": 2,
+                }
+            },
+        )
+        elapsed = time.perf_counter() - start
+
+    # Four batches, two at a time
+    assert 0.2 <= elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_filter_chunks_runs_the_chunk_graph_once():
+    """All chunks of a page are classified in a single chunk graph run."""
+    graph = AsyncMock()
+    graph.ainvoke.return_value = {
+        "results": {
+            f"chunk_{i}": ChunkResult(content=chunk, contains_biographic_event=i == 2)
+            for i, chunk in enumerate(CHUNKS[:5])
+        }
+    }
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.biographic_event_graph",
+        graph,
+    ):
+        command = await filter_chunks({"text_chunks": CHUNKS[:5]}, {})
+
+    graph.ainvoke.assert_awaited_once()
+    assert graph.ainvoke.await_args.args[0]["chunks"] == CHUNKS[:5]
+    assert command.goto == "extract_and_categorize_chunk"
+    assert command.update["text_chunks"] == [CHUNKS[2]]
+
+
+@pytest.mark.asyncio
+async def test_chunks_stay_spans_until_the_prompt(word_tokenizer):
+    """Page chunks are carried as spans and keep their offsets in the page."""
+    page = "\n\n".join(CHUNKS)
+    split = await split_events(
+        {"extracted_events": page},
+        {"configurable": {"default_chunk_size": 20, "default_overlap_size": 2}},
+    )
+    spans = split.update["text_chunks"]
+
+    create_model, _ = make_models(alternating_answer)
+    with patch("src.research_events.chunk_graph.create_llm_chunk_model", create_model):
+        result = await check_chunk_for_events({"chunks": spans}, {})
+
+    assert len(spans) > 1
+    assert all(isinstance(span, TextSpan) for span in spans)
+    for i, span in enumerate(spans):
+        chunk_result = result["results"][f"chunk_{i}"]
+        assert chunk_result.content == page[span.start : span.end]
+        assert (chunk_result.start, chunk_result.end) == (span.start, span.end)
+
+
+@pytest.mark.asyncio
+async def test_split_events_streams_a_page_from_its_url(word_tokenizer):
+    """Given a URL, the page is chunked from the stream and kept out of the state."""
+
+    async def stream(url, config=None):
+        for chunk in CHUNKS:
+            yield chunk + "\n\n"
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.stream_page_segments",
+        stream,
+    ):
+        split = await split_events(
+            {"url": "https://a.org"},
+            {
+                "configurable": {
+                    "default_chunk_size": 20,
+                    "default_overlap_size": 2,
+                    "max_page_chunks": 3,
+                }
+            },
+        )
+
+    spans = split.update["text_chunks"]
+    assert split.goto == "filter_chunks"
+    assert len(spans) == 3
+    assert str(spans[0]).startswith(CHUNKS[0])
+    assert "extracted_events" not in split.update
+
+
+def chunk_graph_answering(relevant):
+    """Mock the chunk graph, marking the chunks in ``relevant`` as relevant."""
+
+    async def ainvoke(state, config):
+        return {
+            "results": {
+                f"chunk_{i}": ChunkResult(
+                    content=chunk, contains_biographic_event=chunk in relevant
+                )
+                for i, chunk in enumerate(state["chunks"])
+            }
+        }
+
+    graph = AsyncMock()
+    graph.ainvoke.side_effect = ainvoke
+    return graph
+
+
+@pytest.mark.asyncio
+async def test_filter_chunks_ranks_across_the_whole_page():
+    """The best chunks are classified wherever they are on the page."""
+    filler = ["Home | About | Contact"] * 6
+    events = [
+        "Henry Miller was born in 1891. He moved to Paris in 1930.",
+        "Miller married June Mansfield in 1924. He died in 1980.",
+    ]
+    graph = chunk_graph_answering(events)
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.biographic_event_graph",
+        graph,
+    ):
+        command = await filter_chunks(
+            {"text_chunks": filler + events, "research_question": "Henry Miller"},
+            {"configurable": {"max_chunks": 2}},
+        )
+
+    assert sorted(graph.ainvoke.await_args.args[0]["chunks"]) == sorted(events)
+    assert sorted(command.update["text_chunks"]) == sorted(events)
+
+
+@pytest.mark.asyncio
+async def test_filter_chunks_extracts_the_top_relevant_chunks():
+    """Only the best ranked relevant chunks are extracted, best first."""
+    chunks = [
+        "Home | About | Contact",
+        "Miller was born in Brooklyn in 1891 and grew up there.",
+        "In 1930 Miller moved to Paris, where his career as a writer began.",
+        "Miller wrote Tropic of Cancer in Paris in 1934, the start of his later career.",
+        "Miller married June Mansfield in 1924 in New York.",
+    ]
+    graph = chunk_graph_answering(chunks[1:])
+    config = {"configurable": {"max_extracted_chunks": 2}}
+    config = token_budget_config(config, start_token_budget(config))
+    budget = get_token_budget(config)
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.biographic_event_graph",
+        graph,
+    ):
+        command = await filter_chunks(
+            {
+                "text_chunks": chunks,
+                "research_question": "Henry Miller's later career in Paris",
+            },
+            config,
+        )
+    finish_token_budget(config)
+
+    assert command.update["text_chunks"] == [chunks[2], chunks[3]]
+    assert budget.stats.saved == {"extract_and_categorize_chunk": 3}
@@ -0,0 +1,103 @@
+"""Tests for the chunk result memo."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from src.research_events.chunk_graph import BiographicEventCheck, check_chunk_for_events
+from src.research_events.chunk_memo import ChunkMemo, get_chunk_memo, prompt_version
+from src.research_events.merge_events.merge_events_graph import (
+    extract_and_categorize_chunk,
+)
+from src.state import CategoriesWithEvents
+
+CHUNKS = [f"Miller moved to Paris in {1930 + i}." for i in range(4)]
+
+
+@pytest.fixture
+def chunk_memo(tmp_path) -> ChunkMemo:
+    """Provide an empty memo stored in a temporary directory."""
+    return ChunkMemo(path=str(tmp_path / "chunks.sqlite3"), max_bytes=200)
+
+
+def test_keys_ignore_whitespace_but_not_model_or_prompt():
+    """Reflowed chunks share a key, another model or prompt version does not."""
+    key = ChunkMemo.make_key("classification", "model", "v1", "Born  in\n1891.")
+
+    assert key == ChunkMemo.make_key("classification", "model", "v1", "Born in 1891.")
+    assert key != ChunkMemo.make_key("classification", "other", "v1", "Born in 1891.")
+    assert key != ChunkMemo.make_key("classification", "model", "v2", "Born in 1891.")
+    assert prompt_version("a {chunk}") != prompt_version("b {chunk}")
+
+
+def test_memo_round_trip_eviction_and_hit_rate(chunk_memo: ChunkMemo):
+    """Results are reused, and the least recently used are evicted first."""
+    result = BiographicEventCheck(contains_biographic_event=True)
+    keys = [ChunkMemo.make_key("classification", "m", "v", c) for c in CHUNKS]
+
+    chunk_memo.set_many({key: result for key in keys[:3]})
+    assert chunk_memo.get(keys[0]) == result.model_dump_json()
+    assert chunk_memo.get(keys[3]) is None
+    assert chunk_memo.stats.hit_rate == 0.5
+
+    # Each entry is about 35 bytes, so a budget of 200 holds five of them
+    chunk_memo.set_many(
+        {ChunkMemo.make_key("extraction", "m", "v", c): result for c in CHUNKS}
+    )
+    assert chunk_memo.stats.evictions == 2
+    assert chunk_memo.get(keys[0]) is not None
+    assert chunk_memo.get(keys[1]) is None
+
+
+@pytest.mark.asyncio
+async def test_repeated_classification_is_served_from_the_memo():
+    """A second run over the same chunks makes no model calls."""
+    create_model = MagicMock()
+    create_model.return_value.ainvoke = AsyncMock(
+        return_value=BiographicEventCheck(contains_biographic_event=True)
+    )
+    config = {"configurable": {"chunk_classification_batch_size": 1}}
+
+    with patch("src.research_events.chunk_graph.create_llm_chunk_model", create_model):
+        first = await check_chunk_for_events({"chunks": CHUNKS}, config)
+        calls = create_model.return_value.ainvoke.await_count
+        second = await check_chunk_for_events({"chunks": CHUNKS}, config)
+
+    assert calls == len(CHUNKS)
+    assert create_model.return_value.ainvoke.await_count == calls
+    assert second == first
+    assert get_chunk_memo(config).stats.hits == len(CHUNKS)
+
+
+@pytest.mark.asyncio
+async def test_repeated_extraction_is_served_from_the_memo():
+    """Extracting the same chunks again makes no model call."""
+    response = AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": "RelevantEventsCategorized",
+                "args": {
+                    "early": "",
+                    "personal": "- Moved to Paris in 1930.",
+                    "career": "",
+                    "legacy": "",
+                },
+                "id": "call_1",
+            }
+        ],
+    )
+    state = {"text_chunks": CHUNKS[:1], "categorized_chunks": []}
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.create_llm_with_tools"
+    ) as create_model:
+        create_model.return_value.ainvoke = AsyncMock(return_value=response)
+        first = await extract_and_categorize_chunk(state, {})
+        second = await extract_and_categorize_chunk(state, {})
+
+    assert create_model.return_value.ainvoke.await_count == 1
+    assert second.update == first.update
+    assert first.update["categorized_chunks"] == [
+        CategoriesWithEvents(personal="- Moved to Paris in 1930.")
+    ]
@@ -0,0 +1,128 @@
+"""Tests for the local chunk pre-filter."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from src.research_events.chunk_graph import BiographicEventCheck, check_chunk_for_events
+from src.research_events.chunk_prefilter import (
+    PrefilterRecord,
+    evaluate_prefilter,
+    load_prefilter_records,
+    log_prefilter_records,
+    prefilter_decision,
+    rank_chunks,
+    score_chunk,
+)
+
+NAME_WORDS = {"henry", "miller"}
+NAVIGATION = "Home | About | Contact | Privacy policy | Terms of use | Sitemap"
+EVENTS = (
+    "Henry Miller was born in 1891 in New York. "
+    "He moved to Paris in 1930. Miller married June Mansfield in 1924."
+)
+AMBIGUOUS = "Miller moved to Paris in 1930."
+BIBLIOGRAPHY = """
+- Miller, Henry (1934). Tropic of Cancer. Paris: Obelisk Press.
+- Miller, Henry (1939). Tropic of Capricorn. ISBN 978-0-8021-5182-0.
+- "Henry Miller, born 1891, died 1980". The New York Times. Retrieved 2 May 2020.
+- "Miller married June in 1924". Archived from the original on 3 March 2016.
+"""
+
+
+def test_scores_separate_navigation_from_events():
+    """Boilerplate scores near zero, an event-dense chunk near one."""
+    assert score_chunk(NAVIGATION, NAME_WORDS).score < 0.05
+    assert score_chunk(EVENTS, NAME_WORDS).score > 0.8
+    assert 0.05 <= score_chunk(AMBIGUOUS, NAME_WORDS).score <= 0.8
+
+
+def test_citations_are_not_accepted_as_events():
+    """A reference list full of dates and names is not mistaken for events."""
+    scored = score_chunk(BIBLIOGRAPHY, NAME_WORDS)
+
+    assert scored.citations == 4
+    assert prefilter_decision(scored.score, 0.05, 0.8) == "reject"
+    # A footnote after a few paragraphs of events leaves the chunk accepted
+    footnoted = "\n\n".join([EVENTS, EVENTS, EVENTS, EVENTS, BIBLIOGRAPHY[1:64]])
+    assert score_chunk(footnoted, NAME_WORDS).score > 0.8
+
+
+def test_prefilter_decision():
+    """Only the scores between the thresholds are left to the model."""
+    assert prefilter_decision(0.01, 0.05, 0.8) == "reject"
+    assert prefilter_decision(0.9, 0.05, 0.8) == "accept"
+    assert prefilter_decision(0.5, 0.05, 0.8) == "llm"
+
+
+def test_rank_chunks_best_first():
+    """Chunks are ranked by score, ties in page order."""
+    assert rank_chunks([0.1, 0.9, 0.5, 0.9], 3) == [1, 3, 2]
+    assert rank_chunks([0.5, 0.5, 0.5], 2) == [0, 1]
+    assert rank_chunks([0.1, 0.2]) == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_only_ambiguous_chunks_reach_the_model():
+    """Chunks the pre-filter decides are labelled without a model call."""
+    prompts = []
+
+    async def ainvoke(prompt):
+        prompts.append(prompt)
+        return BiographicEventCheck(contains_biographic_event=True)
+
+    def create_model(config, class_name):
+        model = MagicMock()
+        model.ainvoke.side_effect = ainvoke
+        return model
+
+    with patch("src.research_events.chunk_graph.create_llm_chunk_model", create_model):
+        result = await check_chunk_for_events(
+            {
+                "chunks": [NAVIGATION, EVENTS, AMBIGUOUS],
+                "research_question": "Henry Miller",
+            },
+            {"configurable": {"chunk_classification_batch_size": 1}},
+        )
+
+    assert len(prompts) == 1 and AMBIGUOUS in prompts[0]
+    results = result["results"]
+    assert results["chunk_0"].contains_biographic_event is False
+    assert results["chunk_0"].decided_by == "prefilter"
+    assert results["chunk_1"].contains_biographic_event is True
+    assert results["chunk_1"].decided_by == "prefilter"
+    assert results["chunk_2"].decided_by == "llm"
+    assert results["chunk_2"].score == score_chunk(AMBIGUOUS, NAME_WORDS).score
+
+
+def test_evaluate_prefilter():
+    """Precision and recall are computed against the model labels."""
+    records = [
+        PrefilterRecord(score=0.0, decision="llm", label=False),
+        PrefilterRecord(score=0.01, decision="llm", label=True),
+        PrefilterRecord(score=0.5, decision="llm", label=True),
+        PrefilterRecord(score=0.9, decision="llm", label=True),
+        PrefilterRecord(score=0.95, decision="llm", label=False),
+        PrefilterRecord(score=0.3, decision="reject"),
+    ]
+
+    result = evaluate_prefilter(records, reject_below=0.05, accept_above=0.8)
+
+    assert result.labelled == 5
+    assert result.rejected == 2 and result.reject_precision == 0.5
+    assert result.accepted == 2 and result.accept_precision == 0.5
+    assert result.relevant_recall == pytest.approx(2 / 3)
+    assert result.llm_calls_saved == pytest.approx(4 / 5)
+
+
+def test_prefilter_log_round_trip(tmp_path):
+    """Logged records are read back unchanged."""
+    path = str(tmp_path / "logs" / "prefilter.jsonl")
+    records = [
+        PrefilterRecord(score=0.5, decision="llm", label=True, chunk_preview="a"),
+        PrefilterRecord(score=0.01, decision="reject", chunk_preview="b"),
+    ]
+
+    log_prefilter_records(path, records[:1])
+    log_prefilter_records(path, records[1:])
+
+    assert load_prefilter_records(path) == records
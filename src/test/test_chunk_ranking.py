@@ -0,0 +1,45 @@
+"""Tests for lexical ranking of chunks against the research question."""
+
+from src.research_events.chunk_ranking import (
+    bm25_scores,
+    question_query,
+    relevance_scores,
+)
+
+PAGE = [
+    "Henry Miller was born in Brooklyn in 1891 and grew up in Williamsburg.",
+    "He married Beatrice Wickens in 1917 and worked for Western Union.",
+    "In 1930 Miller moved to Paris, where he wrote Tropic of Cancer.",
+    "His later career in Paris brought him to Big Sur after 1940.",
+]
+
+
+def test_question_terms_weight_the_name():
+    """The subject's name outweighs other terms and stopwords are dropped."""
+    query = question_query("Henry Miller's later career in Paris")
+
+    assert query["miller"] > query["career"]
+    assert "in" not in query
+
+
+def test_bm25_prefers_matching_chunks():
+    """Chunks with more query terms score higher, chunks with none score zero."""
+    scores = bm25_scores(PAGE, {"paris": 1.0, "career": 1.0})
+
+    assert scores[0] == scores[1] == 0.0
+    assert scores[3] > scores[2] > 0.0
+
+
+def test_focused_question_ranks_the_matching_part_first():
+    """A question about Paris moves the Paris chunks ahead of early life."""
+    scores = relevance_scores(PAGE, "Henry Miller's later career in Paris")
+
+    assert min(scores[2], scores[3]) > max(scores[0], scores[1])
+
+
+def test_without_question_match_ranking_uses_the_prefilter():
+    """When no chunk matches the question the pre-filter score ranks them."""
+    scores = relevance_scores(PAGE, "")
+
+    assert all(0.0 <= score <= 1.0 for score in scores)
+    assert scores == relevance_scores(PAGE, "unrelated topic", query_weight=1.0)
@@ -0,0 +1,63 @@
+"""Tests for the shared structure-aware chunking engine."""
+
+import pytest
+from src.research_events.chunk_graph import split_text
+from src.url_crawler.chunking import TextChunker, split_text_into_chunks
+from src.url_crawler.tokenization import text_token_offsets
+
+
+def test_chunks_end_at_paragraph_breaks(word_tokenizer):
+    """A chunk is cut at the last paragraph break that fits the budget."""
+    paragraphs = [" ".join(f"p{i}w{j}" for j in range(12)) + "." for i in range(10)]
+    text = "\n\n".join(paragraphs)
+
+    spans = TextChunker(chunk_size=30, overlap_size=0).split(text, text_token_offsets(text))
+
+    # Two 12-word paragraphs fit in 30 tokens, a third does not
+    assert [str(span).strip() for span in spans] == [
+        "\n\n".join(paragraphs[i : i + 2]) for i in range(0, 10, 2)
+    ]
+
+
+def test_long_paragraph_is_cut_at_a_sentence_end(word_tokenizer):
+    """Without a paragraph break the chunk ends on the last full sentence."""
+    text = " ".join(f"Sentence {i} has five words." for i in range(20))
+
+    spans = TextChunker(chunk_size=23, overlap_size=3).split(text, text_token_offsets(text))
+
+    assert len(spans) > 1
+    for span in spans[:-1]:
+        assert str(span).endswith(".")
+    for previous, span in zip(spans, spans[1:]):
+        assert word_tokenizer.encode(str(previous))[-3:] == word_tokenizer.encode(
+            str(span)
+        )[:3]
+
+
+def test_event_service_keeps_bullets_whole(word_tokenizer):
+    """Event bullets are never split across chunks."""
+    bullets = "\n".join(
+        f"- Event {i}: Henry Miller moved to a new apartment in Paris. ({1930 + i})"
+        for i in range(100)
+    )
+
+    spans = split_text_into_chunks(bullets, chunk_size=100, overlap_size=0)
+    chunks = [str(span) for span in spans]
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == bullets
+    for chunk in chunks:
+        lines = [line.strip() for line in chunk.splitlines() if line.strip()]
+        assert all(line.startswith("- Event") for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_chunk_graph_uses_configured_chunk_size(word_tokenizer):
+    """The chunk graph reads its budget from Configuration."""
+    text = "\n\n".join("word " * 50 for _ in range(8))
+
+    result = await split_text(
+        {"text": text}, {"configurable": {"default_chunk_size": 120}}
+    )
+
+    assert len(result["chunks"]) == 4
@@ -0,0 +1,70 @@
+"""Tests for the shared crawler client."""
+
+import asyncio
+
+import pytest
+from src.url_crawler.client import CrawlerClient
+
+
+@pytest.fixture
+def crawler_client() -> CrawlerClient:
+    """Provide a crawler client with small connection limits."""
+    return CrawlerClient(
+        max_connections=4,
+        max_connections_per_host=2,
+        dns_cache_ttl_seconds=60,
+        keepalive_seconds=5,
+        timeout_seconds=5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_session_is_shared_and_configured(crawler_client: CrawlerClient):
+    """Every caller gets the same pooled session."""
+    session = crawler_client.get_session()
+
+    assert crawler_client.get_session() is session
+    assert session.connector.limit == 4
+    assert session.connector.limit_per_host == 2
+
+    await crawler_client.shutdown(force=True)
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_session_closes_after_last_user(crawler_client: CrawlerClient):
+    """Nested lifespans keep the session open until the outermost one exits."""
+    async with crawler_client.lifespan():
+        session = crawler_client.get_session()
+        async with crawler_client.lifespan():
+            pass
+        assert not session.closed
+
+    assert session.closed
+    assert crawler_client.get_session() is not session
+    await crawler_client.shutdown(force=True)
+
+
+@pytest.mark.asyncio
+async def test_lazy_user_outlives_other_lifespans(crawler_client: CrawlerClient):
+    """A session used outside any lifespan is not closed by another's shutdown."""
+    session = crawler_client.get_session()
+    async with crawler_client.lifespan():
+        assert crawler_client.get_session() is session
+
+    assert not session.closed
+    await crawler_client.shutdown(force=True)
+    assert session.closed
+
+
+def test_close_at_exit_closes_a_session_left_open(crawler_client: CrawlerClient):
+    """A session opened outside any lifespan is closed once its loop is gone."""
+
+    async def scrape():
+        return crawler_client.get_session()
+
+    session = asyncio.run(scrape())
+    assert not session.closed
+
+    crawler_client.close()
+    assert session.closed
@@ -0,0 +1,138 @@
+"""Tests for crawler rate limiting, backoff and circuit breaking."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import aiohttp
+import pytest
+from src.url_crawler import utils
+from src.url_crawler.resilience import (
+    CircuitOpenError,
+    CrawlerGuard,
+    ScrapeError,
+    parse_retry_after,
+)
+
+
+def http_error(status: int, retry_after: str | None = None):
+    """Build the error aiohttp raises from raise_for_status."""
+    headers = {"Retry-After": retry_after} if retry_after else {}
+    return aiohttp.ClientResponseError(
+        request_info=Mock(real_url="https://api.firecrawl.dev/v0/scrape"),
+        history=(),
+        status=status,
+        headers=headers,
+    )
+
+
+@pytest.fixture
+def crawler_guard() -> CrawlerGuard:
+    """Provide a guard with tiny delays so tests run fast."""
+    return CrawlerGuard(
+        rate=1000,
+        burst=10,
+        max_retries=2,
+        failure_threshold=3,
+        reset_seconds=60,
+        backoff_base_seconds=0.001,
+        backoff_max_seconds=0.01,
+    )
+
+
+def test_parse_retry_after():
+    """Retry-After is accepted in seconds; garbage is ignored."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.asyncio
+async def test_throttled_request_is_retried_and_slows_down(crawler_guard):
+    """A 429 is retried after backing off and halves the host's rate."""
+    scrape = AsyncMock(side_effect=[http_error(429, "0"), "Born in 1891."])
+
+    result = await crawler_guard.call("api.firecrawl.dev", scrape)
+
+    metrics = crawler_guard.metrics()["api.firecrawl.dev"]
+    assert result == "Born in 1891."
+    assert scrape.await_count == 2
+    assert metrics.throttled == 1
+    assert metrics.retries == 1
+    assert metrics.current_rate < 1000
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(crawler_guard):
+    """A 404 is the page's fault, it is raised at once and keeps the circuit closed."""
+    scrape = AsyncMock(side_effect=http_error(404))
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await crawler_guard.call("api.firecrawl.dev", scrape)
+
+    assert scrape.await_count == 1
+    assert crawler_guard.metrics()["api.firecrawl.dev"].circuit_state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_fails_fast(crawler_guard):
+    """After repeated failures further calls are rejected without a request."""
+    scrape = AsyncMock(side_effect=http_error(503))
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await crawler_guard.call("api.firecrawl.dev", scrape)
+    assert scrape.await_count == 3
+
+    with pytest.raises(CircuitOpenError):
+        await crawler_guard.call("api.firecrawl.dev", scrape)
+
+    metrics = crawler_guard.metrics()["api.firecrawl.dev"]
+    assert scrape.await_count == 3
+    assert metrics.circuit_state == "open"
+    assert metrics.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_lets_the_next_probe_through(crawler_guard):
+    """A half-open probe that is cancelled does not block the host forever."""
+    host = "api.firecrawl.dev"
+    crawler_guard.reset_seconds = 0
+    with pytest.raises(aiohttp.ClientResponseError):
+        await crawler_guard.call(host, AsyncMock(side_effect=http_error(503)))
+
+    hang = AsyncMock(side_effect=asyncio.Event().wait)
+    probe = asyncio.create_task(crawler_guard.call(host, hang))
+    await asyncio.sleep(0.05)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    await asyncio.sleep(0.02)
+    assert await crawler_guard.call(host, AsyncMock(return_value="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_failed_scrapes_are_told_apart_from_empty_pages(crawler_guard):
+    """An open circuit or exhausted retries raise, an empty page does not."""
+    backend = Mock(host_for=Mock(return_value="api.firecrawl.dev"))
+    backend.scrape = AsyncMock(side_effect=http_error(503))
+
+    with (
+        patch.object(utils, "get_scraper_backend", return_value=backend),
+        patch.object(utils, "get_crawler_guard", return_value=crawler_guard),
+    ):
+        with pytest.raises(ScrapeError) as exhausted:
+            await utils.scrape_page_content("https://example.com/a")
+        with pytest.raises(ScrapeError) as rejected:
+            await utils.scrape_page_content("https://example.com/a")
+
+        backend.scrape = AsyncMock(side_effect=http_error(404))
+        crawler_guard.hosts.clear()
+        with pytest.raises(ScrapeError) as failed:
+            await utils.scrape_page_content("https://example.com/b")
+
+        backend.scrape = AsyncMock(return_value=None)
+        assert await utils.scrape_page_content("https://example.com/c") == ""
+
+    assert exhausted.value.reason == "retries_exhausted"
+    assert rejected.value.reason == "circuit_open"
+    assert failed.value.reason == "failed"
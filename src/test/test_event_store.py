@@ -0,0 +1,344 @@
+"""Tests for the typed event store."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from src.research_events.merge_events.merge_events_graph import (
+    combine_new_and_original_events,
+    plan_merge_groups,
+)
+from src.research_events.merge_events.prompts import MERGE_EVENTS_TEMPLATE
+from src.services.event_service import EventService
+from src.services.event_store import EventRecord, EventStore, parse_bullets
+from src.state import CategoriesWithEvents
+
+
+def template_tokens(tokenizer) -> int:
+    """Return the tokens of a merge prompt without any events."""
+    return len(tokenizer.encode(MERGE_EVENTS_TEMPLATE.format(original="", new="")))
+
+
+def test_records_parse_date_and_location():
+    """Year, month and place are read from the event text."""
+    record = EventRecord.from_text(
+        "In May 1930 Miller moved to Paris, France.", "personal", "https://a.org"
+    )
+
+    assert record.year == 1930
+    assert record.date_key == "1930-05"
+    assert record.location == "Paris, France"
+    assert record.source == "https://a.org"
+
+
+def test_parse_bullets_ignores_markers_and_empty_lists():
+    """Bullet markers and the empty list placeholder are not event text."""
+    assert parse_bullets("[]- Born in 1891.\n* Baptized.\n\n1. Moved in 1900.") == [
+        "Born in 1891.",
+        "Baptized.",
+        "Moved in 1900.",
+    ]
+    assert parse_bullets("[]") == []
+    assert parse_bullets("- 1930 moved to Paris.\n- [1930] Moved.") == [
+        "1930 moved to Paris.",
+        "[1930] Moved.",
+    ]
+
+
+def test_store_indexes_by_year_and_name():
+    """Events are found by year and by normalized name within a category."""
+    store = EventStore.from_categories(
+        CategoriesWithEvents(
+            early="- Born in 1891 in New York.\n- Moved to Brooklyn in 1900.",
+            personal="- Moved to Paris in 1930.",
+        )
+    )
+
+    assert not store.add(EventRecord.from_text("born in 1891, in New York", "early"))
+    assert EventRecord.from_text("Moved to Paris in 1930", "personal") in store
+    assert EventRecord.from_text("Moved to Paris in 1930", "career") not in store
+    assert [r.name for r in store.in_year(1900)] == ["Moved to Brooklyn in 1900."]
+    assert len(store) == 3
+
+
+def test_categories_render_in_chronological_order():
+    """Undated events stay after the event they followed."""
+    store = EventStore(
+        records=[
+            EventRecord.from_text("Moved to Paris in 1930.", "personal"),
+            EventRecord.from_text("Lived on the Left Bank.", "personal"),
+            EventRecord.from_text("Married June in 1924.", "personal"),
+        ]
+    )
+
+    assert store.render("personal") == (
+        "- Married June in 1924.\n- Moved to Paris in 1930.\n- Lived on the Left Bank."
+    )
+    assert store.to_categories().early == ""
+
+
+def test_merge_categorized_events_drops_repeats_and_empty_lists():
+    """Events found on several pages are kept once."""
+    merged = EventService.merge_categorized_events(
+        [
+            CategoriesWithEvents(early="- Born in 1891."),
+            CategoriesWithEvents(early="- Born in 1891.\n- Moved in 1900."),
+            CategoriesWithEvents(),
+        ]
+    )
+
+    assert merged.early == "- Born in 1891.\n- Moved in 1900."
+    assert merged.personal == ""
+
+
+@pytest.mark.asyncio
+async def test_known_events_are_not_merged_again():
+    """Categories without new events keep their events without a model call."""
+    existing = CategoriesWithEvents(early="- Born in 1891.", career="- Wrote in 1934.")
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.create_llm_structured_model"
+    ) as create_model:
+        command = await combine_new_and_original_events(
+            {
+                "existing_events": existing,
+                "extracted_events_categorized": CategoriesWithEvents(
+                    early="- born in 1891"
+                ),
+            },
+            {},
+        )
+
+    create_model.assert_not_called()
+    assert command.update["existing_events"] == existing
+
+
+def test_near_duplicates_of_the_same_year_are_found():
+    """A shorter telling of a known event of the same year is a duplicate."""
+    store = EventStore.from_categories(
+        CategoriesWithEvents(
+            early="- Albert Einstein was born in Ulm, Germany, on 14 March 1879."
+        )
+    )
+
+    short = EventRecord.from_text("Born in Ulm, 1879", "personal")
+    other_year = EventRecord.from_text("Born in Ulm, 1880", "early")
+    different = EventRecord.from_text("His sister Maja was born in 1881.", "early")
+
+    assert store.find_duplicate(short, 0.8) is store.records[0]
+    assert store.find_duplicate(short, 1.01) is None
+    assert store.find_duplicate(other_year, 0.8) is None
+    assert store.find_duplicate(different, 0.8) is None
+
+
+def test_short_events_do_not_swallow_longer_new_ones():
+    """A short known event does not hide the details of a longer new one."""
+    store = EventStore.from_categories(
+        CategoriesWithEvents(personal="- In 1930 he moved to Paris.")
+    )
+
+    longer = EventRecord.from_text(
+        "In 1930 he moved to Paris, where he met Anais Nin and began writing "
+        "Tropic of Cancer.",
+        "personal",
+    )
+
+    assert store.find_duplicate(longer, 0.8) is None
+
+
+@pytest.mark.asyncio
+async def test_store_callers_get_a_store_back():
+    """Events passed as a store are merged without rendering existing_events."""
+    existing = EventStore.from_categories(
+        CategoriesWithEvents(early="- Born in 1891.", career="- Wrote in 1934.")
+    )
+    new = EventStore.from_categories(
+        CategoriesWithEvents(early="- Moved to Brooklyn in 1900."), "https://a.org"
+    )
+
+    async def ainvoke(prompt):
+        assert "Wrote in 1934" not in prompt
+        return AIMessage(content="- Born in 1891.\n- Moved to Brooklyn in 1900.")
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.create_llm_structured_model"
+    ) as create_model:
+        create_model.return_value.ainvoke = ainvoke
+        command = await combine_new_and_original_events(
+            {"event_store": existing, "extracted_event_store": new}, {}
+        )
+
+    assert set(command.update) == {"event_store"}
+    store = command.update["event_store"]
+    assert store.render("early") == "- Born in 1891.\n- Moved to Brooklyn in 1900."
+    assert store.render("career") == "- Wrote in 1934."
+    assert [record.source for record in store.in_category("early")] == [
+        None,
+        "https://a.org",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_merge_prompt_only_gets_new_events():
+    """Near duplicates are dropped and only new events reach the prompt."""
+    existing = CategoriesWithEvents(
+        early="- Albert Einstein was born in Ulm, Germany, on 14 March 1879."
+    )
+    prompts = []
+
+    async def ainvoke(prompt):
+        prompts.append(prompt)
+        return AIMessage(content="- merged")
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.create_llm_structured_model"
+    ) as create_model:
+        create_model.return_value.ainvoke = ainvoke
+        command = await combine_new_and_original_events(
+            {
+                "existing_events": existing,
+                "extracted_events_categorized": CategoriesWithEvents(
+                    early="- Born in Ulm, 1879\n- The family moved to Munich in 1880.",
+                    career="- Born in Ulm in 1879.",
+                ),
+            },
+            {},
+        )
+
+    assert len(prompts) == 1
+    assert "Munich" in prompts[0] and "Born in Ulm, 1879" not in prompts[0]
+    assert command.update["existing_events"].early == "- merged"
+    assert command.update["existing_events"].career == ""
+
+
+@pytest.mark.asyncio
+async def test_incremental_merge_only_sends_overlapping_years():
+    """The prompt holds the new event and its neighbours, the rest is spliced."""
+    existing = CategoriesWithEvents(
+        career="\n".join(
+            f"- Published book number {i} in {1900 + i}." for i in range(200)
+        )
+    )
+    prompts = []
+
+    async def ainvoke(prompt):
+        prompts.append(prompt)
+        return AIMessage(
+            content="- Published book number 30 in 1930.\n"
+            "- Published book number 31 in 1931, his first in Paris.\n"
+            "- Published book number 32 in 1932."
+        )
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.create_llm_structured_model"
+    ) as create_model:
+        create_model.return_value.ainvoke = ainvoke
+        command = await combine_new_and_original_events(
+            {
+                "existing_events": existing,
+                "extracted_events_categorized": CategoriesWithEvents(
+                    career="- Moved his publisher to Paris in 1931."
+                ),
+            },
+            {},
+        )
+
+    assert "number 30 in 1930" in prompts[0] and "number 32 in 1932" in prompts[0]
+    assert "number 29 in 1929" not in prompts[0]
+    assert "number 33 in 1933" not in prompts[0]
+
+    career = parse_bullets(command.update["existing_events"].career)
+    assert len(career) == 200
+    assert career[29:33] == [
+        "Published book number 29 in 1929.",
+        "Published book number 30 in 1930.",
+        "Published book number 31 in 1931, his first in Paris.",
+        "Published book number 32 in 1932.",
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("incremental", [True, False])
+async def test_large_merges_are_split_into_bounded_concurrent_groups(
+    word_tokenizer, incremental
+):
+    """Every merge prompt, template included, stays under the limit.
+
+    The bound holds with and without ``incremental_merge``, and the groups
+    are merged concurrently.
+    """
+    limit = template_tokens(word_tokenizer) + 40
+    existing = CategoriesWithEvents(
+        career="\n".join(f"- Gave lecture {i} in {1900 + 2 * i}." for i in range(20))
+    )
+    new = CategoriesWithEvents(
+        career="\n".join(f"- Wrote essay {i} in {1900 + 2 * i}." for i in range(20))
+    )
+    in_flight, peak, prompts = 0, 0, []
+
+    async def ainvoke(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        # Echo the events back, as a merge that keeps everything would
+        events = prompt.split("Original events:")[1].split("</Events>")[0]
+        lines = [line for line in events.splitlines() if line.startswith("- ")]
+        return AIMessage(content="\n".join(lines))
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.create_llm_structured_model"
+    ) as create_model:
+        create_model.return_value.ainvoke = ainvoke
+        command = await combine_new_and_original_events(
+            {"existing_events": existing, "extracted_events_categorized": new},
+            {
+                "configurable": {
+                    "merge_group_max_tokens": limit,
+                    "merge_window_years": 0,
+                    "incremental_merge": incremental,
+                }
+            },
+        )
+
+    assert len(prompts) > 1 and peak == len(prompts)
+    for prompt in prompts:
+        assert len(word_tokenizer.encode(prompt)) <= limit
+    career = parse_bullets(command.update["existing_events"].career)
+    assert len(career) == 40
+    assert career[:2] == ["Gave lecture 0 in 1900.", "Wrote essay 0 in 1900."]
+
+
+@pytest.mark.asyncio
+async def test_crowded_years_are_split_into_bounded_groups(word_tokenizer):
+    """Many existing events in one year do not make one oversized group.
+
+    Each new event is merged once, with the nearest events that fit, and
+    the others are left as they are.
+    """
+    existing = [
+        EventRecord.from_text(f"Gave lecture {i} in Paris in 1930.", "career")
+        for i in range(300)
+    ]
+    new = [
+        EventRecord.from_text("Wrote an essay in 1930.", "career"),
+        EventRecord.from_text("Met Anais Nin in 1930.", "career"),
+    ]
+    limit = template_tokens(word_tokenizer) + 200
+
+    groups, untouched = await plan_merge_groups(new, existing, 0, limit)
+
+    for new_group, old_group in groups:
+        prompt = MERGE_EVENTS_TEMPLATE.format(
+            original=EventStore(records=old_group).render("career"),
+            new=EventStore(records=new_group).render("career"),
+        )
+        assert len(word_tokenizer.encode(prompt)) <= limit
+    merged_new = [record for new_group, _ in groups for record in new_group]
+    assert sorted(map(id, merged_new)) == sorted(map(id, new))
+    merged_old = [id(old) for _, old_group in groups for old in old_group]
+    assert merged_old and len(set(merged_old)) == len(merged_old)
+    assert sorted(merged_old + list(map(id, untouched))) == sorted(map(id, existing))
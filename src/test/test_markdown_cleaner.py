@@ -0,0 +1,74 @@
+"""Tests for the scraped Markdown cleaner."""
+
+import time
+
+import pytest
+from src.url_crawler.markdown_cleaner import MarkdownNormalizer
+from src.url_crawler.utils import get_markdown_normalizer
+
+SCRAPED_MARKDOWN = """# Henry Miller
+
+![Portrait of Miller](https://upload.wikimedia.org/miller.jpg)
+Henry Miller[1] was born in [Yorkville](/wiki/Yorkville) in 1891.[citation needed]   More at https://example.com/miller.
+
+
+
+| Born | December 26, 1891 |
+|---|---|
+- [Home](/)
+- [Random article](/wiki/Special:Random)
+- Tropic of Cancer (1934)
+"""
+
+
+def test_normalizer_strips_noise_and_keeps_events():
+    """Everything but the biographical text is removed in one pass."""
+    cleaned, stats = MarkdownNormalizer().normalize(SCRAPED_MARKDOWN)
+
+    assert cleaned == (
+        "# Henry Miller\n\n\nHenry Miller was born in Yorkville in 1891. More at \n\n"
+        "- Tropic of Cancer (1934)\n"
+    )
+    assert set(stats.removed_chars) == {
+        "tables",
+        "nav_lists",
+        "images",
+        "links",
+        "footnotes",
+        "bare_urls",
+        "whitespace",
+    }
+    assert stats.chars_in - stats.chars_out == sum(stats.removed_chars.values())
+    assert stats.estimated_tokens_saved > 0
+
+
+def test_normalizer_rules_are_configurable():
+    """Disabled rules leave their content alone."""
+    cleaned, stats = MarkdownNormalizer(["links"]).normalize(SCRAPED_MARKDOWN)
+
+    assert "[1]" in cleaned
+    assert "| Born |" in cleaned
+    assert "[Yorkville]" not in cleaned
+    assert set(stats.removed_chars) == {"links"}
+
+    with pytest.raises(ValueError):
+        MarkdownNormalizer(["emojis"])
+
+
+def test_normalizer_is_linear_on_hostile_input():
+    """Unbalanced brackets on a max-length page do not cause backtracking blowups."""
+    hostile = "[" * 50_000 + "(" * 50_000
+    normalizer = MarkdownNormalizer()
+
+    start = time.perf_counter()
+    normalizer.normalize(hostile)
+    normalizer.normalize(SCRAPED_MARKDOWN * 400)
+
+    assert time.perf_counter() - start < 2
+
+
+def test_cleaning_rules_accept_a_comma_separated_list(monkeypatch):
+    """MARKDOWN_CLEANING_RULES=images,links configures just those rules."""
+    monkeypatch.setenv("MARKDOWN_CLEANING_RULES", "images, links")
+
+    assert get_markdown_normalizer().rules == ["images", "links"]
@@ -2,9 +2,13 @@
 
 """Tests for the merge_events_graph."""
 
+import asyncio
+import re
+import time
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from langchain_core.messages import AIMessage
 from src.state import CategoriesWithEvents
 
 # Imports are relative to the src directory (configured in pyproject.toml pythonpath)
@@ -136,3 +140,51 @@ async def test_merge_events_with_real_llm(sample_input_state: dict):
     assert "Married" in merged.personal
     assert "Nobel Prize" in merged.legacy
     assert "London" in merged.personal
+
+
+def extraction_response(prompt: str) -> AIMessage:
+    """Extract the single sentence of a chunk as a career event."""
+    sentence = re.search(r"Miller \w+ to \w+ in \d+\.", prompt).group(0)
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": "RelevantEventsCategorized",
+                "args": {
+                    "early": "",
+                    "personal": "",
+                    "career": f"- {sentence}",
+                    "legacy": "",
+                },
+                "id": "call",
+            }
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_extracted_concurrently_in_order():
+    """Extraction takes as long as the slowest wave of calls, results in order."""
+    chunks = [f"Miller moved to Paris in {1930 + i}." for i in range(8)]
+
+    async def ainvoke(prompt):
+        # Later chunks answer first, the results must still follow the chunks
+        year = int(re.search(r"in (\d+)\.", prompt).group(1))
+        await asyncio.sleep(0.1 + 0.005 * (1940 - year))
+        return extraction_response(prompt)
+
+    with patch.object(merge_events_graph, "create_llm_with_tools") as create_model:
+        create_model.return_value.ainvoke = AsyncMock(side_effect=ainvoke)
+        start = time.perf_counter()
+        command = await merge_events_graph.extract_and_categorize_chunk(
+            {"text_chunks": chunks},
+            {"configurable": {"extraction_concurrency": 4}},
+        )
+        elapsed = time.perf_counter() - start
+
+    # Eight calls, four at a time
+    assert 0.2 <= elapsed < 0.4
+    assert command.goto == "merge_categorizations"
+    assert [c.career for c in command.update["categorized_chunks"]] == [
+        f"- {chunk}" for chunk in chunks
+    ]
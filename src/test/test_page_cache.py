@@ -0,0 +1,128 @@
+"""Tests for the scrape page cache."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from src.services.url_service import URLService
+from src.url_crawler import utils
+from src.url_crawler.cache import PageCache, get_page_cache
+
+
+@pytest.fixture
+def page_cache(tmp_path) -> PageCache:
+    """Provide an empty cache stored in a temporary directory."""
+    return PageCache(
+        path=str(tmp_path / "pages.sqlite3"), ttl_seconds=0, max_bytes=10_000
+    )
+
+
+def test_canonicalize_url_ignores_cosmetic_differences():
+    """Equivalent URLs share one canonical form."""
+    assert URLService.canonicalize_url(
+        "HTTPS://en.Wikipedia.org:443/wiki/Henry_Miller/?utm_source=x#Life"
+    ) == URLService.canonicalize_url("https://en.wikipedia.org/wiki/Henry_Miller")
+
+
+def test_cache_round_trip_and_stats(page_cache: PageCache):
+    """A stored page is returned on the next lookup and counted as a hit."""
+    url = "https://en.wikipedia.org/wiki/Henry_Miller"
+    assert page_cache.get(url) is None
+
+    page_cache.set(url, "Born in 1891.", fetch_seconds=2.5)
+
+    assert page_cache.get(url + "#Early_life") == "Born in 1891."
+    assert page_cache.stats.hits == 1
+    assert page_cache.stats.misses == 1
+    assert page_cache.stats.saved_seconds == 2.5
+
+
+def test_page_cache_follows_the_run_config(tmp_path):
+    """The cache location and switch come from the config of the run."""
+    cache_dir = str(tmp_path / "scrape")
+    config = {"configurable": {"scrape_cache_dir": cache_dir}}
+
+    cache = get_page_cache(config)
+
+    assert os.path.dirname(cache.path) == cache_dir
+    assert get_page_cache(config) is cache
+    assert get_page_cache({"configurable": {"scrape_cache_enabled": False}}) is None
+
+
+def test_cache_expires_entries(tmp_path):
+    """Entries older than the TTL are treated as misses."""
+    cache = PageCache(str(tmp_path / "pages.sqlite3"), ttl_seconds=10, max_bytes=0)
+    url = "https://example.com/page"
+
+    with patch("src.url_crawler.cache.time.time", return_value=1000.0):
+        cache.set(url, "content")
+    with patch("src.url_crawler.cache.time.time", return_value=1011.0):
+        assert cache.get(url) is None
+
+    assert cache.stats.expired == 1
+
+
+def test_cache_evicts_least_recently_used(page_cache: PageCache):
+    """The least recently read page is evicted first when over budget."""
+    page = os.urandom(4000).hex()  # ~4.6 kB after compression, two fit the budget
+    for now, url in [(1.0, "a"), (2.0, "b")]:
+        with patch("src.url_crawler.cache.time.time", return_value=now):
+            page_cache.set(f"https://example.com/{url}", page)
+    with patch("src.url_crawler.cache.time.time", return_value=3.0):
+        page_cache.get("https://example.com/a")
+    with patch("src.url_crawler.cache.time.time", return_value=4.0):
+        page_cache.set("https://example.com/c", page)
+
+    assert page_cache.get("https://example.com/b") is None
+    assert page_cache.get("https://example.com/a") == page
+    assert page_cache.get("https://example.com/c") == page
+    assert page_cache.stats.evictions == 1
+    assert page_cache.total_bytes() <= page_cache.max_bytes
+
+
+@pytest.mark.asyncio
+async def test_url_crawl_uses_cache(page_cache: PageCache):
+    """A second crawl of the same URL does not scrape again."""
+    with (
+        patch.object(utils, "get_page_cache", return_value=page_cache),
+        patch.object(
+            utils, "scrape_page_content", AsyncMock(return_value="[Paris](/wiki/Paris)")
+        ) as mock_scrape,
+    ):
+        first = await utils.url_crawl("https://example.com/page")
+        second = await utils.url_crawl("https://example.com/page/")
+
+    assert first == second == "Paris"
+    mock_scrape.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_crawls_of_one_url_share_a_scrape():
+    """Callers crawling the same page at the same time trigger a single scrape."""
+    release = asyncio.Event()
+
+    async def slow_scrape(url, config=None):
+        await release.wait()
+        return "Born in 1891."
+
+    with (
+        patch.object(utils, "get_page_cache", return_value=None),
+        patch.object(
+            utils, "scrape_page_content", AsyncMock(side_effect=slow_scrape)
+        ) as mock_scrape,
+    ):
+        crawls = [
+            asyncio.create_task(utils.url_crawl(url))
+            for url in [
+                "https://en.wikipedia.org/wiki/Henry_Miller",
+                "https://en.wikipedia.org/wiki/Henry_Miller#Life",
+                "https://en.wikipedia.org/wiki/Henry_Miller/",
+            ]
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*crawls)
+
+    assert results == ["Born in 1891."] * 3
+    mock_scrape.assert_awaited_once()
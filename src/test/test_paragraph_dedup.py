@@ -0,0 +1,52 @@
+"""Tests for intra-page paragraph deduplication."""
+
+import random
+import time
+
+from src.url_crawler.dedup import ParagraphDeduplicator
+
+PARAGRAPH = (
+    "In 1930 Henry Miller moved to Paris, where he lived in poverty and wrote "
+    "Tropic of Cancer, which was published in 1934 by Obelisk Press."
+)
+
+
+def test_exact_and_near_duplicates_are_dropped():
+    """Repeats and lightly edited copies are dropped, new paragraphs are kept."""
+    deduplicator = ParagraphDeduplicator()
+
+    assert not deduplicator.is_duplicate(PARAGRAPH)
+    assert deduplicator.is_duplicate("  " + PARAGRAPH.upper() + "\n\n")
+    assert deduplicator.is_duplicate(PARAGRAPH.replace("poverty", "great poverty"))
+    assert not deduplicator.is_duplicate(
+        "Miller married June Mansfield in 1924 and later divorced her in 1934."
+    )
+    assert not deduplicator.is_duplicate("\n\n")
+
+    assert deduplicator.stats.exact_duplicates == 1
+    assert deduplicator.stats.near_duplicates == 1
+    assert deduplicator.stats.paragraphs == 4
+
+
+def test_short_paragraphs_only_dedup_on_exact_match():
+    """Captions are dropped when repeated verbatim, but not when merely similar."""
+    deduplicator = ParagraphDeduplicator()
+
+    assert not deduplicator.is_duplicate("Miller in 1940")
+    assert deduplicator.is_duplicate("Miller in 1940.")
+    assert not deduplicator.is_duplicate("Miller in 1941")
+
+
+def test_dedup_of_max_length_page_is_fast():
+    """A 100k-char page of distinct paragraphs is processed in well under a second."""
+    rng = random.Random(0)
+    vocabulary = PARAGRAPH.split() + [str(year) for year in range(1850, 1990)]
+    paragraphs = [" ".join(rng.choices(vocabulary, k=50)) for _ in range(400)]
+    assert sum(len(p) for p in paragraphs) > 90_000
+
+    deduplicator = ParagraphDeduplicator()
+    start = time.perf_counter()
+    kept = [p for p in paragraphs if not deduplicator.is_duplicate(p)]
+
+    assert time.perf_counter() - start < 1
+    assert len(kept) > 390
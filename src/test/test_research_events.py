@@ -5,6 +5,7 @@
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from src.services.event_store import EventStore
 from src.state import CategoriesWithEvents
 
 # Imports are relative to the src directory (configured in pyproject.toml pythonpath)
@@ -60,7 +61,6 @@ def mock_url_crawler():
         mock_crawler = AsyncMock()
         mock_crawler.ainvoke.return_value = {
             "extracted_events": extracted_events,
-            "raw_scraped_content": "Mock scraped content",
         }
         return mock_crawler
 
@@ -176,3 +176,59 @@ async def test_research_events_with_real_llm(sample_input_state: dict):
 
     # Verify that domains were tracked
     assert isinstance(used_domains, list)
+
+
+@pytest.mark.asyncio
+async def test_research_events_crawls_urls_in_parallel(sample_input_state: dict):
+    """All selected URLs are crawled and extracted before a single final merge."""
+    from unittest.mock import Mock
+
+    merged_events = CategoriesWithEvents(early="- Born in 1891 in New York.")
+    merge_inputs = []
+
+    async def mock_merge(input_state):
+        merge_inputs.append(input_state)
+        if input_state.get("extract_only"):
+            return {
+                "event_store": EventStore(),
+                "extracted_event_store": EventStore.from_categories(
+                    CategoriesWithEvents(early=f"- Events from {input_state['url']}")
+                ),
+            }
+        return {"event_store": EventStore.from_categories(merged_events)}
+
+    with (
+        patch("research_events.research_events_graph.url_crawler_app") as mock_crawler,
+        patch("research_events.research_events_graph.merge_events_app") as mock_merger,
+        patch("research_events.research_events_graph.TavilySearch") as mock_tavily,
+        patch(
+            "research_events.research_events_graph.create_llm_structured_model"
+        ) as mock_llm,
+    ):
+        mock_merger.ainvoke = AsyncMock(side_effect=mock_merge)
+        mock_tavily.return_value.invoke.return_value = {"results": []}
+        mock_llm.return_value = Mock(
+            invoke=Mock(
+                return_value=Mock(
+                    selected_urls=[
+                        "https://en.wikipedia.org/wiki/Henry_Miller",
+                        "https://www.britannica.com/biography/Henry-Miller",
+                    ]
+                )
+            )
+        )
+
+        result = await research_events_app.ainvoke(sample_input_state)
+
+    assert result["existing_events"] == merged_events
+    assert sorted(result["used_domains"]) == ["en.wikipedia.org", "www.britannica.com"]
+    # Pages are streamed into the merge sub-graph, not crawled into state first
+    mock_crawler.ainvoke.assert_not_called()
+
+    # Two extraction branches, then exactly one merge with the existing events
+    assert [i.get("extract_only", False) for i in merge_inputs] == [True, True, False]
+    # The existing events are parsed once and handed over as a store
+    assert isinstance(merge_inputs[-1]["event_store"], EventStore)
+    assert "existing_events" not in merge_inputs[-1]
+    final_new_events = merge_inputs[-1]["extracted_event_store"].render("early")
+    assert final_new_events.index("wikipedia") < final_new_events.index("britannica")
@@ -0,0 +1,64 @@
+"""Tests for the scraper backends."""
+
+import pytest
+from src.url_crawler.backends import FileBackend, get_scraper_backend, html_to_markdown
+
+
+def test_html_to_markdown_keeps_content_and_drops_chrome():
+    """Headings, paragraphs, lists and links survive; scripts and nav do not."""
+    html = """
+    <html><head><style>body {color: red}</style></head><body>
+    <nav><a href="/">Home</a></nav>
+    <h1>Henry Miller</h1>
+    <p>Born in <a href="/wiki/Yorkville">Yorkville</a> in 1891.</p>
+    <ul><li>Tropic of Cancer (1934)</li><li>Tropic of Capricorn (1939)</li></ul>
+    <script>track()</script>
+    </body></html>
+    """
+
+    markdown = html_to_markdown(html)
+
+    assert markdown.startswith("# Henry Miller")
+    assert "Born in [Yorkville](/wiki/Yorkville) in 1891." in markdown
+    assert "- Tropic of Cancer (1934)" in markdown
+    assert "Home" not in markdown
+    assert "track()" not in markdown
+    assert "color" not in markdown
+
+
+@pytest.mark.asyncio
+async def test_file_backend_reads_markdown_and_html_fixtures(tmp_path):
+    """Pages are looked up by host and path, with HTML converted on the fly."""
+    host_dir = tmp_path / "en.wikipedia.org" / "wiki"
+    host_dir.mkdir(parents=True)
+    (host_dir / "Henry_Miller.md").write_text("Born in 1891.", encoding="utf-8")
+    (host_dir / "Anais_Nin.html").write_text("<p>Born in 1903.</p>", encoding="utf-8")
+    backend = FileBackend(str(tmp_path))
+
+    assert await backend.scrape("https://en.wikipedia.org/wiki/Henry_Miller") == (
+        "Born in 1891."
+    )
+    assert await backend.scrape("https://en.wikipedia.org/wiki/Anais_Nin") == (
+        "Born in 1903."
+    )
+    assert await backend.scrape("https://en.wikipedia.org/wiki/Missing") is None
+
+
+def test_get_scraper_backend_rejects_unknown_names():
+    """A typo in the configuration fails loudly instead of scraping nothing."""
+    with pytest.raises(ValueError):
+        get_scraper_backend("carrier-pigeon")
+
+
+def test_get_scraper_backend_reads_the_node_config(tmp_path):
+    """The backend chosen in the run's configurable is used."""
+    backend = get_scraper_backend(
+        config={
+            "configurable": {
+                "scraper_backend": "file",
+                "scraper_fixtures_dir": str(tmp_path),
+            }
+        }
+    )
+
+    assert isinstance(backend, FileBackend)
@@ -0,0 +1,165 @@
+"""Tests for the run-wide token budget."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from src.core import token_budget
+from src.core.token_budget import (
+    TokenBudget,
+    finish_token_budget,
+    get_token_budget,
+    start_token_budget,
+    token_budget_config,
+)
+from src.graph import supervisor_node, supervisor_tools_node
+from src.research_events.merge_events.merge_events_graph import (
+    combine_new_and_original_events,
+    extract_and_categorize_chunk,
+)
+from src.state import CategoriesWithEvents
+
+
+@pytest.fixture
+def budget_config() -> dict:
+    """Provide a run with a 100 token budget."""
+    config = {"configurable": {"run_token_budget": 100}}
+    config = token_budget_config(config, start_token_budget(config))
+    yield config
+    finish_token_budget(config)
+
+
+@pytest.mark.asyncio
+async def test_budget_charges_and_denies(word_tokenizer):
+    """Prompts are charged until the next one no longer fits."""
+    budget = TokenBudget(limit=10, low_ratio=0.5)
+
+    assert await budget.reserve("stage", "one two three four")
+    assert not budget.is_low
+    assert await budget.reserve("stage", "five six")
+    assert budget.is_low
+    assert budget.model_for("big", "small") == "small"
+    assert not await budget.reserve("stage", "a b c d e")
+    assert budget.spent == 6
+    assert budget.stats.denied == {"stage": 1}
+
+    assert not await budget.reserve("stage", "a b c d e", required=True)
+    assert budget.spent == 11 and budget.is_exhausted
+
+
+@pytest.mark.asyncio
+async def test_unlimited_budget_never_tokenizes():
+    """Without a limit prompts are only counted, not tokenized."""
+    budget = TokenBudget()
+
+    with patch("src.url_crawler.tokenization.get_tokenizer") as get_tokenizer:
+        assert await budget.reserve("stage", "some prompt")
+
+    get_tokenizer.assert_not_called()
+    assert budget.stats.calls == {"stage": 1}
+    assert budget.model_for("big", "small") == "big"
+
+
+def test_runs_without_thread_id_get_their_own_budget():
+    """Concurrent runs sharing no thread_id never charge each other's budget."""
+    config = {"configurable": {"run_token_budget": 100}}
+    first = token_budget_config(config, start_token_budget(config))
+    second = token_budget_config(config, start_token_budget(config))
+
+    get_token_budget(first).charge("supervisor", 60)
+
+    assert get_token_budget(second).spent == 0
+    assert finish_token_budget(first).spent == 60
+    assert finish_token_budget(second).spent == 0
+
+
+def test_calls_outside_a_run_do_not_share_or_keep_a_budget():
+    """Standalone sub-graph calls never accumulate spend across runs."""
+    config = {"configurable": {"run_token_budget": 100, "thread_id": "t1"}}
+    runs = len(token_budget._budgets)
+
+    get_token_budget(config).charge("filter_chunks", 60)
+
+    assert get_token_budget(config).spent == 0
+    assert len(token_budget._budgets) == runs
+
+
+@pytest.mark.asyncio
+async def test_failed_run_releases_its_budget(budget_config):
+    """A run that raises drops its budget instead of leaking it."""
+    budget_id = budget_config["configurable"]["token_budget_id"]
+    get_token_budget(budget_config).charge("supervisor", 60)
+    tool_call = {
+        "name": "ResearchEventsTool",
+        "args": {"research_question": "Henry Miller in Paris"},
+        "id": "call-1",
+    }
+    state = {
+        "conversation_history": [AIMessage(content="", tool_calls=[tool_call])],
+        "token_budget_id": budget_id,
+    }
+
+    with (
+        patch("src.graph.research_events_app") as research_events,
+        pytest.raises(RuntimeError),
+    ):
+        research_events.ainvoke = AsyncMock(side_effect=RuntimeError("crawl failed"))
+        await supervisor_tools_node(state, {})
+
+    assert get_token_budget(budget_config).spent == 0
+
+
+@pytest.mark.asyncio
+async def test_supervisor_finishes_early_when_budget_is_low(budget_config):
+    """A low budget sends the supervisor straight to structuring."""
+    get_token_budget(budget_config).charge("supervisor", 90)
+
+    with patch("src.graph.create_llm_with_tools") as create_model:
+        command = await supervisor_node(
+            {
+                "person_to_research": "Henry Miller",
+                "iteration_count": 1,
+                "token_budget_id": budget_config["configurable"]["token_budget_id"],
+            },
+            budget_config,
+        )
+
+    assert command.goto == "structure_events"
+    create_model.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_extraction_stops_when_budget_is_exhausted(budget_config, word_tokenizer):
+    """Chunks that no longer fit the budget are not extracted."""
+    get_token_budget(budget_config).charge("filter_chunks", 100)
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.create_llm_with_tools"
+    ) as create_model:
+        command = await extract_and_categorize_chunk(
+            {"text_chunks": ["Miller moved to Paris in 1930."], "categorized_chunks": []},
+            budget_config,
+        )
+
+    assert command.goto == "merge_categorizations"
+    create_model.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_merge_keeps_new_events_without_budget(budget_config, word_tokenizer):
+    """Without budget for the merge prompt, new events are appended unmerged."""
+    get_token_budget(budget_config).charge("supervisor", 100)
+
+    command = await combine_new_and_original_events(
+        {
+            "existing_events": CategoriesWithEvents(early="- Born in 1891."),
+            "extracted_events_categorized": CategoriesWithEvents(
+                early="- Moved to Brooklyn in 1900."
+            ),
+        },
+        budget_config,
+    )
+
+    merged = command.update["existing_events"]
+    assert merged.early == "- Born in 1891.\n- Moved to Brooklyn in 1900."
+    assert merged.career == ""
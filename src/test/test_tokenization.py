@@ -0,0 +1,78 @@
+"""Tests for the batched tokenization service."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.url_crawler.tokenization import TokenizationService, token_start_offsets
+from src.url_crawler.utils import count_tokens
+
+DOCUMENTS = [
+    f"Henry Miller wrote book number {i} in Paris during the year {1930 + i}."
+    for i in range(25)
+]
+
+
+@pytest.mark.asyncio
+async def test_batch_counts_match_single_encodes(word_tokenizer):
+    """Batched counts equal encoding every document on its own."""
+    service = TokenizationService(threads=4)
+
+    counts = await service.count_tokens(DOCUMENTS)
+
+    assert counts == [len(word_tokenizer.encode(doc)) for doc in DOCUMENTS]
+    assert await count_tokens(DOCUMENTS) == sum(counts)
+    assert service.stats.documents == len(DOCUMENTS)
+    assert service.stats.chars == sum(len(doc) for doc in DOCUMENTS)
+
+
+def test_ascii_offsets_match_token_text(word_tokenizer):
+    """Offsets from the ASCII fast path point at each token's text."""
+    text = DOCUMENTS[0] + "\n\n" + DOCUMENTS[1]
+
+    offsets = token_start_offsets(word_tokenizer, text)
+    tokens = word_tokenizer.encode(text)
+
+    bounds = offsets + [len(text)]
+    assert [text[a:b] for a, b in zip(bounds, bounds[1:])] == [
+        word_tokenizer.decode([token]) for token in tokens
+    ]
+
+
+@pytest.mark.asyncio
+async def test_large_batches_are_split_across_workers_in_order(word_tokenizer):
+    """Batches over the threshold go to the pool and come back in order."""
+    service = TokenizationService(process_workers=3, process_threshold_chars=100)
+    # Any executor works, threads keep the patched tokenizer visible
+    service._process_pool = ThreadPoolExecutor(3)
+
+    offsets = await service.token_offsets(DOCUMENTS)
+
+    assert offsets == [token_start_offsets(word_tokenizer, doc) for doc in DOCUMENTS]
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_tokenization_does_not_block_the_event_loop(word_tokenizer):
+    """The event loop keeps running while a slow batch is encoded."""
+    encode = word_tokenizer.encode
+
+    def slow_encode(text):
+        time.sleep(0.2)
+        return encode(text)
+
+    word_tokenizer.encode_ordinary = slow_encode
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await TokenizationService().count_tokens([DOCUMENTS[0]])
+    task.cancel()
+
+    assert ticks >= 5
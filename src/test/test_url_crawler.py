@@ -7,6 +7,14 @@ from unittest.mock import AsyncMock, patch
 import pytest
 
 # Imports are relative to the src directory (configured in pyproject.toml pythonpath)
+from src.url_crawler.chunking import chunk_segments_by_tokens, chunk_text_by_tokens
+from src.url_crawler.utils import (
+    clean_page_content,
+    iter_text_segments,
+    stream_page_segments,
+)
+from src.url_crawler.windowing import select_relevant_window
+
 from url_crawler.url_krawler_graph import url_crawler_app
 
 
@@ -50,17 +58,17 @@ async def test_url_crawler_with_mocked_llm(
 
     # --- Assert: Verify the output ---
     assert "extracted_events" in result
-    assert "raw_scraped_content" in result
+    # The scraped content is returned once, not duplicated in the state
+    assert "raw_scraped_content" not in result
 
     extracted_events = result["extracted_events"]
-    raw_scraped_content = result["raw_scraped_content"]
 
     # Verify that the scraped content is returned
     assert extracted_events == mock_scraped_content
-    assert raw_scraped_content == mock_scraped_content
 
     # Verify that url_crawl was called with the correct URL
-    mock_crawl.assert_called_once_with(sample_input_state["url"])
+    mock_crawl.assert_called_once()
+    assert mock_crawl.call_args.args[0] == sample_input_state["url"]
 
 
 @pytest.mark.asyncio
@@ -78,17 +86,15 @@ async def test_url_crawler_with_mocked_url_crawling(
 
     # --- Assert: Verify the output ---
     assert "extracted_events" in result
-    assert "raw_scraped_content" in result
 
     extracted_events = result["extracted_events"]
-    raw_scraped_content = result["raw_scraped_content"]
 
     # Verify that the scraped content is returned correctly
     assert extracted_events == mock_scraped_content
-    assert raw_scraped_content == mock_scraped_content
 
     # Verify that url_crawl was called with the correct URL
-    mock_crawl.assert_called_once_with(sample_input_state["url"])
+    mock_crawl.assert_called_once()
+    assert mock_crawl.call_args.args[0] == sample_input_state["url"]
 
 
 @pytest.mark.asyncio
@@ -107,11 +113,9 @@ async def test_url_crawler_with_empty_content():
 
     # --- Assert: Verify the output ---
     assert "extracted_events" in result
-    assert "raw_scraped_content" in result
 
     # Should return empty content
     assert result["extracted_events"] == ""
-    assert result["raw_scraped_content"] == ""
 
 
 @pytest.mark.asyncio
@@ -133,9 +137,185 @@ async def test_url_crawler_with_long_content():
 
     # --- Assert: Verify the output ---
     assert "extracted_events" in result
-    assert "raw_scraped_content" in result
 
     # Content should be truncated to MAX_CONTENT_LENGTH
     returned_content = result["extracted_events"]
     assert len(returned_content) <= len(long_content)
-    assert returned_content == result["raw_scraped_content"]
\ No newline at end of file
+
+def test_iter_text_segments_round_trips_and_bounds_size(mock_scraped_content: str):
+    """Segments join back to the original text and respect the size limit."""
+    text = mock_scraped_content + "\n\n" + "word " * 1000
+
+    segments = list(iter_text_segments(text, max_segment_length=500))
+
+    assert "".join(segments) == text
+    assert all(len(segment) <= 500 for segment in segments)
+
+
+def test_clean_page_content_reads_the_node_config():
+    """Dedup settings in the run's configurable are not ignored."""
+    content = "Born in 1891 in Yorkville.\n\n" * 3
+
+    deduplicated = clean_page_content("https://example.com", content)
+    kept = clean_page_content(
+        "https://example.com",
+        content,
+        {"configurable": {"dedup_paragraphs": False}},
+    )
+
+    assert deduplicated.count("Yorkville") == 1
+    assert kept.count("Yorkville") == 3
+
+
+def test_clean_page_content_never_cuts_links():
+    """Links in paragraphs over the segment limit are cleaned whole."""
+    paragraph = " ".join(
+        f"[Some Person Number {i}](https://example.com/wiki/Person_{i})"
+        for i in range(200)
+    )
+    assert len(paragraph) > 2000
+
+    cleaned = clean_page_content("https://example.com", paragraph + "\n\nThe end.")
+
+    assert "[" not in cleaned and "](" not in cleaned
+    assert "Some Person Number 22 " in cleaned
+
+
+@pytest.mark.asyncio
+async def test_chunk_text_by_tokens_overlaps(
+    word_tokenizer, mock_scraped_content: str
+):
+    """Consecutive chunks share overlap_size tokens and cover the whole text."""
+    spans = await chunk_text_by_tokens(
+        mock_scraped_content, chunk_size=20, overlap_size=5
+    )
+    chunks = [str(span) for span in spans]
+
+    assert len(chunks) > 1
+    assert spans[0].start == 0 and spans[-1].end == len(mock_scraped_content)
+    for span, chunk in zip(spans, chunks):
+        assert chunk == mock_scraped_content[span.start : span.end]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert word_tokenizer.encode(previous)[-5:] == word_tokenizer.encode(chunk)[:5]
+    assert chunks[-1].endswith(mock_scraped_content[-20:])
+
+
+@pytest.mark.asyncio
+async def test_stream_page_segments_cleans_like_the_whole_page():
+    """The streamed paragraphs join to the same text as cleaning the page at once."""
+    content = (
+        "# Henry Miller\n\n\n\n   Born in [Yorkville](https://a.org/y) in 1891.  \n"
+        "![photo](https://a.org/p.png)\n  \n"
+        "Born in [Yorkville](https://a.org/y) in 1891.  \n\n"
+        "| a | b |\n| 1 | 2 |\n\nMoved to Paris in 1930 [12]."
+    )
+
+    with patch("src.url_crawler.utils.fetch_page_markdown", return_value=content):
+        segments = [s async for s in stream_page_segments("https://a.org")]
+
+    assert len(segments) > 1
+    assert "".join(segments) == clean_page_content("https://a.org", content)
+
+
+@pytest.mark.asyncio
+async def test_chunk_segments_by_tokens_stops_reading_at_max_chunks(word_tokenizer):
+    """Chunks are yielded as the stream fills them and the tail is never read."""
+    paragraphs = [f"Miller wrote book number {i} in {1930 + i}.\n\n" for i in range(50)]
+    read = 0
+
+    async def segments():
+        nonlocal read
+        for paragraph in paragraphs:
+            read += 1
+            yield paragraph
+
+    spans = [
+        span
+        async for span in chunk_segments_by_tokens(
+            segments(), chunk_size=20, overlap_size=4, max_chunks=3
+        )
+    ]
+
+    text = "".join(paragraphs)
+    assert len(spans) == 3 and read < len(paragraphs)
+    assert spans[0].start == 0
+    for span in spans:
+        assert str(span) == text[span.start : span.end]
+        assert len(word_tokenizer.encode(str(span))) <= 20
+
+
+@pytest.mark.asyncio
+async def test_chunk_segments_by_tokens_covers_the_whole_stream(word_tokenizer):
+    """Without a limit the streamed chunks overlap and reach the end of the text."""
+    paragraphs = [f"Miller wrote book number {i} in {1930 + i}.\n\n" for i in range(50)]
+
+    async def segments():
+        for paragraph in paragraphs:
+            yield paragraph
+
+    spans = [
+        span
+        async for span in chunk_segments_by_tokens(
+            segments(), chunk_size=20, overlap_size=4
+        )
+    ]
+
+    text = "".join(paragraphs)
+    assert spans[-1].end == len(text)
+    for span, next_span in zip(spans, spans[1:]):
+        assert str(span) == text[span.start : span.end]
+        assert next_span.start < span.end
+
+
+class ByteEncoding:
+    """One token per UTF-8 byte, so tokens split multi-byte characters."""
+
+    def encode_ordinary(self, text: str) -> list[int]:
+        """Encode every byte of the text as its own token."""
+        return list(text.encode("utf-8"))
+
+    def decode_tokens_bytes(self, tokens: list[int]) -> list[bytes]:
+        """Return the single byte of each token."""
+        return [bytes([token]) for token in tokens]
+
+
+@pytest.mark.asyncio
+async def test_chunk_text_by_tokens_never_splits_characters():
+    """Chunk boundaries inside a multi-byte character snap to its start."""
+    text = "Miller visitó Düsseldorf, Kraków and 東京 in 1950 ✈ and came back."
+
+    with patch("src.url_crawler.tokenization.get_tokenizer", return_value=ByteEncoding()):
+        spans = await chunk_text_by_tokens(text, chunk_size=7, overlap_size=2)
+
+    chunks = [str(span) for span in spans]
+    assert all(chunk for chunk in chunks)
+    # Without overlap the chunks tile the original text exactly
+    assert "".join(
+        text[span.start : next_span.start] for span, next_span in zip(spans, spans[1:])
+    ) + chunks[-1] == text
+    assert all(len(chunk.encode("utf-8")) <= 7 + 3 for chunk in chunks)
+
+
+def test_select_relevant_window_keeps_biography_over_references():
+    """Event-dense paragraphs win over navigation and reference lists."""
+    biography = (
+        "## Early life\n\nHenry Miller was born on December 26, 1891 in Yorkville. "
+        "In 1930 Miller moved to Paris, where he wrote Tropic of Cancer in 1934.\n\n"
+    )
+    filler = "The city had many streets and buildings and people walking around.\n\n"
+    references = "## References\n\n" + "".join(
+        f"- Miller, H. ({1950 + i}). Letters. p. {i}\n" for i in range(40)
+    )
+    content = filler * 20 + biography + references
+
+    window = select_relevant_window(
+        content, max_length=len(biography) + 200, research_question="Life of Henry Miller"
+    )
+
+    assert biography in window
+    assert "## References" not in window
+    assert len(window) <= len(biography) + 200
+    # Same input, same window
+    assert window == select_relevant_window(
+        content, max_length=len(biography) + 200, research_question="Life of Henry Miller"
+    )
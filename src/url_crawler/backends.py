@@ -0,0 +1,209 @@
+"""Scraper backends that turn a URL into Markdown.
+
+- ``firecrawl``: the hosted (or self-hosted) Firecrawl scrape API.
+- ``http``: fetches the page directly and converts the HTML locally.
+- ``file``: reads pages from a fixtures directory, for offline runs and load tests.
+"""
+
+import asyncio
+import os
+import re
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from langchain_core.runnables import RunnableConfig
+from src.configuration import Configuration
+from src.url_crawler.client import get_crawler_client
+
+
+class ScraperBackend(ABC):
+    """Interface every scraper backend implements."""
+
+    name: str
+
+    @abstractmethod
+    async def scrape(self, url: str) -> str | None:
+        """Return the page content as Markdown, or None if there is none."""
+
+    def host_for(self, url: str) -> str:
+        """Return the host actually contacted to scrape ``url``."""
+        return urlparse(url).netloc
+
+
+class FirecrawlBackend(ScraperBackend):
+    """Scrapes pages through the Firecrawl API."""
+
+    name = "firecrawl"
+
+    def __init__(self, base_url: str, api_key: str | None = None):
+        """Point the backend at a Firecrawl deployment."""
+        self.api_url = f"{base_url.rstrip('/')}/v0/scrape"
+        self.api_key = api_key
+
+    def host_for(self, url: str) -> str:
+        """Every page is scraped through the Firecrawl host."""
+        return urlparse(self.api_url).netloc
+
+    async def scrape(self, url: str) -> str | None:
+        """Scrapes URL using Firecrawl API and returns Markdown content."""
+        headers = {"Content-Type": "application/json"}
+
+        # Add API key if available
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        session = get_crawler_client().get_session()
+        async with session.post(
+            self.api_url,
+            json={
+                "url": url,
+                "pageOptions": {"onlyMainContent": True},
+                "formats": ["markdown"],
+            },
+            headers=headers,
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data.get("data", {}).get("markdown")
+
+
+class HttpBackend(ScraperBackend):
+    """Fetches pages directly and converts their HTML to Markdown locally."""
+
+    name = "http"
+
+    def __init__(self, user_agent: str = "event-deep-research/0.1"):
+        """Set the User-Agent sent with every request."""
+        self.user_agent = user_agent
+
+    async def scrape(self, url: str) -> str | None:
+        """Download the page and return its main text as Markdown."""
+        session = get_crawler_client().get_session()
+        async with session.get(url, headers={"User-Agent": self.user_agent}) as response:
+            response.raise_for_status()
+            html = await response.text()
+        return html_to_markdown(html)
+
+
+class FileBackend(ScraperBackend):
+    """Serves pages from ``<root_dir>/<host>/<path>.md`` (or ``.html``) files."""
+
+    name = "file"
+
+    def __init__(self, root_dir: str):
+        """Read fixtures from ``root_dir``."""
+        self.root_dir = root_dir
+
+    def host_for(self, url: str) -> str:
+        """Fixtures are local, they share a single guard."""
+        return "file"
+
+    def path_for(self, url: str) -> str:
+        """Return the fixture path for a URL, without extension."""
+        parsed = urlparse(url)
+        path = parsed.path.strip("/") or "index"
+        return os.path.join(self.root_dir, parsed.netloc.lower(), path)
+
+    async def scrape(self, url: str) -> str | None:
+        """Read the fixture for the URL, converting HTML fixtures to Markdown."""
+        base_path = self.path_for(url)
+        for extension in (".md", ".html"):
+            path = base_path + extension
+            if os.path.isfile(path):
+                content = await asyncio.to_thread(_read_file, path)
+                return html_to_markdown(content) if extension == ".html" else content
+        return None
+
+
+def _read_file(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class _MarkdownConverter(HTMLParser):
+    """Small HTML to Markdown converter that keeps text, headings, lists and links."""
+
+    SKIPPED_TAGS = {"script", "style", "nav", "footer", "header", "aside", "noscript"}
+    BLOCK_TAGS = {"p", "div", "section", "article", "table", "tr", "br", "blockquote"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.skip_depth = 0
+        self.href: str | None = None
+        self.link_text: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif self.skip_depth:
+            return
+        elif re.fullmatch(r"h[1-6]", tag):
+            self.parts.append("\n\n" + "#" * int(tag[1]) + " ")
+        elif tag == "li":
+            self.parts.append("\n- ")
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+        elif tag == "a":
+            self.href = dict(attrs).get("href")
+            self.link_text = []
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+        elif self.skip_depth:
+            return
+        elif tag == "a" and self.href is not None:
+            text = "".join(self.link_text).strip()
+            self.parts.append(f"[{text}]({self.href})" if text else "")
+            self.href = None
+        elif re.fullmatch(r"h[1-6]", tag) or tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        text = re.sub(r"\s+", " ", data)
+        if self.href is not None:
+            self.link_text.append(text)
+        else:
+            self.parts.append(text)
+
+
+def html_to_markdown(html: str) -> str:
+    """Convert an HTML page into simple Markdown."""
+    converter = _MarkdownConverter()
+    converter.feed(html)
+    converter.close()
+    markdown = "".join(converter.parts)
+    markdown = re.sub(r"[ \t]*\n[ \t]*", "\n", markdown)
+    return re.sub(r"\n{3,}", "\n\n", markdown).strip()
+
+
+_backends: dict[str, ScraperBackend] = {}
+
+
+def get_scraper_backend(
+    name: str | None = None, config: RunnableConfig | None = None
+) -> ScraperBackend:
+    """Return the configured scraper backend, creating it on first use."""
+    configurable = Configuration.from_runnable_config(config)
+    name = name or configurable.scraper_backend
+    # File backends are per fixtures directory
+    key = f"file:{configurable.scraper_fixtures_dir}" if name == "file" else name
+
+    if key not in _backends:
+        if name == "firecrawl":
+            _backends[key] = FirecrawlBackend(
+                base_url=os.getenv("FIRECRAWL_BASE_URL", "https://api.firecrawl.dev"),
+                api_key=os.getenv("FIRECRAWL_API_KEY"),
+            )
+        elif name == "http":
+            _backends[key] = HttpBackend()
+        elif name == "file":
+            _backends[key] = FileBackend(configurable.scraper_fixtures_dir)
+        else:
+            raise ValueError(f"Unknown scraper backend: {name}")
+
+    return _backends[key]
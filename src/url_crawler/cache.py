@@ -0,0 +1,124 @@
+"""Disk-backed cache for scraped pages.
+
+Entries are keyed by the SHA-256 of the canonical URL and store the scraped
+markdown zlib-compressed in a small SQLite file. Entries expire after a TTL and
+the least recently used ones are evicted once the cache exceeds its size budget.
+"""
+
+import hashlib
+import os
+import time
+import zlib
+
+from langchain_core.runnables import RunnableConfig
+from src.configuration import Configuration
+from src.core.sqlite_store import LRUStoreStats, SqliteLRUStore
+from src.services.url_service import URLService
+
+
+class PageCacheStats(LRUStoreStats):
+    """Counters describing how much scraping the cache has saved."""
+
+    expired: int = 0
+    saved_seconds: float = 0.0
+
+
+class PageCache(SqliteLRUStore):
+    """Persistent, size-bounded LRU cache of scraped page markdown."""
+
+    TABLE = "pages"
+    COLUMNS = """url TEXT NOT NULL,
+                content BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                fetch_seconds REAL NOT NULL"""
+
+    def __init__(self, path: str, ttl_seconds: int, max_bytes: int):
+        """Open (or create) the cache database at ``path``.
+
+        A ``ttl_seconds`` or ``max_bytes`` of 0 disables that limit.
+        """
+        self.ttl_seconds = ttl_seconds
+        super().__init__(path, max_bytes, PageCacheStats())
+
+    @staticmethod
+    def make_key(url: str) -> str:
+        """Return the content address for a URL."""
+        canonical = URLService.canonicalize_url(url)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> str | None:
+        """Return the cached markdown for ``url`` or None if missing or expired."""
+        key = self.make_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at, fetch_seconds FROM pages WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            content, created_at, fetch_seconds = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._delete(key)
+                self._conn.commit()
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+
+            self._touch(key, now)
+            self._conn.commit()
+            self.stats.hits += 1
+            self.stats.saved_seconds += fetch_seconds
+
+        return zlib.decompress(content).decode("utf-8")
+
+    def set(self, url: str, content: str, fetch_seconds: float = 0.0) -> None:
+        """Store ``content`` for ``url`` and evict old entries if over budget."""
+        compressed = zlib.compress(content.encode("utf-8"))
+        if self.max_bytes and len(compressed) > self.max_bytes:
+            # A single page larger than the whole budget is never worth keeping
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO pages
+                    (key, url, content, size, created_at, last_access, fetch_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.make_key(url),
+                    URLService.canonicalize_url(url),
+                    compressed,
+                    len(compressed),
+                    now,
+                    now,
+                    fetch_seconds,
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+
+# Caches by database path, created lazily
+_page_caches: dict[str, PageCache] = {}
+
+
+def get_page_cache(config: RunnableConfig | None = None) -> PageCache | None:
+    """Return the shared page cache, or None when caching is disabled."""
+    configurable = Configuration.from_runnable_config(config)
+    if not configurable.scrape_cache_enabled:
+        return None
+
+    path = os.path.join(configurable.scrape_cache_dir, "pages.sqlite3")
+    if path not in _page_caches:
+        _page_caches[path] = PageCache(
+            path=path,
+            ttl_seconds=configurable.scrape_cache_ttl_seconds,
+            max_bytes=configurable.scrape_cache_max_bytes,
+        )
+    return _page_caches[path]
@@ -0,0 +1,195 @@
+"""Structure-aware token chunking shared by every splitter in the pipeline.
+
+Text is tokenized once and packed into chunks of up to ``chunk_size`` tokens.
+Each chunk ends at the last paragraph break that fits the budget, falling
+back to the last sentence end and only then to a plain token boundary, so
+events are rarely cut in half. Chunks are returned as character spans into
+the original text and sliced out only when a prompt is built.
+
+Text that arrives in segments, such as a page being cleaned paragraph by
+paragraph, can be chunked as it streams in: only the text of the chunk
+being filled is kept, and the spans still give offsets into the whole text.
+"""
+
+import re
+from bisect import bisect_left
+from typing import AsyncIterable, AsyncIterator, List
+
+from src.configuration import Configuration
+from src.url_crawler.tokenization import get_tokenization_service, text_token_offsets
+
+# Blank lines separate Markdown paragraphs
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+
+# Chunks are cut right before the whitespace of a break, since tokenizers
+# attach leading whitespace to the next word
+PARAGRAPH_END = re.compile(r"(?=\n[ \t]*\n)")
+SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s)|(?=\n)")
+
+# A structural break is only used if the chunk is at least this full,
+# otherwise one short paragraph would produce a tiny chunk
+MIN_FILL_RATIO = 0.5
+
+
+class TextSpan:
+    """A chunk of text stored as character offsets into the original string.
+
+    The chunk text is only sliced out when ``str()`` is called, typically when
+    the prompt is built, and ``start``/``end`` give its exact provenance.
+    """
+
+    __slots__ = ("source", "start", "end", "base")
+
+    def __init__(self, source: str, start: int, end: int, base: int = 0):
+        """Point at ``[start, end)`` of a text without copying it.
+
+        ``source`` holds the text from offset ``base`` on, the whole text
+        unless it was streamed.
+        """
+        self.source = source
+        self.start = start
+        self.end = end
+        self.base = base
+
+    def __str__(self) -> str:
+        """Slice the chunk text out of the source."""
+        return self.source[self.start - self.base : self.end - self.base]
+
+    def __len__(self) -> int:
+        """Return the chunk length in characters."""
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        """Show the offsets, not the text."""
+        return f"TextSpan(start={self.start}, end={self.end})"
+
+
+class TextChunker:
+    """Packs tokenized text into overlapping, structure-aligned chunks."""
+
+    def __init__(self, chunk_size: int, overlap_size: int):
+        """Chunks hold at most ``chunk_size`` tokens and repeat ``overlap_size``."""
+        if chunk_size <= overlap_size:
+            raise ValueError("chunk_size must be larger than overlap_size")
+        self.chunk_size = chunk_size
+        self.overlap_size = overlap_size
+
+    def chunk_end(self, text: str, starts: List[int], start: int) -> int:
+        """Return the token index at which the chunk starting at ``start`` ends.
+
+        ``starts`` must hold more than ``chunk_size`` tokens after ``start``.
+        """
+        limit = start + self.chunk_size
+        min_end = start + max(int(self.chunk_size * MIN_FILL_RATIO), 1)
+        window_start, window_end = starts[min_end], starts[limit]
+
+        for pattern in (PARAGRAPH_END, SENTENCE_END):
+            last_break = None
+            for match in pattern.finditer(text, window_start, window_end):
+                last_break = match.end()
+            if last_break is not None:
+                return bisect_left(starts, last_break, min_end, limit)
+        return limit
+
+    def next_start(self, start: int, end: int) -> int:
+        """Return where the chunk after ``[start, end)`` begins."""
+        return max(end - self.overlap_size, start + 1)
+
+    def split(self, text: str, starts: List[int]) -> List[TextSpan]:
+        """Split ``text``, whose tokens start at ``starts``, into spans."""
+        if not text:
+            return []
+
+        spans: List[TextSpan] = []
+        start = 0
+        while len(starts) - start > self.chunk_size:
+            end = self.chunk_end(text, starts, start)
+            spans.append(TextSpan(text, starts[start], starts[end]))
+            start = self.next_start(start, end)
+        spans.append(TextSpan(text, starts[start] if starts else 0, len(text)))
+        return spans
+
+
+def get_text_chunker(
+    chunk_size: int | None = None, overlap_size: int | None = None
+) -> TextChunker:
+    """Return a chunker using the configured sizes unless others are given."""
+    configurable = Configuration.from_runnable_config()
+    return TextChunker(
+        chunk_size if chunk_size is not None else configurable.default_chunk_size,
+        overlap_size if overlap_size is not None else configurable.default_overlap_size,
+    )
+
+
+def split_text_into_chunks(
+    text: str, chunk_size: int | None = None, overlap_size: int | None = None
+) -> List[TextSpan]:
+    """Split text with the shared chunking engine, synchronously."""
+    return get_text_chunker(chunk_size, overlap_size).split(
+        text, text_token_offsets(text)
+    )
+
+
+async def chunk_text_by_tokens(
+    text: str, chunk_size: int | None = None, overlap_size: int | None = None
+) -> List[TextSpan]:
+    """Split text into token-based, overlapping chunks.
+
+    The text is tokenized once, off the event loop, and the chunks are returned as spans into it;
+    call ``str()`` on a chunk to get its text.
+    """
+    if not text:
+        return []
+
+    chunker = get_text_chunker(chunk_size, overlap_size)
+    [starts] = await get_tokenization_service().token_offsets([text])
+    return chunker.split(text, starts)
+
+
+async def chunk_segments_by_tokens(
+    segments: AsyncIterable[str],
+    chunk_size: int | None = None,
+    overlap_size: int | None = None,
+    max_chunks: int | None = None,
+) -> AsyncIterator[TextSpan]:
+    """Yield chunks of a stream of text segments as soon as they are full.
+
+    Each segment is tokenized once, off the event loop, when it arrives, and
+    only the text of the chunk being filled is buffered. Spans are offsets
+    into the concatenated segments. Once ``max_chunks`` chunks have been
+    yielded the rest of the stream is never read.
+    """
+    chunker = get_text_chunker(chunk_size, overlap_size)
+    tokenizer = get_tokenization_service()
+    # The buffered text starts at offset ``base`` of the stream
+    buffer, base = "", 0
+    starts: List[int] = []
+    start = 0
+    emitted = 0
+
+    async for segment in segments:
+        if not segment:
+            continue
+        [offsets] = await tokenizer.token_offsets([segment])
+        starts.extend(len(buffer) + offset for offset in offsets)
+        buffer += segment
+
+        while len(starts) - start > chunker.chunk_size:
+            end = chunker.chunk_end(buffer, starts, start)
+            yield TextSpan(buffer, base + starts[start], base + starts[end], base)
+            emitted += 1
+            if max_chunks is not None and emitted >= max_chunks:
+                return
+            start = chunker.next_start(start, end)
+
+        if start:
+            # Drop the text no later chunk needs
+            cut = starts[start]
+            buffer, base = buffer[cut:], base + cut
+            starts = [offset - cut for offset in starts[start:]]
+            start = 0
+
+    if buffer:
+        first = starts[0] if starts else 0
+        yield TextSpan(buffer, base + first, base + len(buffer), base)
+
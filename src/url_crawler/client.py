@@ -0,0 +1,129 @@
+"""Process-wide aiohttp client shared by every scrape.
+
+Reusing one ``ClientSession`` keeps TCP/TLS connections to the scraper alive
+between pages, caps concurrent sockets per host and caches DNS lookups.
+The session is opened by the first scrape and kept for the whole process,
+across graph runs, and closed when the process exits. ``lifespan`` scopes
+a session to a block instead, for callers that want it closed sooner.
+"""
+
+import asyncio
+import atexit
+from contextlib import asynccontextmanager
+
+import aiohttp
+from src.configuration import Configuration
+
+
+class CrawlerClient:
+    """Lazily created, reference-counted aiohttp session for crawling."""
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_connections_per_host: int,
+        dns_cache_ttl_seconds: int,
+        keepalive_seconds: float,
+        timeout_seconds: float,
+    ):
+        """Store the connection pool settings; no sockets are opened yet."""
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.dns_cache_ttl_seconds = dns_cache_ttl_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._users = 0
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it for the running event loop.
+
+        A caller outside any ``lifespan``, such as a graph run, keeps the
+        session open until ``close`` at process exit, so another caller's
+        shutdown cannot close the session under it.
+        """
+        if self._users == 0:
+            self._users = 1
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # Sessions are bound to the loop they were created on
+            self._close_stale_session()
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=self.dns_cache_ttl_seconds,
+                keepalive_timeout=self.keepalive_seconds,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout
+            )
+            self._loop = loop
+        return self._session
+
+    def _close_stale_session(self) -> None:
+        """Close a session left open on another event loop."""
+        session, loop = self._session, self._loop
+        if session is None or session.closed or loop is None:
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        elif not loop.is_closed():
+            loop.run_until_complete(session.close())
+        else:
+            # The loop is gone, so its sockets can only be dropped
+            session.connector._close()
+
+    async def startup(self) -> None:
+        """Register a user of the client and open the session if needed."""
+        self._users += 1
+        self.get_session()
+
+    async def shutdown(self, force: bool = False) -> None:
+        """Release a user of the client, closing the session when none are left."""
+        self._users = 0 if force else max(self._users - 1, 0)
+        if self._users > 0:
+            return
+
+        session, self._session, self._loop = self._session, None, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def close(self) -> None:
+        """Close the session whatever its users, from outside its event loop.
+
+        Registered to run at process exit for the process-wide client.
+        """
+        self._users = 0
+        self._close_stale_session()
+        self._session, self._loop = None, None
+
+    @asynccontextmanager
+    async def lifespan(self):
+        """Keep the session open for the duration of the ``async with`` block."""
+        await self.startup()
+        try:
+            yield self
+        finally:
+            await self.shutdown()
+
+
+_crawler_client: CrawlerClient | None = None
+
+
+def get_crawler_client() -> CrawlerClient:
+    """Return the process-wide crawler client."""
+    global _crawler_client
+    if _crawler_client is None:
+        configurable = Configuration.from_runnable_config()
+        _crawler_client = CrawlerClient(
+            max_connections=configurable.crawler_max_connections,
+            max_connections_per_host=configurable.crawler_max_connections_per_host,
+            dns_cache_ttl_seconds=configurable.crawler_dns_cache_ttl_seconds,
+            keepalive_seconds=configurable.crawler_keepalive_seconds,
+            timeout_seconds=configurable.crawler_timeout_seconds,
+        )
+        atexit.register(_crawler_client.close)
+    return _crawler_client
+
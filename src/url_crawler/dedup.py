@@ -0,0 +1,106 @@
+"""Drops repeated and near-duplicate paragraphs from a scraped page.
+
+Biography pages repeat captions, infobox text, "see also" blocks and quoted
+passages. Exact repeats are found by hashing the normalized paragraph, near
+repeats by comparing 64-bit SimHash fingerprints of the paragraph's words.
+Paragraphs are too short for n-gram shingles: one inserted word already
+changes a large share of the 3-grams, while single words keep edited copies
+within a few bits of each other. Candidates are looked up through four
+16-bit bands, so each paragraph is only compared with the few earlier ones
+that share a band.
+"""
+
+import hashlib
+import re
+
+from pydantic import BaseModel
+
+WORD_PATTERN = re.compile(r"\w+")
+FINGERPRINT_BITS = 64
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+
+
+class DedupStats(BaseModel):
+    """How much of a page the deduplicator removed."""
+
+    paragraphs: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    removed_chars: int = 0
+
+    @property
+    def removed_paragraphs(self) -> int:
+        """Total paragraphs dropped."""
+        return self.exact_duplicates + self.near_duplicates
+
+
+def _stable_hash(text: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def simhash(words: list[str]) -> int:
+    """Return the 64-bit SimHash of a paragraph's words."""
+    weights = [0] * FINGERPRINT_BITS
+    for word in words:
+        h = _stable_hash(word)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class ParagraphDeduplicator:
+    """Stateful filter that remembers the paragraphs of one page."""
+
+    def __init__(self, max_distance: int = 3, min_words: int = 8):
+        """Treat paragraphs within ``max_distance`` differing bits as duplicates.
+
+        Paragraphs shorter than ``min_words`` are only dropped on exact repeats,
+        since SimHash is unreliable on a handful of words.
+        """
+        self.max_distance = max_distance
+        self.min_words = min_words
+        self.stats = DedupStats()
+        self._seen_exact: set[int] = set()
+        self._bands: list[dict[int, list[int]]] = [{} for _ in range(BANDS)]
+
+    def is_duplicate(self, paragraph: str) -> bool:
+        """Return True if the paragraph repeats one already seen on this page."""
+        words = [w.lower() for w in WORD_PATTERN.findall(paragraph)]
+        if not words:
+            # Blank separators and punctuation-only lines are always kept
+            return False
+
+        self.stats.paragraphs += 1
+        exact_key = _stable_hash(" ".join(words))
+        if exact_key in self._seen_exact:
+            self.stats.exact_duplicates += 1
+            self.stats.removed_chars += len(paragraph)
+            return True
+        self._seen_exact.add(exact_key)
+
+        if len(words) < self.min_words:
+            return False
+
+        fingerprint = simhash(words)
+        band_keys = [
+            fingerprint >> (band * BAND_BITS) & ((1 << BAND_BITS) - 1)
+            for band in range(BANDS)
+        ]
+        for band, key in enumerate(band_keys):
+            for candidate in self._bands[band].get(key, []):
+                if (fingerprint ^ candidate).bit_count() <= self.max_distance:
+                    self.stats.near_duplicates += 1
+                    self.stats.removed_chars += len(paragraph)
+                    return True
+
+        for band, key in enumerate(band_keys):
+            self._bands[band].setdefault(key, []).append(fingerprint)
+        return False
@@ -0,0 +1,288 @@
+"""Per-host rate limiting, adaptive backoff and circuit breaking for scrapes.
+
+Every scrape goes through a ``HostGuard`` for the host it contacts:
+
+- a token bucket spaces requests out to the host's current rate,
+- 429 and 5xx responses halve that rate and back off (honouring ``Retry-After``),
+  while successes slowly raise it back to the configured limit,
+- after too many consecutive failures the circuit opens and scrapes fail fast
+  until a single probe request succeeds again.
+"""
+
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Literal, TypeVar
+
+import aiohttp
+from pydantic import BaseModel
+from src.configuration import Configuration
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host's circuit is open and requests are failing fast."""
+
+    def __init__(self, host: str, retry_in: float):
+        """Record the host and how long until its circuit lets a probe through."""
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}, retrying in {retry_in:.1f}s")
+
+
+ScrapeFailure = Literal["circuit_open", "retries_exhausted", "failed"]
+
+
+class ScrapeError(Exception):
+    """Raised when a page could not be scraped, as opposed to scraped empty."""
+
+    def __init__(self, url: str, reason: ScrapeFailure, error: Exception):
+        """Record the page, why its scrape failed and the error that ended it."""
+        self.url = url
+        self.reason = reason
+        self.error = error
+        super().__init__(f"Scrape of {url} failed ({reason}): {error!r}")
+
+    @classmethod
+    def from_error(cls, url: str, error: Exception) -> "ScrapeError":
+        """Classify the error a guarded scrape raised."""
+        if isinstance(error, CircuitOpenError):
+            return cls(url, "circuit_open", error)
+        if is_transient(error):
+            # The guard only gives up on transient errors after its retries
+            return cls(url, "retries_exhausted", error)
+        return cls(url, "failed", error)
+
+
+def is_transient(error: Exception) -> bool:
+    """Return whether a scrape failing with ``error`` is worth retrying."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, (TimeoutError, aiohttp.ClientConnectionError))
+
+
+class HostMetrics(BaseModel):
+    """Counters for one scraped host."""
+
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    throttled: int = 0
+    retries: int = 0
+    rejected: int = 0
+    wait_seconds: float = 0.0
+    current_rate: float = 0.0
+    circuit_state: str = "closed"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostGuard:
+    """Token bucket, AIMD rate control and circuit breaker for a single host."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        failure_threshold: int,
+        reset_seconds: float,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+    ):
+        """Start with a full bucket at the configured rate and a closed circuit."""
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.consecutive_failures = 0
+        self.paused_until = 0.0
+        self.opened_at: float | None = None
+        self.probe_in_flight = False
+        self.metrics = HostMetrics(current_rate=rate)
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        delay = max(-self.tokens / self.rate, self.paused_until - now, 0.0)
+        self.metrics.wait_seconds += delay
+        return delay
+
+    def check_circuit(self, host: str) -> bool:
+        """Raise CircuitOpenError unless a request may be sent right now.
+
+        Returns True when the request is the single half-open probe.
+        """
+        if self.opened_at is None:
+            return False
+
+        elapsed = time.monotonic() - self.opened_at
+        if elapsed < self.reset_seconds or self.probe_in_flight:
+            self.metrics.rejected += 1
+            raise CircuitOpenError(host, max(self.reset_seconds - elapsed, 0.0))
+
+        # Half-open: let a single probe through
+        self.probe_in_flight = True
+        self.metrics.circuit_state = "half_open"
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit and additively raise the rate towards its limit."""
+        self.metrics.successes += 1
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.metrics.circuit_state = "closed"
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+        self.metrics.current_rate = self.rate
+
+    def record_failure(self, throttled: bool, retry_after: float | None) -> float:
+        """Register a failed request and return how long to back off."""
+        self.metrics.failures += 1
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+
+        if throttled:
+            # Multiplicative decrease, the provider told us we are too fast
+            self.metrics.throttled += 1
+            self.rate = max(self.rate / 2, self.max_rate / 20)
+            self.metrics.current_rate = self.rate
+
+        delay = retry_after
+        if delay is None:
+            delay = self.backoff_base_seconds * 2 ** (self.consecutive_failures - 1)
+        delay = min(delay, self.backoff_max_seconds)
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+        if self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self.metrics.circuit_state = "open"
+        return delay
+
+
+class CrawlerGuard:
+    """Runs scrapes through the guard of the host they contact."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_retries: int,
+        failure_threshold: int,
+        reset_seconds: float,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+    ):
+        """Store the settings shared by every host guard."""
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hosts: dict[str, HostGuard] = {}
+
+    def host_guard(self, host: str) -> HostGuard:
+        """Return the guard for a host, creating it on first use."""
+        if host not in self.hosts:
+            self.hosts[host] = HostGuard(
+                rate=self.rate,
+                burst=self.burst,
+                failure_threshold=self.failure_threshold,
+                reset_seconds=self.reset_seconds,
+                backoff_base_seconds=self.backoff_base_seconds,
+                backoff_max_seconds=self.backoff_max_seconds,
+            )
+        return self.hosts[host]
+
+    async def call(self, host: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Call ``fn`` respecting the host's rate, retrying transient failures."""
+        guard = self.host_guard(host)
+        attempt = 0
+
+        while True:
+            probe = guard.check_circuit(host)
+            try:
+                delay = guard.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                guard.metrics.requests += 1
+                result = await fn()
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRYABLE_STATUSES:
+                    # The page is the problem, not the host: don't trip the breaker
+                    raise
+                retry_after = parse_retry_after(
+                    e.headers.get("Retry-After") if e.headers else None
+                )
+                backoff = guard.record_failure(e.status == 429, retry_after)
+                error: Exception = e
+            except (TimeoutError, aiohttp.ClientConnectionError) as e:
+                backoff = guard.record_failure(False, None)
+                error = e
+            else:
+                guard.record_success()
+                return result
+            finally:
+                # A probe that ended in any way, cancellation included, is over
+                if probe:
+                    guard.probe_in_flight = False
+
+            if attempt >= self.max_retries or guard.opened_at is not None:
+                raise error
+            attempt += 1
+            guard.metrics.retries += 1
+            print(f"Scrape of {host} failed ({error!r}), retrying in {backoff:.1f}s")
+
+    def metrics(self) -> dict[str, HostMetrics]:
+        """Return a snapshot of the metrics of every host."""
+        return {host: guard.metrics.model_copy() for host, guard in self.hosts.items()}
+
+
+_crawler_guard: CrawlerGuard | None = None
+
+
+def get_crawler_guard() -> CrawlerGuard:
+    """Return the process-wide crawler guard."""
+    global _crawler_guard
+    if _crawler_guard is None:
+        configurable = Configuration.from_runnable_config()
+        _crawler_guard = CrawlerGuard(
+            rate=configurable.crawler_requests_per_second,
+            burst=configurable.crawler_burst,
+            max_retries=configurable.crawler_max_retries,
+            failure_threshold=configurable.crawler_circuit_failure_threshold,
+            reset_seconds=configurable.crawler_circuit_reset_seconds,
+            backoff_base_seconds=configurable.crawler_backoff_base_seconds,
+            backoff_max_seconds=configurable.crawler_backoff_max_seconds,
+        )
+    return _crawler_guard
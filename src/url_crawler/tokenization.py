@@ -0,0 +1,186 @@
+"""Batched tokenization that never runs on the event loop thread.
+
+Documents are encoded with tiktoken's batch API in a worker thread; tiktoken
+releases the GIL while encoding, so a batch uses several cores. Batches
+larger than ``tokenizer_process_threshold_chars`` can additionally be spread
+over a process pool, which also parallelizes the Python-side offset
+computation.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import Callable, List
+
+import tiktoken
+from pydantic import BaseModel
+from src.configuration import Configuration
+
+# Global tokenizer cache to avoid repeated loading
+_tokenizer = None
+
+
+def get_tokenizer():
+    """Get the tiktoken tokenizer, loading it lazily."""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = tiktoken.get_encoding("cl100k_base")
+    return _tokenizer
+
+
+def token_start_offsets(
+    encoding, text: str, tokens: List[int] | None = None
+) -> List[int]:
+    """Return the character offset at which each token of ``text`` starts.
+
+    Offsets are computed from the token bytes, without decoding any text. A
+    token that starts inside a multi-byte character is mapped to the start of
+    that character, so cutting at an offset never splits a character.
+    """
+    if tokens is None:
+        tokens = encoding.encode_ordinary(text)
+    token_bytes = encoding.decode_tokens_bytes(tokens)
+
+    if text.isascii():
+        # One byte per character, the offsets are the running byte lengths
+        return list(accumulate(map(len, token_bytes), initial=0))[:-1]
+
+    offsets = []
+    text_len = 0
+    for token in token_bytes:
+        offsets.append(max(0, text_len - (0x80 <= token[0] < 0xC0)))
+        # Every byte that is not a UTF-8 continuation byte starts a character
+        text_len += sum(1 for byte in token if not 0x80 <= byte < 0xC0)
+    return offsets
+
+
+def text_token_offsets(text: str) -> List[int]:
+    """Return the token start offsets of ``text``, synchronously."""
+    return token_start_offsets(get_tokenizer(), text)
+
+
+def _encode_batch(texts: List[str], threads: int) -> List[List[int]]:
+    encoding = get_tokenizer()
+    if len(texts) == 1:
+        return [encoding.encode_ordinary(texts[0])]
+    return encoding.encode_ordinary_batch(texts, num_threads=threads)
+
+
+def _count_batch(texts: List[str], threads: int) -> List[int]:
+    return [len(tokens) for tokens in _encode_batch(texts, threads)]
+
+
+def _offsets_batch(texts: List[str], threads: int) -> List[List[int]]:
+    encoding = get_tokenizer()
+    return [
+        token_start_offsets(encoding, text, tokens)
+        for text, tokens in zip(texts, _encode_batch(texts, threads))
+    ]
+
+
+class TokenizationStats(BaseModel):
+    """Throughput of the tokenization service."""
+
+    batches: int = 0
+    documents: int = 0
+    chars: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chars_per_second(self) -> float:
+        """Characters tokenized per second of wall time."""
+        return self.chars / self.seconds if self.seconds else 0.0
+
+
+class TokenizationService:
+    """Awaitable, batched tokenizer backed by threads and an optional process pool."""
+
+    def __init__(
+        self,
+        threads: int = 8,
+        process_workers: int = 0,
+        process_threshold_chars: int = 0,
+    ):
+        """Use ``process_workers`` processes for batches over the threshold.
+
+        With ``process_workers`` set to 0 every batch is encoded in threads.
+        """
+        self.threads = threads
+        self.process_workers = process_workers
+        self.process_threshold_chars = process_threshold_chars
+        self.stats = TokenizationStats()
+        self._process_pool: ProcessPoolExecutor | None = None
+
+    async def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """Encode every text, ignoring special tokens."""
+        return await self._run(_encode_batch, texts)
+
+    async def count_tokens(self, texts: List[str]) -> List[int]:
+        """Count the tokens of every text."""
+        return await self._run(_count_batch, texts)
+
+    async def token_offsets(self, texts: List[str]) -> List[List[int]]:
+        """Return the token start offsets of every text."""
+        return await self._run(_offsets_batch, texts)
+
+    async def _run(self, fn: Callable[[List[str], int], list], texts: List[str]) -> list:
+        if not texts:
+            return []
+
+        start = time.perf_counter()
+        chars = sum(len(text) for text in texts)
+        if self.process_workers > 0 and chars >= self.process_threshold_chars:
+            results = await self._run_in_processes(fn, texts)
+        else:
+            results = await asyncio.to_thread(fn, texts, self.threads)
+
+        self.stats.batches += 1
+        self.stats.documents += len(texts)
+        self.stats.chars += chars
+        self.stats.seconds += time.perf_counter() - start
+        return results
+
+    async def _run_in_processes(
+        self, fn: Callable[[List[str], int], list], texts: List[str]
+    ) -> list:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(self.process_workers)
+
+        # Interleave the texts so every worker gets a similar amount of work
+        groups = [texts[i :: self.process_workers] for i in range(self.process_workers)]
+        loop = asyncio.get_running_loop()
+        group_results = await asyncio.gather(
+            *(
+                loop.run_in_executor(self._process_pool, fn, group, 1)
+                for group in groups
+                if group
+            )
+        )
+
+        results: list = [None] * len(texts)
+        for i, group_result in enumerate(group_results):
+            results[i :: self.process_workers] = group_result
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the process pool, if one was started."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+
+
+_tokenization_service: TokenizationService | None = None
+
+
+def get_tokenization_service() -> TokenizationService:
+    """Return the process-wide tokenization service."""
+    global _tokenization_service
+    if _tokenization_service is None:
+        configurable = Configuration.from_runnable_config()
+        _tokenization_service = TokenizationService(
+            threads=configurable.tokenizer_threads,
+            process_workers=configurable.tokenizer_process_workers,
+            process_threshold_chars=configurable.tokenizer_process_threshold_chars,
+        )
+    return _tokenization_service
@@ -1,10 +1,12 @@
-import random
 from typing import Literal, TypedDict
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import Command
 from src.configuration import Configuration
+from src.url_crawler.resilience import ScrapeError
 from src.url_crawler.utils import url_crawl
+from src.url_crawler.windowing import select_relevant_window
 from src.utils import get_langfuse_handler
 
 config = Configuration()
@@ -17,31 +19,36 @@ class InputUrlCrawlerState(TypedDict):
 
 
 class UrlCrawlerState(InputUrlCrawlerState):
-    raw_scraped_content: str
+    extracted_events: str
 
 
 class OutputUrlCrawlerState(UrlCrawlerState):
     extracted_events: str
-    raw_scraped_content: str
 
 
-async def scrape_content(state: UrlCrawlerState) -> Command[Literal["__end__"]]:
+async def scrape_content(
+    state: UrlCrawlerState, config: RunnableConfig
+) -> Command[Literal["__end__"]]:
     """Scrapes URL content and returns it without any processing."""
     url = state.get("url", "")
+    research_question = state.get("research_question", "")
 
-    content = await url_crawl(url)
+    try:
+        content = await url_crawl(url, config)
+    except ScrapeError as e:
+        # One page failing does not fail the research, it just adds no events
+        print(f"Skipping {url}: {e.reason}")
+        content = ""
 
     if len(content) > MAX_CONTENT_LENGTH:
-        # At random start to get diverse content
-        start_index = random.randint(0, len(content) - MAX_CONTENT_LENGTH)
-        content = content[start_index : start_index + MAX_CONTENT_LENGTH]
+        # Keep the paragraphs with the most dates and mentions of the subject
+        content = select_relevant_window(
+            content, MAX_CONTENT_LENGTH, research_question
+        )
 
     return Command(
         goto=END,
-        update={
-            "raw_scraped_content": content,
-            "extracted_events": content,  # For compatibility with existing interface
-        },
+        update={"extracted_events": content},
     )
 
 
@@ -1,107 +1,216 @@
 import asyncio
-import os
 import re
-from typing import List
-
-import aiohttp
-import tiktoken
-
-FIRECRAWL_API_URL = (
-    f"{os.getenv('FIRECRAWL_BASE_URL', 'https://api.firecrawl.dev')}/v0/scrape"
+import time
+from typing import AsyncIterator, Iterator, List
+
+from langchain_core.runnables import RunnableConfig
+from src.configuration import Configuration
+from src.core.single_flight import SingleFlight
+from src.services.url_service import URLService
+from src.url_crawler.backends import get_scraper_backend
+from src.url_crawler.cache import get_page_cache
+from src.url_crawler.chunking import PARAGRAPH_BREAK
+from src.url_crawler.dedup import ParagraphDeduplicator
+from src.url_crawler.markdown_cleaner import (
+    CHARS_PER_TOKEN,
+    MarkdownNormalizer,
+    NormalizationStats,
 )
+from src.url_crawler.resilience import ScrapeError, get_crawler_guard
+from src.url_crawler.tokenization import get_tokenization_service
+
 
+async def url_crawl(url: str, config: RunnableConfig | None = None) -> str:
+    """Crawls a URL and returns its cleaned content.
 
-async def url_crawl(url: str) -> str:
-    """Crawls a URL and returns its content. For this example, returns dummy text."""
+    Raises:
+        ScrapeError: The page could not be scraped.
+    """
     # print(f"--- FAKE CRAWLING: {url} ---")
     # if "wikipedia" in url:
     #     return "Henry Miller was an American novelist, short story writer and essayist. He was born in Yorkville, NYC on December 26, 1891. He moved to Paris in 1930. He wrote tropic of cancer, part of his series of novels about his life."
 
-    content = await scrape_page_content(url)
-    if content is None:
-        return ""
-    return remove_markdown_links(content)
-
-
-async def scrape_page_content(url):
-    """Scrapes URL using Firecrawl API and returns Markdown content."""
+    content = await fetch_page_markdown(url, config)
+    return clean_page_content(url, content, config)
+
+
+async def stream_page_segments(
+    url: str, config: RunnableConfig | None = None
+) -> AsyncIterator[str]:
+    """Scrape a URL and yield its cleaned content one paragraph at a time.
+
+    The scraper answers with the whole page, so the stream starts once it is
+    fetched; from there each paragraph is cleaned only when the consumer
+    asks for it, and a consumer that stops early leaves the rest untouched.
+    """
+    content = await fetch_page_markdown(url, config)
+    for segment in iter_clean_segments(url, content, config):
+        yield segment
+
+
+def clean_page_content(
+    url: str, content: str, config: RunnableConfig | None = None
+) -> str:
+    """Clean scraped Markdown and drop repeated paragraphs."""
+    return "".join(iter_clean_segments(url, content, config))
+
+
+# A paragraph ends after its blank lines and the indentation that follows them
+PARAGRAPH_BLOCK_END = re.compile(r"\n(?:[ \t]*\n)+[ \t]*")
+
+
+def iter_clean_segments(
+    url: str, content: str, config: RunnableConfig | None = None
+) -> Iterator[str]:
+    """Yield the cleaned paragraphs of scraped Markdown, without repeats.
+
+    Paragraphs are normalized whole, so no link or image is ever cut in half
+    by a segment limit, and only then split into segments for deduplication.
+    """
+    configurable = Configuration.from_runnable_config(config)
+    normalizer = get_markdown_normalizer(config)
+    deduplicator = (
+        ParagraphDeduplicator(max_distance=configurable.dedup_max_distance)
+        if configurable.dedup_paragraphs
+        else None
+    )
+    stats = NormalizationStats()
+
+    start = 0
+    for match in PARAGRAPH_BLOCK_END.finditer(content):
+        block = content[start : match.end()]
+        yield from _clean_block(block, normalizer, deduplicator, stats)
+        start = match.end()
+    yield from _clean_block(content[start:], normalizer, deduplicator, stats)
+
+    if stats.chars_in:
+        print(
+            f"Cleaned {url}: {stats.chars_in} -> {stats.chars_out} chars, "
+            f"~{stats.estimated_tokens_saved} tokens saved (estimated at "
+            f"{CHARS_PER_TOKEN} chars per token) {stats.removed_chars}"
+        )
+    if deduplicator is not None and deduplicator.stats.removed_paragraphs:
+        dedup_stats = deduplicator.stats
+        chunk_chars = configurable.default_chunk_size * CHARS_PER_TOKEN
+        print(
+            f"Dropped {dedup_stats.removed_paragraphs}/{dedup_stats.paragraphs} "
+            f"duplicate paragraphs from {url} ({dedup_stats.exact_duplicates} exact, "
+            f"{dedup_stats.near_duplicates} near), "
+            f"~{dedup_stats.removed_chars / chunk_chars:.1f} chunks"
+        )
+
+
+def _clean_block(
+    block: str,
+    normalizer: MarkdownNormalizer,
+    deduplicator: ParagraphDeduplicator | None,
+    stats: NormalizationStats,
+) -> Iterator[str]:
+    if not block:
+        return
+    cleaned, block_stats = normalizer.normalize(block)
+    stats.add(block_stats)
+    for segment in iter_text_segments(cleaned):
+        if deduplicator is None or not deduplicator.is_duplicate(segment):
+            yield segment
+
+
+# Normalizers are cached per rule set, compiling the regex once
+_normalizers: dict[tuple[str, ...], MarkdownNormalizer] = {}
+
+
+def get_markdown_normalizer(
+    config: RunnableConfig | None = None,
+) -> MarkdownNormalizer:
+    """Return a normalizer for the configured cleaning rules."""
+    rules = tuple(Configuration.from_runnable_config(config).markdown_cleaning_rules)
+    if rules not in _normalizers:
+        _normalizers[rules] = MarkdownNormalizer(list(rules))
+    return _normalizers[rules]
+
+
+# Concurrent crawls of the same page share one scrape
+_scrape_flights = SingleFlight()
+
+
+async def fetch_page_markdown(url: str, config: RunnableConfig | None = None) -> str:
+    """Return the raw Markdown of a URL, from the scrape cache when possible.
+
+    Concurrent calls for the same canonical URL are coalesced into one fetch.
+
+    Raises:
+        ScrapeError: The page could not be scraped; failures are not cached.
+    """
+    canonical_url = URLService.canonicalize_url(url)
+    return await _scrape_flights.do(
+        canonical_url, lambda: _fetch_page_markdown(url, config)
+    )
+
+
+async def _fetch_page_markdown(url: str, config: RunnableConfig | None) -> str:
+    cache = get_page_cache(config)
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, url)
+        if cached is not None:
+            print(f"Scrape cache hit for {url} ({cache.stats.hits} hits so far)")
+            return cached
+
+    start = time.perf_counter()
+    content = await scrape_page_content(url, config)
+
+    if cache is not None:
+        await asyncio.to_thread(cache.set, url, content, time.perf_counter() - start)
+    return content
+
+
+async def scrape_page_content(url: str, config: RunnableConfig | None = None) -> str:
+    """Scrapes URL with the configured scraper backend and returns Markdown content.
+
+    Requests are rate limited per host and transient failures are retried with
+    backoff. A page the backend returns no content for is empty.
+
+    Raises:
+        ScrapeError: The host's circuit is open, the retries ran out or the
+            scrape failed for good; ``reason`` tells which.
+    """
+    backend = get_scraper_backend(config=config)
+    host = backend.host_for(url)
     try:
-        headers = {"Content-Type": "application/json"}
-
-        # Add API key if available
-        api_key = os.getenv("FIRECRAWL_API_KEY")
-        if api_key:
-            headers["Authorization"] = f"Bearer {api_key}"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                FIRECRAWL_API_URL,
-                json={
-                    "url": url,
-                    "pageOptions": {"onlyMainContent": True},
-                    "formats": ["markdown"],
-                },
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30),
-            ) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data.get("data", {}).get("markdown")
+        content = await get_crawler_guard().call(host, lambda: backend.scrape(url))
     except Exception as e:
-        print(f"Error scraping page content: {e}")
-        return None
-
-
-def remove_markdown_links(markdown_text):
-    """Removes Markdown links, keeping only display text."""
-    return re.sub(r"\[(.*?)\]\(.*?\)", r"\1", markdown_text)
-
-
-# Global tokenizer cache to avoid repeated loading
-_tokenizer = None
-
-
-def get_tokenizer():
-    """Get the tiktoken tokenizer, loading it lazily."""
-    global _tokenizer
-    if _tokenizer is None:
-        _tokenizer = tiktoken.get_encoding("cl100k_base")
-    return _tokenizer
-
-
-async def chunk_text_by_tokens(
-    text: str, chunk_size: int = 1000, overlap_size: int = 20
-) -> List[str]:
-    """Splits text into token-based, overlapping chunks."""
-    if not text:
-        return []
-
-    # Load tokenizer in a thread to avoid blocking
-    encoding = await asyncio.to_thread(get_tokenizer)
-    tokens = encoding.encode(text)
-    print("--- TOKENS ---")
-    print(len(tokens))
-    print("--- TOKENS ---")
-    chunks = []
-    start_index = 0
-    while start_index < len(tokens):
-        end_index = start_index + chunk_size
-        chunk_tokens = tokens[start_index:end_index]
-        chunks.append(encoding.decode(chunk_tokens))
-        start_index += chunk_size - overlap_size
-
-    print(f"""<delete>
-    CHUNKED TEXT ---
-    Chunks:{len(chunks)}
-    Tokens: {len(tokens)}
-    Text: {len(text)}
-    ---
-    """)
-    return chunks
+        error = ScrapeError.from_error(url, e)
+        metrics = get_crawler_guard().metrics().get(host)
+        print(f"Error scraping page content: {error} ({metrics})")
+        raise error from e
+    return content or ""
+
+
+def iter_text_segments(text: str, max_segment_length: int = 2000) -> Iterator[str]:
+    """Yield paragraph-sized segments of text that join back to the original.
+
+    Paragraphs longer than ``max_segment_length`` are split at the last line
+    break or space before the limit so no segment grows unbounded.
+    """
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        yield from _split_long_segment(text, start, match.end(), max_segment_length)
+        start = match.end()
+    yield from _split_long_segment(text, start, len(text), max_segment_length)
+
+
+def _split_long_segment(
+    text: str, start: int, end: int, max_segment_length: int
+) -> Iterator[str]:
+    while end - start > max_segment_length:
+        limit = start + max_segment_length
+        cut = max(text.rfind("\n", start, limit), text.rfind(" ", start, limit))
+        cut = cut + 1 if cut > start else limit
+        yield text[start:cut]
+        start = cut
+    if end > start:
+        yield text[start:end]
 
 
 async def count_tokens(messages: List[str]) -> int:
     """Counts the total tokens in a list of messages."""
-    # Load tokenizer in a thread to avoid blocking
-    encoding = await asyncio.to_thread(get_tokenizer)
-    return sum(len(encoding.encode(msg)) for msg in messages)
+    return sum(await get_tokenization_service().count_tokens(messages))
@@ -0,0 +1,117 @@
+"""Deterministic selection of the most event-rich parts of a long page.
+
+When a page is longer than the content budget, paragraphs are scored with
+cheap local signals (dates, the research question's keywords, the subject's
+name) and the highest scoring ones are kept, in their original order.
+"""
+
+import re
+from typing import List
+
+from src.core.text_patterns import (
+    MONTH_PATTERN,
+    STOPWORDS,
+    WORD_PATTERN,
+    YEAR_PATTERN,
+)
+from src.url_crawler.utils import iter_text_segments
+
+HEADING_PATTERN = re.compile(r"^\s{0,3}#{1,6}\s+(.*)$", re.MULTILINE)
+
+# Sections that never contain biographical events worth paying tokens for
+LOW_VALUE_SECTIONS = re.compile(
+    r"references|notes|citations|sources|bibliography|further reading|"
+    r"external links|see also|works cited|navigation",
+    re.IGNORECASE,
+)
+
+
+def extract_keywords(research_question: str) -> tuple[set[str], set[str]]:
+    """Return (name words, other keywords) from the research question, lowercased.
+
+    Capitalized words that are not at the start of the question are treated as
+    the subject's name, everything else that is not a stopword as a keyword.
+    """
+    name_words: set[str] = set()
+    keywords: set[str] = set()
+    for i, match in enumerate(WORD_PATTERN.finditer(research_question)):
+        word = match.group(0)
+        lowered = word.lower()
+        if lowered in STOPWORDS or len(lowered) < 3:
+            continue
+        if i > 0 and word[0].isupper():
+            name_words.add(lowered)
+        else:
+            keywords.add(lowered)
+    return name_words, keywords
+
+
+def score_segment(segment: str, name_words: set[str], keywords: set[str]) -> float:
+    """Scores a segment by how many event signals it has per character."""
+    if not segment.strip():
+        return 0.0
+
+    words = [w.lower() for w in WORD_PATTERN.findall(segment)]
+    if not words:
+        return 0.0
+
+    dates = len(YEAR_PATTERN.findall(segment)) + len(MONTH_PATTERN.findall(segment))
+    name_hits = sum(1 for w in words if w in name_words)
+    keyword_hits = sum(1 for w in words if w in keywords)
+
+    # Link lists and navigation are mostly short lines with very few words
+    lines = [line for line in segment.splitlines() if line.strip()]
+    words_per_line = len(words) / max(len(lines), 1)
+    prose_factor = min(words_per_line / 8, 1.0)
+
+    score = 3 * dates + 2 * name_hits + keyword_hits + 0.1 * len(words)
+    return prose_factor * score / len(segment)
+
+
+def select_relevant_window(
+    content: str, max_length: int, research_question: str = ""
+) -> str:
+    """Keep the highest scoring paragraphs of ``content`` within ``max_length``.
+
+    The selection is deterministic and the kept paragraphs stay in document
+    order. Paragraphs under reference-like headings are never kept.
+    """
+    if len(content) <= max_length:
+        return content
+
+    name_words, keywords = extract_keywords(research_question)
+    segments: List[str] = []
+    scores: List[float] = []
+    heading_only: List[bool] = []
+    low_value_section = False
+
+    for segment in iter_text_segments(content):
+        heading = HEADING_PATTERN.search(segment)
+        if heading:
+            low_value_section = bool(LOW_VALUE_SECTIONS.search(heading.group(1)))
+
+        score = score_segment(segment, name_words, keywords)
+        segments.append(segment)
+        scores.append(0.0 if low_value_section else score)
+        heading_only.append(bool(heading) and len(segment.strip().splitlines()) == 1)
+
+    # A heading is worth as much as the paragraph it introduces
+    for i in range(len(segments) - 2, -1, -1):
+        if heading_only[i]:
+            scores[i] = scores[i + 1]
+
+    # Highest yield first, earlier paragraphs win ties
+    ranked = sorted(range(len(segments)), key=lambda i: (-scores[i], i))
+
+    selected: List[int] = []
+    remaining = max_length
+    for i in ranked:
+        if scores[i] <= 0:
+            break
+        if len(segments[i]) <= remaining:
+            selected.append(i)
+            remaining -= len(segments[i])
+        if remaining <= 0:
+            break
+
+    return "".join(segments[i] for i in sorted(selected))